@@ -0,0 +1,346 @@
+from typing import Dict, Optional
+
+import numpy as np
+
+from .config import GameConfig
+from .core import JewelWar
+
+# Movement lookup tables indexed by discrete action (see env.ACTION_MEANINGS).
+_ACTION_DX = np.array([0, 0, 0, -1, 1, 0, 0, 0, 0], dtype=np.float64)
+_ACTION_DY = np.array([0, -1, 1, 0, 0, 0, 0, 0, 0], dtype=np.float64)
+# Candidate spots per game before resource placement gives up (JewelWar._spawn_resources uses the same).
+RESOURCE_ATTEMPTS = 5000
+
+
+class JewelWarBatch:
+    """B independent copies of ``JewelWar`` stored as NumPy arrays.
+
+    Mechanics mirror the scalar sim (team 0 acts before team 1 inside a tick);
+    every rule is applied to all games at once. Finished games are reset in
+    place when ``auto_reset`` is on, so ``step`` can be called forever.
+    """
+
+    def __init__(self, cfg: GameConfig, n_games: int, seed: Optional[int] = None, auto_reset: bool = True):
+        self.cfg = cfg
+        self.n = int(n_games)
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+        self.max_steps = int(cfg.max_time_s * cfg.fps)
+
+        # Static map: identical for every game, so reuse the scalar generator once.
+        template = JewelWar(cfg, seed=0)
+        self.walls = template.walls
+        self.wall_map = np.zeros((cfg.width, cfg.height), dtype=bool)
+        for (wx, wy) in self.walls:
+            if 0 <= wx < cfg.width and 0 <= wy < cfg.height:
+                self.wall_map[wx, wy] = True
+        self.bases = np.array(template.bases, dtype=np.float64)  # [2, 2]
+        self.spawn = np.array(template.spawn, dtype=np.float64)  # [2, 2]
+
+        n, r = self.n, cfg.resources_on_map
+        self.t = np.zeros(n, dtype=np.float64)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.done = np.zeros(n, dtype=bool)
+        self.winner = np.full(n, -1, dtype=np.int64)
+        self.episodes = 0
+
+        self.pos = np.zeros((n, 2, 2), dtype=np.float64)
+        self.hp = np.zeros((n, 2), dtype=np.int64)
+        self.resources = np.zeros((n, 2), dtype=np.int64)
+        self.has_jewel = np.zeros((n, 2), dtype=bool)
+        self.weapon_level = np.zeros((n, 2), dtype=np.int64)
+        self.cooldown = np.zeros((n, 2), dtype=np.float64)
+        self.busy = np.zeros((n, 2), dtype=np.float64)
+        self.capture_hold = np.zeros((n, 2), dtype=np.float64)
+
+        # jewel k belongs to team k; carrier is the team index holding it or -1
+        self.jewel_pos = np.zeros((n, 2, 2), dtype=np.float64)
+        self.jewel_carrier = np.full((n, 2), -1, dtype=np.int64)
+        self.jewel_at_home = np.ones((n, 2), dtype=bool)
+
+        self.res_pos = np.zeros((n, r, 2), dtype=np.float64)
+        self.res_alive = np.zeros((n, r), dtype=bool)
+        self.res_respawn = np.zeros((n, r), dtype=np.float64)
+
+        self.reset()
+
+    # ------------------------------------------------------------------ setup
+    def reset(self, mask: Optional[np.ndarray] = None, seed: Optional[int] = None):
+        """Reset all games, or only those selected by a boolean ``mask``."""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        idx = np.arange(self.n) if mask is None else np.flatnonzero(mask)
+        if idx.size == 0:
+            return self
+        cfg = self.cfg
+        self.t[idx] = 0.0
+        self.steps[idx] = 0
+        self.done[idx] = False
+        self.winner[idx] = -1
+        self.pos[idx] = self.spawn
+        self.hp[idx] = cfg.max_hp
+        self.resources[idx] = 0
+        self.has_jewel[idx] = False
+        self.weapon_level[idx] = 0
+        self.cooldown[idx] = 0.0
+        self.busy[idx] = 0.0
+        self.capture_hold[idx] = 0.0
+        self.jewel_pos[idx] = self.bases
+        self.jewel_carrier[idx] = -1
+        self.jewel_at_home[idx] = True
+        self.res_pos[idx] = self._sample_resources(idx.size)
+        self.res_alive[idx] = True
+        self.res_respawn[idx] = 0.0
+        return self
+
+    def _sample_resources(self, count: int) -> np.ndarray:
+        """Rejection-sample resource spots for ``count`` games.
+
+        Same placement rules and attempt budget as ``JewelWar._spawn_resources``,
+        but where the scalar sim keeps fewer nodes when the budget runs out, the
+        batch arrays have a fixed ``resources_on_map`` slots, so it raises instead.
+        """
+        cfg = self.cfg
+        r = cfg.resources_on_map
+        out = np.zeros((count, r, 2), dtype=np.float64)
+        filled = np.zeros(count, dtype=np.int64)
+        pending = np.arange(count)
+        attempts = 0
+        while pending.size:
+            if attempts >= RESOURCE_ATTEMPTS:
+                raise ValueError(
+                    f"could not place {r} resources in {RESOURCE_ATTEMPTS} attempts on a {cfg.width}x{cfg.height} map; "
+                    "lower resources_on_map or free up cells away from the walls and bases"
+                )
+            attempts += r * 2
+            cand = np.empty((pending.size, r * 2, 2), dtype=np.float64)
+            cand[..., 0] = self.rng.uniform(4, cfg.width - 5, size=(pending.size, r * 2))
+            cand[..., 1] = self.rng.uniform(2, cfg.height - 3, size=(pending.size, r * 2))
+            tx = cand[..., 0].astype(np.int64)
+            ty = cand[..., 1].astype(np.int64)
+            ok = ~self.wall_map[tx, ty]
+            for b in self.bases:
+                ok &= np.hypot(cand[..., 0] - b[0], cand[..., 1] - b[1]) >= 4
+            for row, g in enumerate(pending):
+                valid = cand[row][ok[row]]
+                take = min(r - filled[g], len(valid))
+                out[g, filled[g]:filled[g] + take] = valid[:take]
+                filled[g] += take
+            pending = pending[filled[pending] < r]
+        return out
+
+    # ------------------------------------------------------------------- utils
+    def _blocked(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        cfg = self.cfg
+        out = (x < 0.5) | (y < 0.5) | (x > cfg.width - 1.5) | (y > cfg.height - 1.5)
+        tx = np.clip(x.astype(np.int64), 0, cfg.width - 1)
+        ty = np.clip(y.astype(np.int64), 0, cfg.height - 1)
+        return out | self.wall_map[tx, ty]
+
+    def _nearest_resource(self, idx: np.ndarray, pos: np.ndarray):
+        """Index of and distance to the nearest alive resource; distance is inf when none."""
+        d = np.hypot(self.res_pos[idx, :, 0] - pos[:, None, 0], self.res_pos[idx, :, 1] - pos[:, None, 1])
+        d = np.where(self.res_alive[idx], d, np.inf)
+        ridx = np.argmin(d, axis=1)
+        return ridx, d[np.arange(idx.size), ridx]
+
+    # ------------------------------------------------------------------- rules
+    def _move(self, idx: np.ndarray, team: int, action: np.ndarray, dt: float):
+        idx = idx[self.busy[idx, team] <= 0]
+        if idx.size == 0:
+            return
+        action = action[idx]
+        speed = self.cfg.move_speed * (1.0 + 0.25 * self.weapon_level[idx, team])
+        x = self.pos[idx, team, 0]
+        y = self.pos[idx, team, 1]
+        nx = x + _ACTION_DX[action] * speed * dt
+        ny = y + _ACTION_DY[action] * speed * dt
+        x = np.where(self._blocked(nx, y), x, nx)
+        y = np.where(self._blocked(x, ny), y, ny)
+        self.pos[idx, team, 0] = x
+        self.pos[idx, team, 1] = y
+
+    def _gather(self, idx: np.ndarray, team: int):
+        idx = idx[self.busy[idx, team] <= 0]
+        if idx.size == 0:
+            return
+        ridx, d = self._nearest_resource(idx, self.pos[idx, team])
+        ok = d <= 1.0
+        idx, ridx = idx[ok], ridx[ok]
+        self.busy[idx, team] = self.cfg.gather_time_s
+        self.res_alive[idx, ridx] = False
+        self.res_respawn[idx, ridx] = self.cfg.resource_respawn_s
+        self.resources[idx, team] += 1
+
+    def _craft(self, idx: np.ndarray, team: int):
+        cfg = self.cfg
+        p = self.pos[idx, team]
+        ok = (
+            (self.busy[idx, team] <= 0)
+            & (np.hypot(p[:, 0] - self.bases[team, 0], p[:, 1] - self.bases[team, 1]) <= 1.5)
+            & (self.resources[idx, team] >= cfg.craft_cost)
+        )
+        idx = idx[ok]
+        self.busy[idx, team] = cfg.craft_time_s
+        self.resources[idx, team] -= cfg.craft_cost
+        self.weapon_level[idx, team] = np.minimum(self.weapon_level[idx, team] + 1, 3)
+
+    def _attack(self, idx: np.ndarray, team: int):
+        cfg = self.cfg
+        enemy = 1 - team
+        a, e = self.pos[idx, team], self.pos[idx, enemy]
+        ok = (
+            (self.busy[idx, team] <= 0)
+            & (self.cooldown[idx, team] <= 0)
+            & (self.hp[idx, enemy] > 0)
+            & (np.hypot(a[:, 0] - e[:, 0], a[:, 1] - e[:, 1]) <= cfg.attack_range)
+        )
+        idx = idx[ok]
+        if idx.size == 0:
+            return
+        dmg = cfg.attack_damage + 10 * self.weapon_level[idx, team]
+        self.hp[idx, enemy] = np.maximum(0, self.hp[idx, enemy] - dmg)
+        self.cooldown[idx, team] = cfg.attack_cooldown_s
+
+        killed = idx[self.hp[idx, enemy] == 0]
+        if killed.size == 0:
+            return
+        # The enemy can only be carrying our jewel: drop it where they fell.
+        drop = killed[self.jewel_carrier[killed, team] == enemy]
+        self.jewel_carrier[drop, team] = -1
+        self.jewel_at_home[drop, team] = False
+        self.jewel_pos[drop, team] = self.pos[drop, enemy]
+        # respawn enemy with a weapon setback
+        self.pos[killed, enemy] = self.spawn[enemy]
+        self.hp[killed, enemy] = cfg.max_hp
+        self.has_jewel[killed, enemy] = False
+        self.weapon_level[killed, enemy] = np.maximum(0, self.weapon_level[killed, enemy] - 1)
+
+    def _interact_jewel(self, idx: np.ndarray, team: int):
+        cfg = self.cfg
+        enemy = 1 - team
+        idx = idx[self.busy[idx, team] <= 0]
+        if idx.size == 0:
+            return
+        p = self.pos[idx, team]
+        carrying = self.has_jewel[idx, team]
+        at_base = np.hypot(p[:, 0] - self.bases[team, 0], p[:, 1] - self.bases[team, 1]) <= 1.5
+
+        deliver = idx[carrying & at_base]
+        if cfg.capture_hold_s <= 0:
+            win = deliver
+        else:
+            self.capture_hold[deliver, team] += 1.0 / cfg.fps
+            win = deliver[self.capture_hold[deliver, team] >= cfg.capture_hold_s]
+        self.done[win] = True
+        self.winner[win] = team
+        self.capture_hold[idx[carrying & ~at_base], team] = 0.0
+
+        jp = self.jewel_pos[idx, enemy]
+        pick = (
+            ~carrying
+            & (self.jewel_carrier[idx, enemy] < 0)
+            & (np.hypot(p[:, 0] - jp[:, 0], p[:, 1] - jp[:, 1]) <= 1.2)
+        )
+        pick = idx[pick]
+        self.jewel_carrier[pick, enemy] = team
+        self.jewel_at_home[pick, enemy] = False
+        self.has_jewel[pick, team] = True
+
+    def _apply_actions(self, team: int, actions: np.ndarray, active: np.ndarray, dt: float):
+        live = active & (self.hp[:, team] > 0)
+        move = np.flatnonzero(live & (actions >= 1) & (actions <= 4))
+        if move.size:
+            self._move(move, team, actions, dt)
+        for code, fn in ((5, self._gather), (6, self._craft), (7, self._attack), (8, self._interact_jewel)):
+            sel = np.flatnonzero(live & (actions == code))
+            if sel.size:
+                fn(sel, team)
+
+    # ------------------------------------------------------------------- API
+    def step(self, actions_team0: np.ndarray, actions_team1: np.ndarray, dt: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Advance every running game by ``dt`` seconds.
+
+        Returns ``done``/``winner`` arrays describing the tick that was just
+        simulated; with ``auto_reset`` those games already hold a fresh
+        episode when this returns.
+        """
+        cfg = self.cfg
+        dt = 1.0 / cfg.fps if dt is None else dt
+        a0 = np.asarray(actions_team0, dtype=np.int64).reshape(self.n)
+        a1 = np.asarray(actions_team1, dtype=np.int64).reshape(self.n)
+        a0 = np.where((a0 >= 0) & (a0 <= 8), a0, 0)
+        a1 = np.where((a1 >= 0) & (a1 <= 8), a1, 0)
+
+        active = ~self.done
+        act = active[:, None]
+        self.t[active] += dt
+        self.steps[active] += 1
+
+        self.cooldown = np.where(act, np.maximum(0.0, self.cooldown - dt), self.cooldown)
+        self.busy = np.where(act, np.maximum(0.0, self.busy - dt), self.busy)
+
+        dead = active[:, None] & ~self.res_alive
+        self.res_respawn = np.where(dead, self.res_respawn - dt, self.res_respawn)
+        back = dead & (self.res_respawn <= 0)
+        self.res_alive |= back
+        self.res_respawn[back] = 0.0
+
+        # carried jewels follow their carrier (jewel k is only ever carried by team 1-k)
+        for k in range(2):
+            follow = active & (self.jewel_carrier[:, k] >= 0)
+            self.jewel_pos[follow, k] = self.pos[follow, 1 - k]
+
+        self._apply_actions(0, a0, active, dt)
+        self._apply_actions(1, a1, active, dt)
+
+        # time limit: jewel carrier wins, resources as tiebreak
+        timeout = active & (self.t >= cfg.max_time_s)
+        if timeout.any():
+            j0, j1 = self.has_jewel[:, 0], self.has_jewel[:, 1]
+            by_res = np.where(self.resources[:, 0] >= self.resources[:, 1], 0, 1)
+            tw = np.where(j0 & ~j1, 0, np.where(j1 & ~j0, 1, by_res))
+            self.done |= timeout
+            self.winner = np.where(timeout, tw, self.winner)
+
+        info = {"done": self.done.copy(), "winner": self.winner.copy(), "steps": self.steps.copy()}
+        if self.auto_reset and self.done.any():
+            self.episodes += int(self.done.sum())
+            self.reset(mask=self.done)
+        return info
+
+    def get_obs(self, team: int) -> np.ndarray:
+        """Batched ``JewelWar.get_obs``: returns a float32 array of shape [B, 25]."""
+        cfg = self.cfg
+        enemy = 1 - team
+        w, h = float(cfg.width), float(cfg.height)
+        scale = np.array([w, h])
+        idx = np.arange(self.n)
+        a = self.pos[:, team]
+
+        ridx, rd = self._nearest_resource(idx, a)
+        has_res = np.isfinite(rd)
+        rpos = self.res_pos[idx, ridx] / scale
+        rpos[~has_res] = 0.0
+        rdist = np.where(has_res, np.minimum(1.0, rd / max(w, h)), 1.0)
+
+        obs = np.empty((self.n, 25), dtype=np.float32)
+        obs[:, 0:2] = a / scale
+        obs[:, 2:4] = self.pos[:, enemy] / scale
+        obs[:, 4:6] = self.jewel_pos[:, team] / scale
+        obs[:, 6:8] = self.jewel_pos[:, enemy] / scale
+        obs[:, 8:10] = self.bases[team] / scale
+        obs[:, 10:12] = self.bases[enemy] / scale
+        obs[:, 12:14] = rpos
+        obs[:, 14] = rdist
+        obs[:, 15] = self.hp[:, team] / cfg.max_hp
+        obs[:, 16] = self.hp[:, enemy] / cfg.max_hp
+        obs[:, 17] = np.minimum(1.0, self.resources[:, team] / 10.0)
+        obs[:, 18] = np.minimum(1.0, self.resources[:, enemy] / 10.0)
+        obs[:, 19] = self.has_jewel[:, team]
+        obs[:, 20] = self.has_jewel[:, enemy]
+        obs[:, 21] = self.weapon_level[:, team] / 3.0
+        obs[:, 22] = self.weapon_level[:, enemy] / 3.0
+        obs[:, 23] = np.minimum(1.0, self.cooldown[:, team] / 2.0)
+        obs[:, 24] = np.minimum(1.0, self.busy[:, team] / 2.0)
+        return obs
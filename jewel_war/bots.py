@@ -1,5 +1,9 @@
 import math
 from typing import Optional
+
+import numpy as np
+
+from .batch import JewelWarBatch
 from .core import JewelWar, dist, norm
 
 class ScriptBot:
@@ -62,3 +66,50 @@ class ScriptBot:
             return 4 if dx > 0 else 3
         else:
             return 2 if dy > 0 else 1
+
+
+class BatchScriptBot:
+    """Vectorized ``ScriptBot`` over a ``JewelWarBatch``; same priority cascade, one action per game."""
+    def __init__(self, aggressiveness: float = 0.6, seed: Optional[int] = None):
+        self.aggr = aggressiveness
+        self.rng = np.random.default_rng(seed)
+
+    def act(self, game: JewelWarBatch, team: int) -> np.ndarray:
+        cfg = game.cfg
+        enemy = 1 - team
+        pos = game.pos[:, team]
+        base = game.bases[team]
+        busy_free = game.busy[:, team] <= 0
+        d_enemy = np.hypot(*(pos - game.pos[:, enemy]).T)
+        d_base = np.hypot(*(pos - base).T)
+        jewel = game.jewel_pos[:, enemy]
+        d_jewel = np.hypot(*(pos - jewel).T)
+        jewel_free = game.jewel_carrier[:, enemy] < 0
+        res = game.resources[:, team]
+        rich = res >= cfg.craft_cost
+        roll = self.rng.random((2, game.n))
+
+        ridx, d_res = game._nearest_resource(np.arange(game.n), pos)
+        has_res = np.isfinite(d_res)
+        res_pos = game.res_pos[np.arange(game.n), ridx]
+
+        to_base = self._move_towards(pos, base)
+        conds = [
+            (d_enemy <= cfg.attack_range) & (game.cooldown[:, team] <= 0) & busy_free & (roll[0] < self.aggr),
+            game.has_jewel[:, team] & (d_base <= 1.5),
+            game.has_jewel[:, team],
+            jewel_free & (d_jewel <= 1.2),
+            jewel_free & ((game.weapon_level[:, team] >= 1) | (roll[1] < 0.15)),
+            rich & (d_base <= 1.5) & busy_free,
+            rich & (game.weapon_level[:, team] < 2),
+            busy_free & has_res & (d_res <= 1.0),
+            busy_free & has_res,
+        ]
+        choices = [7, 8, to_base, 8, self._move_towards(pos, jewel), 6, to_base, 5, self._move_towards(pos, res_pos)]
+        return np.select(conds, choices, default=0)
+
+    @staticmethod
+    def _move_towards(pos: np.ndarray, target: np.ndarray) -> np.ndarray:
+        dx = target[..., 0] - pos[:, 0]
+        dy = target[..., 1] - pos[:, 1]
+        return np.where(np.abs(dx) > np.abs(dy), np.where(dx > 0, 4, 3), np.where(dy > 0, 2, 1))
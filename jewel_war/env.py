@@ -130,8 +130,15 @@ class JewelWarEnv(gym.Env):
         return obs, float(reward), terminated, truncated, info
 
     def render(self):
-        # Rendering is handled by the separate pygame runner in scripts/.
-        return None
+        # "human" rendering is handled by the separate pygame runner in scripts/.
+        if self.render_mode != "rgb_array":
+            return None
+        if self._renderer is None:
+            from .rgb_render import JewelWarRgbRenderer
+
+            self._renderer = JewelWarRgbRenderer(self.cfg)
+        # copy: wrappers such as RecordVideo keep every frame
+        return self._renderer.render(self.game).copy()
 
     def close(self):
         self._renderer = None
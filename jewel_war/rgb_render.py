@@ -0,0 +1,134 @@
+"""
+Off-screen ``rgb_array`` rendering for ``JewelWarEnv`` with NumPy only.
+
+``RgbCanvas`` is also used by the V2 renderer (worldwar_jewel/ai/rgb_render.py),
+which builds on this module; nothing here imports the V2 package.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+
+
+class RgbCanvas:
+    """An HxWx3 uint8 frame over a cached background/layer, with vectorized shape stamping."""
+
+    def __init__(self, width_px: int, height_px: int):
+        self.w = width_px
+        self.h = height_px
+        self.background = np.zeros((height_px, width_px, 3), dtype=np.uint8)
+        self.layer = np.zeros_like(self.background)  # background + slow-changing entities
+        self.frame = np.zeros_like(self.background)
+        self.layer_key = None  # whatever the owner drew the layer from
+        self._masks: Dict[Tuple[str, int], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+    def _mask(self, shape: str, r: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(dy, dx, flat offset) of every pixel in the shape."""
+        key = (shape, r)
+        if key not in self._masks:
+            dy, dx = np.mgrid[-r : r + 1, -r : r + 1]
+            keep = (dx * dx + dy * dy <= r * r + r) if shape == "disc" else np.ones_like(dx, dtype=bool)
+            dy, dx = dy[keep].astype(np.intp), dx[keep].astype(np.intp)
+            self._masks[key] = (dy, dx, dy * self.w + dx)
+        return self._masks[key]
+
+    def reset_layer(self) -> np.ndarray:
+        np.copyto(self.layer, self.background)
+        return self.layer
+
+    def begin(self) -> np.ndarray:
+        np.copyto(self.frame, self.layer)
+        return self.frame
+
+    def stamp(self, centers: np.ndarray, r: int, colors, shape: str = "disc", out: np.ndarray | None = None):
+        """Draw a ``shape`` of radius ``r`` (px) at every ``centers`` row (x, y px) into ``out`` (default: the frame);
+        ``colors`` is one RGB or one per centre."""
+        centers = np.asarray(centers).reshape(-1, 2).astype(np.intp)
+        if not len(centers):
+            return
+        r = max(0, r)
+        dy, dx, off = self._mask(shape, r)
+        cx, cy = centers[:, 0:1], centers[:, 1:2]
+        idx = cy * self.w + cx + off
+        colors = np.asarray(colors, dtype=np.uint8)
+        flat = (self.frame if out is None else out).reshape(-1, 3)
+        lo, hi = centers.min(0), centers.max(0)
+        # bounds masking only when some shape touches the frame edge
+        if lo[0] < r or lo[1] < r or hi[0] >= self.w - r or hi[1] >= self.h - r:
+            ys, xs = cy + dy, cx + dx
+            ok = (ys >= 0) & (ys < self.h) & (xs >= 0) & (xs < self.w)
+            if colors.ndim > 1:
+                colors = np.broadcast_to(colors[:, None, :], idx.shape + (3,))[ok]
+            flat[idx[ok]] = colors
+        else:
+            flat[idx] = colors[:, None, :] if colors.ndim > 1 else colors
+
+    def fill_tiles(self, tiles: np.ndarray, tile: int, color):
+        """Fill whole grid cells of the background (``tiles`` rows are (tx, ty))."""
+        for tx, ty in np.asarray(tiles, dtype=np.int32).reshape(-1, 2):
+            self.background[ty * tile : (ty + 1) * tile, tx * tile : (tx + 1) * tile] = color
+
+    def grid(self, tile: int, color):
+        self.background[::tile, :] = color
+        self.background[:, ::tile] = color
+
+
+class JewelWarRgbRenderer:
+    """Legacy ``JewelWar`` -> RGB frame, same palette as scripts/play.py."""
+
+    TEAM = np.array([(70, 120, 255), (255, 90, 90)], dtype=np.uint8)
+    JEWEL = np.array([(120, 170, 255), (255, 140, 140)], dtype=np.uint8)
+
+    def __init__(self, cfg, tile: int = 16):
+        self.cfg = cfg
+        self.tile = tile
+        self.canvas = RgbCanvas(cfg.width * tile, cfg.height * tile)
+        self._walls = None
+
+    def _build_terrain(self, game):
+        c = self.canvas
+        t = self.tile
+        c.background[:] = (18, 18, 22)
+        c.grid(t, (25, 25, 30))
+        if game.walls:
+            c.fill_tiles(np.array(sorted(game.walls)), t, (60, 60, 70))
+        for i, (bx, by) in enumerate(game.bases):
+            x0, y0, x1, y1 = int((bx - 0.8) * t), int((by - 0.8) * t), int((bx + 0.8) * t), int((by + 0.8) * t)
+            col = self.TEAM[i % 2]
+            c.background[y0 : y0 + 2, x0:x1] = col
+            c.background[y1 - 2 : y1, x0:x1] = col
+            c.background[y0:y1, x0 : x0 + 2] = col
+            c.background[y0:y1, x1 - 2 : x1] = col
+        c.layer_key = None
+        self._walls = game.walls
+
+    def render(self, game) -> np.ndarray:
+        if game.walls is not self._walls:
+            self._build_terrain(game)
+        t = self.tile
+        c = self.canvas
+        res = [r.pos for r in game.resources if r.alive]
+        if res != c.layer_key:
+            layer = c.reset_layer()
+            if res:
+                c.stamp(np.array(res) * t, max(1, int(t * 0.2)), (90, 180, 90), out=layer)
+            c.layer_key = res
+        frame = c.begin()
+        jewels = game.jewels
+        c.stamp(np.array([j.pos for j in jewels]) * t, max(1, int(t * 0.32)), self.JEWEL[[j.home_team % 2 for j in jewels]])
+        agents = game.agents
+        pos = np.array([a.pos for a in agents]) * t
+        c.stamp(pos, max(1, int(t * 0.38)), self.TEAM[: len(agents)])
+        carriers = pos[[a.has_jewel for a in agents]]
+        if len(carriers):
+            c.stamp(carriers - (0, t * 0.56), max(1, int(t * 0.19)), (255, 230, 120))
+        # hp bars under each agent
+        bw = max(2, int(t * 0.94))
+        for a, (x, y) in zip(agents, pos.astype(int)):
+            y0 = y + int(t * 0.5)
+            x0 = x - bw // 2
+            if 0 <= y0 < c.h - 2:
+                hpw = int(bw * max(0, a.hp) / self.cfg.max_hp)
+                frame[y0 : y0 + 2, max(0, x0) : max(0, x0 + bw)] = (40, 40, 40)
+                frame[y0 : y0 + 2, max(0, x0) : max(0, x0 + hpw)] = (80, 220, 120)
+        return frame
@@ -0,0 +1,19 @@
+import argparse
+from pathlib import Path
+
+from worldwar_jewel.ai.numpy_policy import export_sb3_policy
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Export an SB3 PPO zip to a torch-free .npz policy.")
+    ap.add_argument("--model", type=str, default="models/ppo_jewelwar.zip")
+    ap.add_argument("--out", type=str, default="", help="Output .npz (default: next to the model)")
+    args = ap.parse_args()
+
+    out = args.out or str(Path(args.model).with_suffix(".npz"))
+    path = export_sb3_policy(args.model, out)
+    print(f"Exported policy to {path} ({path.stat().st_size / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,42 +8,71 @@ from jewel_war.config import GameConfig
 from jewel_war.core import JewelWar
 from jewel_war.bots import ScriptBot
 
-try:
-    from stable_baselines3 import PPO
-except Exception:
-    PPO = None
-
 
 def load_ai(path: str):
-    if PPO is None:
-        raise RuntimeError("stable-baselines3 not installed. Install requirements.txt")
+    """Load an exported .npz policy (NumPy only) or, for .zip, fall back to stable-baselines3."""
+    if path.endswith(".npz"):
+        from worldwar_jewel.ai.numpy_policy import NumpyPolicy
+
+        return NumpyPolicy(path)
+    try:
+        from stable_baselines3 import PPO
+    except Exception:
+        raise RuntimeError("stable-baselines3 not installed. Install requirements.txt or export the model with scripts/export_policy.py")
     return PPO.load(path)
 
 
-def draw_world(screen, cfg: GameConfig, game: JewelWar, font):
-    tile = cfg.tile
-    screen.fill((18, 18, 22))
+def ai_action(model, obs) -> int:
+    if hasattr(model, "logits"):
+        return int(model.predict(obs, deterministic=True))
+    action, _ = model.predict(obs, deterministic=True)
+    return int(action)
+
+
+class StaticLayer:
+    """Grid, walls and base outlines: they never change within a game, so render them once per map."""
+
+    def __init__(self, cfg: GameConfig):
+        self.cfg = cfg
+        self.walls = None  # the game.walls the surface was drawn from
+        self.surf = None
+
+    def get(self, game: JewelWar) -> pygame.Surface:
+        if self.walls is game.walls:
+            return self.surf
+        cfg = self.cfg
+        tile = cfg.tile
+        surf = pygame.Surface((cfg.width*tile, cfg.height*tile)).convert()
+        surf.fill((18, 18, 22))
 
-    # draw grid background faint
-    for x in range(cfg.width):
-        pygame.draw.line(screen, (25, 25, 30), (x*tile, 0), (x*tile, cfg.height*tile))
-    for y in range(cfg.height):
-        pygame.draw.line(screen, (25, 25, 30), (0, y*tile), (cfg.width*tile, y*tile))
+        # draw grid background faint
+        for x in range(cfg.width):
+            pygame.draw.line(surf, (25, 25, 30), (x*tile, 0), (x*tile, cfg.height*tile))
+        for y in range(cfg.height):
+            pygame.draw.line(surf, (25, 25, 30), (0, y*tile), (cfg.width*tile, y*tile))
 
-    # walls
-    for (wx, wy) in game.walls:
-        pygame.draw.rect(screen, (60, 60, 70), pygame.Rect(wx*tile, wy*tile, tile, tile), border_radius=4)
+        # walls
+        for (wx, wy) in game.walls:
+            pygame.draw.rect(surf, (60, 60, 70), pygame.Rect(wx*tile, wy*tile, tile, tile), border_radius=4)
+
+        # bases
+        for i, b in enumerate(game.bases):
+            color = (70, 120, 255) if i == 0 else (255, 90, 90)
+            pygame.draw.rect(surf, color, pygame.Rect(int((b[0]-0.8)*tile), int((b[1]-0.8)*tile), int(1.6*tile), int(1.6*tile)), 2, border_radius=6)
+
+        self.walls, self.surf = game.walls, surf
+        return surf
+
+
+def draw_world(screen, cfg: GameConfig, game: JewelWar, font, static: StaticLayer):
+    tile = cfg.tile
+    screen.blit(static.get(game), (0, 0))
 
     # resources
     for r in game.resources:
         if r.alive:
             pygame.draw.circle(screen, (90, 180, 90), (int(r.pos[0]*tile), int(r.pos[1]*tile)), 6)
 
-    # bases
-    for i, b in enumerate(game.bases):
-        color = (70, 120, 255) if i == 0 else (255, 90, 90)
-        pygame.draw.rect(screen, color, pygame.Rect(int((b[0]-0.8)*tile), int((b[1]-0.8)*tile), int(1.6*tile), int(1.6*tile)), 2, border_radius=6)
-
     # jewels
     for j in game.jewels:
         if j.home_team == 0:
@@ -81,7 +110,7 @@ def draw_world(screen, cfg: GameConfig, game: JewelWar, font):
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--model", type=str, default="", help="Path to PPO model zip (trained). If empty, uses scripted bot for red.")
+    ap.add_argument("--model", type=str, default="", help="Path to exported .npz policy or PPO model zip. If empty, Blue uses the scripted bot.")
     ap.add_argument("--human", action="store_true", help="Control Blue with WASD. If not set, Blue also uses AI/script.")
     ap.add_argument("--seed", type=int, default=1)
     args = ap.parse_args()
@@ -92,6 +121,7 @@ def main():
     pygame.display.set_caption("Jewel War (Capture the Jewel)")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont("consolas", 18)
+    static = StaticLayer(cfg)
 
     game = JewelWar(cfg, seed=args.seed)
 
@@ -133,9 +163,7 @@ def main():
                 blue_action = 0
         else:
             if blue_ai is not None:
-                obs = game.get_obs(0)
-                blue_action, _ = blue_ai.predict(obs, deterministic=True)
-                blue_action = int(blue_action)
+                blue_action = ai_action(blue_ai, game.get_obs(0))
             else:
                 # scripted blue if no model and not human
                 blue_action = ScriptBot(aggressiveness=0.65).act(game, 0)
@@ -144,7 +172,7 @@ def main():
 
         game.step(blue_action, red_action, dt)
 
-        draw_world(screen, cfg, game, font)
+        draw_world(screen, cfg, game, font, static)
         pygame.display.flip()
         clock.tick(cfg.fps)
 
@@ -1,45 +1,157 @@
 import argparse
+import time
+from functools import partial
 from pathlib import Path
 
 from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.callbacks import BaseCallback, CallbackList, CheckpointCallback
 from stable_baselines3.common.monitor import Monitor
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
 
 from jewel_war.env import JewelWarEnv
 from jewel_war.config import GameConfig
 
+CKPT_PREFIX = "ppo_ckpt"
+
+
+def make_env(kind: str, aggr: float, seed: int):
+    """Top-level factory so SubprocVecEnv can pickle it."""
+    if kind == "v2":
+        from worldwar_jewel.ai.env import WorldWarEnv
+
+        env = WorldWarEnv(seed=seed)
+    else:
+        env = JewelWarEnv(cfg=GameConfig(), opponent_aggr=aggr, seed=seed)
+    return Monitor(env)
+
+
+def build_vec_env(kind: str, n_envs: int, aggr: float, seed: int):
+    fns = [partial(make_env, kind, aggr, seed + i) for i in range(n_envs)]
+    if n_envs > 1:
+        return SubprocVecEnv(fns, start_method="spawn")
+    return DummyVecEnv(fns)
+
+
+def latest_checkpoint(ckpt_dir: Path) -> Path | None:
+    """Newest checkpoint by step count (CheckpointCallback names them <prefix>_<steps>_steps.zip)."""
+    found = []
+    for p in ckpt_dir.glob(f"{CKPT_PREFIX}_*_steps.zip"):
+        try:
+            found.append((int(p.stem.split("_")[-2]), p))
+        except ValueError:
+            continue
+    return max(found)[1] if found else None
+
+
+class ThroughputCallback(BaseCallback):
+    """Logs env steps/sec, updates/sec and the rollout vs. optimization time split."""
+
+    def __init__(self, log_every: int = 1):
+        super().__init__()
+        self.log_every = max(1, log_every)
+        self._t_rollout_start = 0.0
+        self._t_rollout_end = None
+        self._steps_at_start = 0
+        self._rollout_s = 0.0
+        self._optim_s = 0.0
+        self._steps = 0
+        self._updates = 0
+        self._t0 = 0.0
+
+    def _on_training_start(self):
+        self._t0 = time.perf_counter()
+
+    def _on_rollout_start(self):
+        now = time.perf_counter()
+        if self._t_rollout_end is not None:
+            # time since the previous rollout ended was spent in model.train()
+            self._optim_s += now - self._t_rollout_end
+            self._updates += 1
+            if self._updates % self.log_every == 0:
+                self._log()
+        self._t_rollout_start = now
+        self._steps_at_start = self.num_timesteps
+
+    def _on_rollout_end(self):
+        self._t_rollout_end = time.perf_counter()
+        self._rollout_s += self._t_rollout_end - self._t_rollout_start
+        self._steps += self.num_timesteps - self._steps_at_start
+
+    def _on_step(self) -> bool:
+        return True
+
+    def _log(self):
+        wall = max(1e-9, time.perf_counter() - self._t0)
+        busy = max(1e-9, self._rollout_s + self._optim_s)
+        self.logger.record("throughput/env_steps_per_s", self._steps / wall)
+        self.logger.record("throughput/collect_steps_per_s", self._steps / max(1e-9, self._rollout_s))
+        self.logger.record("throughput/updates_per_s", self._updates / wall)
+        self.logger.record("throughput/rollout_frac", self._rollout_s / busy)
+        self.logger.record("throughput/optim_frac", self._optim_s / busy)
+
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--steps", type=int, default=300_000)
     ap.add_argument("--out", type=str, default="models/ppo_jewelwar")
     ap.add_argument("--aggr", type=float, default=0.65, help="Opponent aggressiveness")
+    ap.add_argument("--env", choices=["legacy", "v2"], default="legacy", help="legacy=JewelWarEnv, v2=WorldWarEnv")
+    ap.add_argument("--n-envs", type=int, default=1, help="Parallel envs (>1 runs each in its own process)")
+    ap.add_argument("--rollout", type=int, default=2048, help="Samples per PPO update, split across envs")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--ckpt-dir", type=str, default="", help="Checkpoint folder (default: <out>_ckpt)")
+    ap.add_argument("--ckpt-every", type=int, default=50_000, help="Save a checkpoint every N env steps (0 disables)")
+    ap.add_argument("--resume", type=str, default="", help="Checkpoint zip to resume from, or 'auto' for the latest in --ckpt-dir")
+    ap.add_argument("--allow-fresh", action="store_true", help="With --resume auto, start from scratch when --ckpt-dir has no checkpoint")
     args = ap.parse_args()
 
-    cfg = GameConfig()
-    env = JewelWarEnv(cfg=cfg, opponent_aggr=args.aggr)
-    env = Monitor(env)
+    n_envs = max(1, args.n_envs)
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    ckpt_dir = Path(args.ckpt_dir) if args.ckpt_dir else out_path.parent / f"{out_path.name}_ckpt"
+    ckpt_dir.mkdir(parents=True, exist_ok=True)
 
-    vec = DummyVecEnv([lambda: env])
+    resume = None
+    if args.resume == "auto":
+        resume = latest_checkpoint(ckpt_dir)
+        if resume is None:
+            if not args.allow_fresh:
+                ap.error(f"--resume auto: no {CKPT_PREFIX}_*_steps.zip in {ckpt_dir} (pass --allow-fresh to start from scratch)")
+            print(f"No checkpoint in {ckpt_dir}; starting a fresh run (--allow-fresh)")
+    elif args.resume:
+        resume = Path(args.resume)
 
-    model = PPO(
-        "MlpPolicy",
-        vec,
-        verbose=1,
-        n_steps=2048,
-        batch_size=256,
-        gamma=0.995,
-        gae_lambda=0.95,
-        learning_rate=3e-4,
-        clip_range=0.2,
-        ent_coef=0.01,
-    )
+    vec = build_vec_env(args.env, n_envs, args.aggr, args.seed)
 
-    model.learn(total_timesteps=args.steps)
+    if resume is not None:
+        model = PPO.load(str(resume), env=vec)
+        print(f"Resumed from {resume} at {model.num_timesteps} steps")
+    else:
+        model = PPO(
+            "MlpPolicy",
+            vec,
+            verbose=1,
+            n_steps=max(16, args.rollout // n_envs),
+            batch_size=256,
+            gamma=0.995,
+            gae_lambda=0.95,
+            learning_rate=3e-4,
+            clip_range=0.2,
+            ent_coef=0.01,
+            seed=args.seed,
+        )
 
-    out_path = Path(args.out)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    model.save(str(out_path))
+    callbacks = [ThroughputCallback()]
+    if args.ckpt_every > 0:
+        # save_freq counts vec-env steps, each of which is n_envs env steps
+        callbacks.append(CheckpointCallback(save_freq=max(1, args.ckpt_every // n_envs), save_path=str(ckpt_dir), name_prefix=CKPT_PREFIX))
+
+    remaining = max(0, args.steps - model.num_timesteps)
+    try:
+        model.learn(total_timesteps=remaining, callback=CallbackList(callbacks), reset_num_timesteps=resume is None)
+    finally:
+        model.save(str(out_path))
+        vec.close()
     print(f"Saved model to {out_path}.zip")
 
 
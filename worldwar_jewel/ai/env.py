@@ -1,36 +1,77 @@
+import random
+from typing import Dict, List
+
 import numpy as np
 import gymnasium as gym
 from gymnasium import spaces
 
+from worldwar_jewel import tracing
 from worldwar_jewel.ai.planner import SimplePlanner
 from worldwar_jewel.config import GameTuning
 from worldwar_jewel.game.world import ACTION_SHORTCUTS, ActionCommand, World
 
+# Observation: for each of 3 units -> pos(x,y), hp, has_jewel + closest enemy pos/hp + resources summary
+# shape: squad*(5) + enemy*(3) + resources(3) = 3*5 + 3*3 + 3 = 27
+OBS_DIM = 27
+
 
 class WorldWarEnv(gym.Env):
-    """Headless env controlling team 0 squad (3 units). Other teams use SimplePlanner."""
+    """Headless env controlling team 0 squad (3 units).
 
-    metadata = {"render_modes": []}
+    Other teams use SimplePlanner, or, once ``set_opponent_pool`` has been
+    given exported policy snapshots, a per-episode mix of planners and
+    snapshots (self-play league).
+    """
 
-    def __init__(self, cfg: GameTuning | None = None, seed: int | None = None):
+    metadata = {"render_modes": ["rgb_array"], "render_fps": 30}
+
+    def __init__(self, cfg: GameTuning | None = None, seed: int | None = None, render_mode: str | None = None):
         super().__init__()
         self.cfg = cfg or GameTuning()
+        self.render_mode = render_mode
+        self._renderer = None
         self.seed_val = seed
         self.world = World(self.cfg, seed=seed)
         self.opponents = [SimplePlanner(tid) for tid in range(1, self.cfg.team_count)]
+        self.opponent_policies: Dict[int, object] = {}
+        self._pool: List[str] = []
+        self._pool_cache: Dict[str, object] = {}
+        self._planner_prob = 1.0
+        self._league_rng = random.Random(seed)
         self.squad_size = self.cfg.squad_size
         self.action_space = spaces.MultiDiscrete([len(ACTION_SHORTCUTS)] * self.squad_size)
-        # Observation: for each of 3 units -> pos(x,y), hp, has_jewel + closest enemy pos/hp + resources summary
-        # shape: squad*(5) + enemy*(3) + resources(3) = 3*5 + 3*3 + 3 = 27
-        self.observation_space = spaces.Box(low=0.0, high=1.0, shape=(27,), dtype=np.float32)
+        self.observation_space = spaces.Box(low=0.0, high=1.0, shape=(OBS_DIM,), dtype=np.float32)
 
     def reset(self, *, seed=None, options=None):
         super().reset(seed=seed)
         self.world = World(self.cfg, seed=seed or self.seed_val)
         self.opponents = [SimplePlanner(tid) for tid in range(1, self.cfg.team_count)]
+        self._draw_opponents()
         obs = self._obs()
         return obs, {}
 
+    def set_opponent_pool(self, paths: List[str], planner_prob: float = 0.5):
+        """Exported ``.npz`` snapshots to sample opponents from; applies from the next reset."""
+        self._pool = list(paths)
+        self._planner_prob = planner_prob
+        for stale in set(self._pool_cache) - set(self._pool):
+            del self._pool_cache[stale]
+
+    def _draw_opponents(self):
+        self.opponent_policies = {}
+        if not self._pool:
+            return
+        from worldwar_jewel.ai.numpy_policy import NumpyPolicy
+
+        for planner in list(self.opponents):
+            if self._league_rng.random() < self._planner_prob:
+                continue
+            path = self._league_rng.choice(self._pool)
+            if path not in self._pool_cache:
+                self._pool_cache[path] = NumpyPolicy(path)
+            self.opponent_policies[planner.team_id] = self._pool_cache[path]
+
+    @tracing.traced("WorldWarEnv.step", "env")
     def step(self, action):
         dt = 1.0 / self.cfg.fps
         act_dict = {}
@@ -38,22 +79,27 @@ class WorldWarEnv(gym.Env):
         for idx, a in enumerate(action):
             act_dict[(0, idx)] = int(a)
         for opp in self.opponents:
-            act_dict.update(opp.act(self.world))
+            policy = self.opponent_policies.get(opp.team_id)
+            if policy is None:
+                act_dict.update(opp.act(self.world))
+                continue
+            for idx, a in enumerate(policy.predict(self._obs(opp.team_id), deterministic=False)):
+                act_dict[(opp.team_id, idx)] = int(a)
         self.world.step(act_dict, dt)
         obs = self._obs()
         reward = self._reward()
         terminated = self.world.done
         truncated = False
-        info = {"winner": self.world.winner}
+        info = {"winner": self.world.winner, "stop_reason": self.world.stop_reason}
         return obs, reward, terminated, truncated, info
 
-    def _obs(self):
-        t0_units = self.world.get_team_units(0)
+    def _obs(self, team_id: int = 0):
+        t0_units = self.world.get_team_units(team_id)
         # pad to squad size
         while len(t0_units) < self.squad_size:
             t0_units.append(t0_units[-1])
         # pick nearest enemy aggregate
-        enemies = [u for u in self.world.units if u.team_id != 0 and u.is_alive()]
+        enemies = self.world.visible_enemies(team_id)
         enemy_summary = []
         for i in range(3):
             if i < len(enemies):
@@ -79,7 +125,7 @@ class WorldWarEnv(gym.Env):
                     0.0,  # reserved slot for future perk/weapon level
                 ]
             )
-        res = self.world.teams[0].resources
+        res = self.world.teams[team_id].resources
         obs_vec.extend(
             [
                 min(1.0, res.get("wood", 0) / 50.0),
@@ -90,17 +136,29 @@ class WorldWarEnv(gym.Env):
         obs_vec.extend(enemy_summary)
         return np.array(obs_vec, dtype=np.float32)
 
-    def _reward(self) -> float:
+    def _reward(self, team_id: int = 0) -> float:
         # Reward shaping: slight bonus for resources, heavy for win/lose.
-        team = self.world.teams[0]
+        team = self.world.teams[team_id]
         res_score = team.resources.get("wood", 0) * 0.01 + team.resources.get("metal", 0) * 0.02
-        jewel_bonus = 0.2 if any(u.has_jewel for u in self.world.units if u.team_id == 0) else 0.0
+        jewel_bonus = 0.2 if any(u.has_jewel for u in self.world.units if u.team_id == team_id) else 0.0
         if self.world.done:
-            if self.world.winner == 0:
+            if self.world.winner == team_id:
                 return 5.0 + res_score + jewel_bonus
             return -5.0 + res_score + jewel_bonus
         return res_score + jewel_bonus
 
     def render(self):
-        return None
+        if self.render_mode != "rgb_array":
+            return None
+        if self._renderer is None:
+            from worldwar_jewel.ai.rgb_render import WorldRgbRenderer
+
+            self._renderer = WorldRgbRenderer(self.cfg)
+        # copy: wrappers such as RecordVideo keep every frame
+        return self._renderer.render(self.world).copy()
+
+    def close(self):
+        self._renderer = None
+        # vec-env subprocesses exit without running atexit, so spans would be lost
+        tracing.flush()
 
@@ -0,0 +1,128 @@
+"""
+Torch-free inference for trained PPO MLP policies.
+
+``export_sb3_policy`` (needs stable-baselines3/torch, run once offline) dumps the
+actor of a saved model into a small ``.npz``; ``NumpyPolicy`` loads that file
+and runs the forward pass with plain NumPy, batched over any number of rows.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+_ACTIVATIONS = {
+    "tanh": np.tanh,
+    "relu": lambda x: np.maximum(x, 0.0),
+    "elu": lambda x: np.where(x > 0, x, np.expm1(np.minimum(x, 0.0))),
+    "leakyrelu": lambda x: np.where(x > 0, x, 0.01 * x),
+    "identity": lambda x: x,
+}
+
+
+def export_sb3_policy(model_path: str | Path, out_path: str | Path) -> Path:
+    """Write the actor MLP + action head of an SB3 PPO zip to ``out_path`` (.npz)."""
+    from stable_baselines3 import PPO
+
+    return export_model_policy(PPO.load(str(model_path), device="cpu"), out_path)
+
+
+def export_model_policy(model, out_path: str | Path) -> Path:
+    """Same as ``export_sb3_policy`` for an already loaded (or training) SB3 model."""
+    from gymnasium import spaces
+    from torch import nn
+
+    policy = model.policy
+    arrays: Dict[str, np.ndarray] = {}
+    layers = 0
+    activation = "identity"
+    for module in policy.mlp_extractor.policy_net:
+        if isinstance(module, nn.Linear):
+            arrays[f"w{layers}"] = module.weight.detach().cpu().numpy().astype(np.float32)
+            arrays[f"b{layers}"] = module.bias.detach().cpu().numpy().astype(np.float32)
+            layers += 1
+        else:
+            activation = type(module).__name__.lower()
+    if activation not in _ACTIVATIONS:
+        raise ValueError(f"Unsupported activation for NumPy export: {activation}")
+    arrays["action_w"] = policy.action_net.weight.detach().cpu().numpy().astype(np.float32)
+    arrays["action_b"] = policy.action_net.bias.detach().cpu().numpy().astype(np.float32)
+
+    space = model.action_space
+    if isinstance(space, spaces.Discrete):
+        kind, nvec = "discrete", [int(space.n)]
+    elif isinstance(space, spaces.MultiDiscrete):
+        kind, nvec = "multidiscrete", [int(n) for n in space.nvec]
+    elif isinstance(space, spaces.Box):
+        kind, nvec = "box", [int(np.prod(space.shape))]
+        arrays["low"] = space.low.astype(np.float32).ravel()
+        arrays["high"] = space.high.astype(np.float32).ravel()
+        arrays["log_std"] = policy.log_std.detach().cpu().numpy().astype(np.float32).ravel()
+    else:
+        raise ValueError(f"Unsupported action space for NumPy export: {space}")
+
+    meta = {
+        "layers": layers,
+        "activation": activation,
+        "action": kind,
+        "nvec": nvec,
+        "obs_dim": int(np.prod(model.observation_space.shape)),
+    }
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+    out = Path(out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(out, **arrays)
+    return out if out.suffix == ".npz" else out.with_name(out.name + ".npz")
+
+
+class NumpyPolicy:
+    """Pure-NumPy actor forward pass for exported policies."""
+
+    def __init__(self, path: str | Path, seed: int | None = None):
+        with np.load(str(path)) as data:
+            meta = json.loads(bytes(data["meta"]).decode("utf-8"))
+            # store transposed so the hot path is a plain (N, in) @ (in, out)
+            self.weights: List[Tuple[np.ndarray, np.ndarray]] = [
+                (np.ascontiguousarray(data[f"w{i}"].T), data[f"b{i}"]) for i in range(meta["layers"])
+            ]
+            self.action_w = np.ascontiguousarray(data["action_w"].T)
+            self.action_b = data["action_b"]
+            self.low = data["low"] if "low" in data else None
+            self.high = data["high"] if "high" in data else None
+            self.std = np.exp(data["log_std"]) if "log_std" in data else None
+        self.meta = meta
+        self.obs_dim: int = meta["obs_dim"]
+        self.kind: str = meta["action"]
+        self.nvec: List[int] = meta["nvec"]
+        self._splits = np.cumsum(self.nvec)[:-1]
+        self._act = _ACTIVATIONS[meta["activation"]]
+        self.rng = np.random.default_rng(seed)
+
+    def logits(self, obs: np.ndarray) -> np.ndarray:
+        """Raw action-head output for a [N, obs_dim] (or [obs_dim]) batch."""
+        x = np.asarray(obs, dtype=np.float32).reshape(-1, self.obs_dim)
+        for w, b in self.weights:
+            x = self._act(x @ w + b)
+        return x @ self.action_w + self.action_b
+
+    def predict(self, obs: np.ndarray, deterministic: bool = True) -> np.ndarray:
+        """Mirror of ``PPO.predict`` without the state tuple; keeps the batch dim of ``obs``."""
+        single = np.ndim(obs) == 1
+        out = self.logits(obs)
+        if self.kind == "box":
+            act = out if deterministic else out + self.std * self.rng.standard_normal(out.shape).astype(np.float32)
+            act = np.clip(act, self.low, self.high)
+        elif self.kind == "discrete":
+            act = self._pick(out, deterministic)
+        else:
+            parts = np.split(out, self._splits, axis=1)
+            act = np.stack([self._pick(p, deterministic) for p in parts], axis=1)
+        return act[0] if single else act
+
+    def _pick(self, logits: np.ndarray, deterministic: bool) -> np.ndarray:
+        if deterministic:
+            return np.argmax(logits, axis=1)
+        # Gumbel-max sampling == drawing from softmax(logits)
+        g = -np.log(-np.log(self.rng.random(logits.shape) + 1e-12) + 1e-12)
+        return np.argmax(logits + g, axis=1)
@@ -4,6 +4,7 @@ from typing import Dict, Tuple
 
 from worldwar_jewel.game.world import ActionCommand, World
 from worldwar_jewel.game.pathfinding import a_star
+from worldwar_jewel.tracing import traced
 
 Vec2 = Tuple[float, float]
 
@@ -23,6 +24,7 @@ class SimplePlanner:
         self.team_id = team_id
         self.rng = random.Random(team_id * 991)
 
+    @traced("SimplePlanner.act", "ai")
     def act(self, world: World) -> Dict[Tuple[int, int], ActionCommand]:
         actions: Dict[Tuple[int, int], ActionCommand] = {}
         team_units = world.get_team_units(self.team_id)
@@ -53,13 +55,19 @@ class SimplePlanner:
 
             # scout: try steal jewel
             if u.cls_id == "scout":
-                target_jewel = next((j for j in world.jewels if j.home_team != self.team_id and j.carried_by is None), None)
+                target_jewel = next((j for j in world.visible_jewels(self.team_id) if j.home_team != self.team_id and j.carried_by is None), None)
                 if target_jewel:
                     if math.hypot(u.pos[0] - target_jewel.pos[0], u.pos[1] - target_jewel.pos[1]) <= 1.2:
                         actions[(self.team_id, idx)] = ActionCommand(kind="interact")
                     else:
                         actions[(self.team_id, idx)] = self._step_towards(world, u, target_jewel.pos)
                     continue
+                if world.visibility is not None:
+                    # fog of war, no jewel in sight: scout the first enemy base still standing
+                    enemy = next((tid for tid, t in world.teams.items() if tid != self.team_id and not t.eliminated), None)
+                    if enemy is not None:
+                        actions[(self.team_id, idx)] = self._step_towards(world, u, world.layout.bases[enemy])
+                        continue
             # assault default: attack nearest enemy or building
             actions[(self.team_id, idx)] = ActionCommand(kind="attack")
         return actions
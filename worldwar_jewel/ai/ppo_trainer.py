@@ -0,0 +1,181 @@
+"""
+PPO training on ``WorldWarEnv`` for the "Treinar IA" screen.
+
+Runs inside the training worker process: envs live in their own subprocesses,
+checkpoints are exported to NumPy snapshots that the envs sample as self-play
+opponents, and progress is reported through the worker's ``push`` callback.
+"""
+
+import os
+import time
+from collections import deque
+from functools import partial
+from pathlib import Path
+from typing import Callable, Dict, List
+
+SNAPSHOT_PREFIX = "snapshot"
+CKPT_PREFIX = "ckpt"
+
+
+def _step_of(path: Path) -> int:
+    """Step count in ``ckpt_<n>_steps.zip`` / ``snapshot_<n>.npz``."""
+    return int(path.stem.split("_")[1])
+
+
+def _prune(out_dir: Path, pattern: str, keep: int):
+    """Delete all but the ``keep`` most recent files matching ``pattern``."""
+    found = sorted(out_dir.glob(pattern), key=_step_of)
+    for old in found[: -keep if keep > 0 else None]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+
+
+def _make_env(seed: int, tuning, trace_dir: str = ""):
+    from stable_baselines3.common.monitor import Monitor
+
+    from worldwar_jewel import tracing
+    from worldwar_jewel.ai.env import WorldWarEnv
+
+    if trace_dir:
+        # runs in the env subprocess: its World.step phases, planners and A* get their own trace file
+        tracing.enable(trace_dir, "ppo_env")
+    return Monitor(WorldWarEnv(tuning, seed=seed))
+
+
+def _build_callback(cfg, push: Callable[[Dict], None], stop_event, out_dir: Path, snapshots: List[str] | None):
+    """``snapshots`` is the live self-play pool, or None when opponents are planners only."""
+    from stable_baselines3.common.callbacks import BaseCallback
+
+    from worldwar_jewel.ai.numpy_policy import export_model_policy
+
+    class _WorkerCallback(BaseCallback):
+        """Progress messages, checkpoints/snapshots and cooperative stop."""
+
+        def __init__(self):
+            super().__init__()
+            self.results = deque(maxlen=100)
+            self.t0 = time.perf_counter()
+            self.start_steps = 0
+            self.last_push = 0.0
+            self.last_ckpt = 0
+            self.episodes = 0
+
+        def _on_training_start(self):
+            # learn(reset_num_timesteps=False): a resumed model counts earlier sessions' steps too
+            self.t0 = time.perf_counter()
+            self.start_steps = self.last_ckpt = self.num_timesteps
+
+        def _on_step(self) -> bool:
+            for done, info in zip(self.locals["dones"], self.locals["infos"]):
+                if done:
+                    self.episodes += 1
+                    self.results.append(1.0 if info.get("winner") == 0 else 0.0)
+            if cfg.ckpt_every > 0 and self.num_timesteps - self.last_ckpt >= cfg.ckpt_every:
+                self.last_ckpt = self.num_timesteps
+                self._checkpoint()
+            now = time.perf_counter()
+            if now - self.last_push >= 1.0:
+                self.last_push = now
+                push(self._progress(now))
+            if stop_event is not None and stop_event.is_set():
+                return False
+            return not (cfg.time_budget_s > 0 and now - self.t0 >= cfg.time_budget_s)
+
+        def _checkpoint(self):
+            ckpt = out_dir / f"{CKPT_PREFIX}_{self.num_timesteps}_steps"
+            self.model.save(str(ckpt))
+            _prune(out_dir, f"{CKPT_PREFIX}_*_steps.zip", cfg.ckpt_keep)
+            if snapshots is not None:
+                snap = export_model_policy(self.model, out_dir / f"{SNAPSHOT_PREFIX}_{self.num_timesteps}.npz")
+                snapshots.append(str(snap))
+                del snapshots[: -cfg.snapshot_pool]
+                # envs drop their cached copies of trimmed snapshots here, so the files can go
+                self.training_env.env_method("set_opponent_pool", list(snapshots), cfg.planner_prob)
+                _prune(out_dir, f"{SNAPSHOT_PREFIX}_*.npz", cfg.snapshot_pool)
+            push({"status": "checkpoint", "path": f"{ckpt}.zip", "steps": self.num_timesteps})
+
+        def win_rate(self) -> float:
+            return sum(self.results) / len(self.results) if self.results else 0.0
+
+        def _progress(self, now: float) -> Dict:
+            rate = self.win_rate()
+            return {
+                "status": "progress",
+                "steps": self.num_timesteps,
+                "episode": self.episodes,
+                "samples_per_s": (self.num_timesteps - self.start_steps) / max(now - self.t0, 1e-9),
+                "win_rate": rate,
+                "wins": {0: rate},
+                "snapshots": len(snapshots or ()),
+            }
+
+    return _WorkerCallback()
+
+
+def train_ppo(cfg, push: Callable[[Dict], None], stop_event=None) -> Dict:
+    """Train until ``cfg.total_steps``, the time budget or ``stop_event``; always saves the model."""
+    try:
+        from stable_baselines3 import PPO
+        from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+    except Exception as exc:
+        push({"status": "error", "message": f"stable-baselines3 indisponivel: {exc}"})
+        return {}
+
+    try:
+        # Keep the UI process responsive: training yields the CPU to it.
+        os.nice(5)
+    except (AttributeError, OSError):
+        pass
+    cores = os.cpu_count() or 1
+    n_envs = cfg.n_envs if cfg.n_envs > 0 else max(1, cores - 1)
+    try:
+        import torch
+
+        torch.set_num_threads(max(1, cores - n_envs))
+    except Exception:
+        pass
+
+    out_dir = Path(cfg.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    snapshots = None
+    if cfg.opponents == "selfplay" and cfg.snapshot_pool > 0:
+        # oldest first, by step count, so trimming keeps the most recent ones
+        found = sorted(out_dir.glob(f"{SNAPSHOT_PREFIX}_*.npz"), key=_step_of)
+        snapshots = [str(p) for p in found[-cfg.snapshot_pool :]]
+
+    from worldwar_jewel.ai.train_worker import episode_tuning
+
+    tuning = episode_tuning(cfg)
+    fns = [partial(_make_env, cfg.seed + i, tuning, cfg.trace_dir) for i in range(n_envs)]
+    vec = SubprocVecEnv(fns, start_method="spawn") if n_envs > 1 else DummyVecEnv(fns)
+    if snapshots:
+        vec.env_method("set_opponent_pool", snapshots, cfg.planner_prob)
+
+    model_path = out_dir / "ppo_worldwar"
+    if Path(f"{model_path}.zip").exists():
+        model = PPO.load(str(model_path), env=vec)
+    else:
+        model = PPO(
+            "MlpPolicy",
+            vec,
+            n_steps=max(16, 2048 // n_envs),
+            batch_size=256,
+            gamma=0.995,
+            gae_lambda=0.95,
+            learning_rate=3e-4,
+            clip_range=0.2,
+            ent_coef=0.01,
+            seed=cfg.seed,
+            verbose=0,
+        )
+
+    callback = _build_callback(cfg, push, stop_event, out_dir, snapshots)
+    push({"status": "started", "workers": n_envs, "algo": "ppo"})
+    try:
+        model.learn(total_timesteps=cfg.total_steps, callback=callback, reset_num_timesteps=False)
+    finally:
+        model.save(str(model_path))
+        vec.close()
+    return {"model": f"{model_path}.zip", "steps": model.num_timesteps, "episodes": callback.episodes, "win_rate": callback.win_rate()}
@@ -6,19 +6,67 @@ Currently provides a simple loop that pits two planners against each other for t
 from typing import Dict, Tuple
 
 from worldwar_jewel.ai.planner import SimplePlanner
-from worldwar_jewel.game.world import ActionCommand, World
+from worldwar_jewel.config import GameTuning
+from worldwar_jewel.game.profiling import attach_profiler
+from worldwar_jewel.game.world import ActionCommand, World, command_to_int
 
 
-def rollout_once(seed: int | None = None) -> Tuple[int | None, World]:
-    world = World(seed=seed)
+def _play(world: World, seed: int | None, recorder=None, profiler=None, memory=None, step=None) -> Tuple[int | None, World]:
+    """Wire the optional hooks into ``world`` and let every team's ``SimplePlanner`` play it out.
+
+    ``step(acts, dt)`` stands in for ``world.step`` (and must return its info
+    dict) when a caller needs to see every tick's commands.
+    """
+    if profiler is not None:
+        attach_profiler(world, profiler)
+    world.memory = memory
+    if recorder is not None:
+        recorder.attach(world, seed=seed, name=f"selfplay_{seed}")
     planners = [SimplePlanner(tid) for tid in range(world.cfg.team_count)]
+    step = step or world.step
     dt = 1.0 / world.cfg.fps
     for _ in range(int(world.cfg.max_time_s * world.cfg.fps)):
         acts: Dict[Tuple[int, int], ActionCommand] = {}
         for p in planners:
             acts.update(p.act(world))
-        info = world.step(acts, dt)
-        if info["done"]:
+        if step(acts, dt)["done"]:
             break
     return world.winner, world
 
+
+def rollout_once(seed: int | None = None, cfg: GameTuning | None = None, recorder=None, profiler=None, memory=None) -> Tuple[int | None, World]:
+    """Planner-vs-planner match; pass ``headless_tuning()`` to end stalled games early.
+
+    ``recorder`` (a ``StreamingRecorder``) records the match to its own replay file;
+    ``profiler`` (a ``StepProfiler``) times the phases of every ``World.step``;
+    ``memory`` (a ``MemoryProfiler``) samples allocations and entity-list sizes.
+    """
+    return _play(World(cfg, seed=seed), seed, recorder, profiler, memory)
+
+
+def record_planner_rollout(writer, seed: int | None = None, cfg: GameTuning | None = None, recorder=None, profiler=None, memory=None) -> Tuple[int | None, World]:
+    """Planner match logged as ``WorldWarEnv`` transitions for every team into a ``TrajectoryWriter``.
+
+    Planner commands are snapped to the env's discrete actions before stepping,
+    so the recorded (obs, act) pairs are exactly what was played.
+    """
+    import numpy as np
+
+    from worldwar_jewel.ai.env import WorldWarEnv
+
+    env = WorldWarEnv(cfg, seed=seed)
+    world = env.world
+    teams = list(range(world.cfg.team_count))
+
+    def step(cmds: Dict[Tuple[int, int], ActionCommand], dt: float) -> Dict:
+        obs = np.stack([env._obs(tid) for tid in teams])
+        act = np.zeros((len(teams), env.squad_size), dtype=np.int16)
+        acts: Dict[Tuple[int, int], int] = {}
+        for (tid, idx), cmd in cmds.items():
+            if idx < env.squad_size:
+                act[tid, idx] = acts[(tid, idx)] = command_to_int(cmd)
+        info = world.step(acts, dt)
+        writer.extend(obs, act, [env._reward(tid) for tid in teams], info["done"], teams)
+        return info
+
+    return _play(world, seed, recorder, profiler, memory, step)
@@ -1,13 +1,25 @@
 """
-Multiprocess training worker placeholder.
-The UI can start this worker to run headless training; currently it just loops self-play episodes.
+Multiprocess training worker.
+The UI starts this worker to run headless training: either PPO on WorldWarEnv
+(``algo="ppo"``, see ppo_trainer) or planner self-play episodes spread across a
+pool of rollout processes (``algo="rollouts"``), streaming results back.
+The UI only starts PPO; everything else (rollout pools, replays, datasets,
+profiling) is reachable from the command line:
+
+    python -m worldwar_jewel.ai.train_worker --episodes 200 --dataset-dir data/bc --profile
 """
 
 import multiprocessing as mp
+import os
+import time
 from dataclasses import dataclass
-from typing import Callable, Dict
+from multiprocessing import util as mp_util
+from pathlib import Path
+from typing import Callable, Dict, Iterator
 
-from worldwar_jewel.ai.selfplay import rollout_once
+from worldwar_jewel import tracing
+from worldwar_jewel.ai.selfplay import record_planner_rollout, rollout_once
+from worldwar_jewel.config import GameTuning, headless_tuning
 
 
 @dataclass
@@ -15,39 +27,365 @@ class TrainConfig:
     steps: int = 1000
     render: bool = False
     opponents: str = "selfplay"
+    workers: int = 0  # rollout processes; 0 = one per CPU core
+    seed: int = 0  # episode i uses seed + i, so runs are reproducible
+    algo: str = "rollouts"  # "rollouts" (planner self-play) or "ppo"
+    early_stop: bool = True  # end stalled/decided matches early (GameTuning.stalemate_s etc.)
+    fog_of_war: bool = False  # GameTuning.fog_of_war: planners/observations only see what their team sees
+    record_dir: str = ""  # save every rollout as a replay here ("" = off)
+    dataset_dir: str = ""  # log rollouts as (obs, act, reward) transitions here ("" = off)
+    profile: bool = False  # time World.step phases; totals are pushed as {"status": "profile"}
+    profile_every: int = 20  # episodes between profile/memory pushes
+    profile_dir: str = ""  # also append each match's timings to step_profile.jsonl here
+    memory_profile: bool = False  # tracemalloc per call site + entity sizes, pushed as {"status": "memory"}; slow
+    memory_every: int = 300  # ticks between tracemalloc snapshots (memory_profile.jsonl goes to profile_dir)
+    trace_dir: str = ""  # per-process Chrome trace files for every worker here ("" = off; see tracing)
+
+    # PPO only
+    n_envs: int = 0  # env subprocesses; 0 = cores - 1
+    total_steps: int = 10_000_000
+    time_budget_s: float = 0.0  # stop after this many seconds (0 = no limit)
+    ckpt_every: int = 50_000
+    ckpt_keep: int = 3  # most recent ckpt_*_steps.zip kept in out_dir (snapshots: snapshot_pool)
+    snapshot_pool: int = 5  # past policies kept as self-play opponents
+    planner_prob: float = 0.5  # chance an opponent is SimplePlanner instead of a snapshot
+    out_dir: str = "models/worldwar"
+
+
+def episode_tuning(cfg: TrainConfig) -> GameTuning:
+    return headless_tuning(fog_of_war=cfg.fog_of_war) if cfg.early_stop else GameTuning(fog_of_war=cfg.fog_of_war)
+
+
+_recorder = None  # per-process StreamingRecorder, created on first recorded episode
+_writer = None  # per-process TrajectoryWriter for dataset_dir
+_profiler = None  # per-process StepProfiler when TrainConfig.profile is on
+_memory = None  # per-process MemoryProfiler; lives as long as the worker so creep across matches shows
+_stop = None  # pool-wide Event: set when a dataset run is cancelled, queued episodes are skipped
+
+
+def _get_recorder(record_dir: str):
+    global _recorder
+    if _recorder is None or _recorder.out_dir != Path(record_dir):
+        from worldwar_jewel.storage.recorder import StreamingRecorder
+
+        if _recorder is not None:
+            _recorder.close()
+        _recorder = StreamingRecorder(record_dir)
+    return _recorder
+
+
+def _get_writer(dataset_dir: str, tuning: GameTuning):
+    global _writer
+    if _writer is None or _writer.root != Path(dataset_dir):
+        from worldwar_jewel.ai.env import OBS_DIM
+        from worldwar_jewel.storage.trajectories import TrajectoryWriter
+
+        if _writer is not None:
+            _writer.close()
+        _writer = TrajectoryWriter(dataset_dir, obs_dim=OBS_DIM, act_dim=tuning.squad_size)
+        # chunks are published when full; the partial one when the process exits
+        # (pool workers run these finalizers on a clean close/join, not on terminate)
+        mp_util.Finalize(_writer, _writer.close, exitpriority=10)
+    return _writer
+
+
+def _close_writer():
+    global _writer
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+
+def _get_profiler(profile_dir: str):
+    global _profiler
+    if _profiler is None or _profiler.dump_dir != profile_dir:
+        from worldwar_jewel.game.profiling import StepProfiler
+
+        _profiler = StepProfiler(profile_dir)
+    return _profiler
+
+
+def _get_memory_profiler(profile_dir: str, every: int):
+    global _memory
+    if _memory is None or _memory.dump_dir != profile_dir or _memory.every != every:
+        from worldwar_jewel.game.memprofile import MemoryProfiler
+
+        if _memory is not None:
+            _memory.stop()
+        _memory = MemoryProfiler(every=every, dump_dir=profile_dir)
+    return _memory
+
+
+def _init_pool_worker(trace_dir: str, stop=None):
+    global _stop
+    _stop = stop
+    if trace_dir:
+        tracing.enable(trace_dir, "rollout_worker")
+
+
+def _rollout_episode(task) -> Dict:
+    """Pool task: one self-play episode, reduced to a small picklable summary (None when skipped)."""
+    seed, tuning, record_dir, dataset_dir, profile = task
+    if _stop is not None and _stop.is_set():
+        return None
+    recorder = _get_recorder(record_dir) if record_dir else None
+    profiler = _get_profiler(profile[1]) if profile[0] else None
+    memory = _get_memory_profiler(profile[1], profile[3]) if profile[2] else None
+    t0 = time.perf_counter()
+    with tracing.span("episode", "train", seed=seed):
+        if dataset_dir:
+            writer = _get_writer(dataset_dir, tuning)
+            winner, world = record_planner_rollout(writer, seed=seed, cfg=tuning, recorder=recorder, profiler=profiler, memory=memory)
+        else:
+            winner, world = rollout_once(seed=seed, cfg=tuning, recorder=recorder, profiler=profiler, memory=memory)
+    elapsed = time.perf_counter() - t0
+    # pool workers are terminated, not shut down, so atexit never runs there
+    tracing.flush()
+    if recorder is not None:
+        # only the tail chunk is still queued; make sure it lands before the pool can be terminated
+        recorder.flush()
+    ticks = int(round(world.t * world.cfg.fps))
+    res = {
+        "seed": seed,
+        "winner": winner,
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_s": ticks / max(elapsed, 1e-9),
+        "stop_reason": world.stop_reason,
+    }
+    if profiler is not None and profiler.last_match is not None:
+        res["profile"] = profiler.last_match.to_dict()
+    if memory is not None:
+        res["memory"] = memory.summary()
+    return res
+
 
+def _pool_size(cfg: TrainConfig) -> int:
+    n = cfg.workers if cfg.workers > 0 else (os.cpu_count() or 1)
+    return max(1, min(n, cfg.steps))
 
-def train_loop(cfg: TrainConfig, progress_cb: Callable[[Dict], None] | None = None):
+
+def iter_rollouts(cfg: TrainConfig, stop_event=None) -> Iterator[Dict]:
+    """Yield episode summaries as they finish (completion order, not seed order)."""
+    tuning = episode_tuning(cfg)
+    profile = (cfg.profile, cfg.profile_dir, cfg.memory_profile, cfg.memory_every)
+    tasks = [(cfg.seed + i, tuning, cfg.record_dir, cfg.dataset_dir, profile) for i in range(cfg.steps)]
+    workers = _pool_size(cfg)
+    if workers == 1:
+        try:
+            for task in tasks:
+                if stop_event is not None and stop_event.is_set():
+                    return
+                yield _rollout_episode(task)
+        finally:
+            _close_writer()
+        return
+
+    ctx = mp.get_context("spawn")
+    # dataset runs stop gracefully so workers can publish their partial chunks
+    pool_stop = ctx.Event() if cfg.dataset_dir else None
+    pool = ctx.Pool(processes=workers, initializer=_init_pool_worker, initargs=(cfg.trace_dir, pool_stop))
+    try:
+        results = pool.imap_unordered(_rollout_episode, tasks, chunksize=1)
+        remaining = len(tasks)
+        while remaining:
+            if stop_event is not None and stop_event.is_set():
+                if pool_stop is not None:
+                    # queued episodes are skipped, in-flight ones finish, then workers exit cleanly
+                    pool_stop.set()
+                    pool.close()
+                    pool.join()
+                return
+            try:
+                res = results.next(timeout=0.2)
+            except mp.TimeoutError:
+                continue
+            remaining -= 1
+            yield res
+        pool.close()
+        pool.join()
+    finally:
+        # Drops queued episodes and kills in-flight ones; no-op once close()d and drained.
+        pool.terminate()
+        pool.join()
+
+
+def _win_rates(wins: Dict[int, int]) -> Dict[int, float]:
+    total = sum(wins.values()) or 1
+    return {k: v / total for k, v in wins.items()}
+
+
+def train_loop(cfg: TrainConfig, progress_cb: Callable[[Dict], None] | None = None, stop_event=None):
     wins: Dict[int, int] = {}
-    for i in range(cfg.steps):
-        winner, _ = rollout_once()
-        if winner is not None:
-            wins[winner] = wins.get(winner, 0) + 1
-        if progress_cb and i % 10 == 0:
-            total = sum(wins.values()) or 1
-            progress_cb(
-                {
-                    "episode": i,
-                    "wins": {k: v / total for k, v in wins.items()},
-                }
-            )
-
-
-def train_worker(cfg: TrainConfig, queue: mp.Queue):
+    for i, res in enumerate(iter_rollouts(cfg, stop_event)):
+        if res["winner"] is not None:
+            wins[res["winner"]] = wins.get(res["winner"], 0) + 1
+        if progress_cb:
+            progress_cb({"episode": i, "wins": _win_rates(wins), **res})
+    return wins
+
+
+def train_worker(cfg: TrainConfig, queue: mp.Queue, stop_event=None):
+    """Process target for the UI: ``run_training`` with its messages sent over ``queue``."""
+
     def push(msg: Dict):
-        try:
-            queue.put(msg, timeout=1)
-        except Exception:
-            pass
+        with tracing.span("queue.put", "ipc", status=msg.get("status")):
+            try:
+                queue.put(msg, timeout=1)
+            except Exception:
+                pass
+
+    if cfg.trace_dir:
+        tracing.enable(cfg.trace_dir, "train_worker")
+    try:
+        run_training(cfg, push, stop_event)
+    finally:
+        # multiprocessing children exit via os._exit, skipping atexit
+        tracing.flush()
+
 
-    push({"status": "started"})
+def run_training(cfg: TrainConfig, push: Callable[[Dict], None], stop_event=None):
+    """Run ``cfg`` to completion (or ``stop_event``), reporting through ``push``: started,
+    progress, checkpoint (PPO), profile, memory, finished."""
+    if cfg.algo == "ppo":
+        from worldwar_jewel.ai.ppo_trainer import train_ppo
+
+        result = train_ppo(cfg, push, stop_event)
+        cancelled = stop_event is not None and stop_event.is_set()
+        push({"status": "finished", "cancelled": cancelled, "wins": {0: result.get("win_rate", 0.0)}, **result})
+        return
+
+    push({"status": "started", "workers": _pool_size(cfg)})
     wins: Dict[int, int] = {}
-    for i in range(cfg.steps):
-        winner, _ = rollout_once()
-        if winner is not None:
-            wins[winner] = wins.get(winner, 0) + 1
-        if i % 10 == 0:
-            total = sum(wins.values()) or 1
-            push({"status": "progress", "episode": i, "wins": {k: v / total for k, v in wins.items()}})
-    push({"status": "finished", "wins": wins})
+    episodes = 0
+    t0 = time.perf_counter()
+    total_ticks = 0
+    profile = None
+    if cfg.profile:
+        from worldwar_jewel.game.profiling import StepStats
+
+        profile = StepStats()
+    memory: Dict[int, Dict] = {}  # latest MemoryProfiler summary per worker pid
+    every = max(1, cfg.profile_every)
+    for res in iter_rollouts(cfg, stop_event):
+        episodes += 1
+        total_ticks += res["ticks"]
+        if res["winner"] is not None:
+            wins[res["winner"]] = wins.get(res["winner"], 0) + 1
+        if profile is not None and "profile" in res:
+            profile.merge(StepStats.from_dict(res.pop("profile")))
+            if episodes % every == 0:
+                push({"status": "profile", "episode": episodes, "profile": profile.to_dict()})
+        if "memory" in res:
+            mem = res.pop("memory")
+            memory[mem["pid"]] = mem
+            if episodes % every == 0:
+                push({"status": "memory", "episode": episodes, "workers": list(memory.values())})
+        push(
+            {
+                "status": "progress",
+                "episode": episodes,
+                "wins": _win_rates(wins),
+                "total_ticks_per_s": total_ticks / max(time.perf_counter() - t0, 1e-9),
+                **res,
+            }
+        )
+    cancelled = stop_event is not None and stop_event.is_set()
+    if profile is not None and episodes % every:
+        push({"status": "profile", "episode": episodes, "profile": profile.to_dict()})
+    if memory and episodes % every:
+        push({"status": "memory", "episode": episodes, "workers": list(memory.values())})
+    push({"status": "finished", "wins": _win_rates(wins), "win_counts": wins, "episodes": episodes, "cancelled": cancelled})
+
+
+def _print_msg(msg: Dict):
+    """``push`` for the command line: one line per episode/progress report, tables for profiles."""
+    status = msg.get("status")
+    if status == "progress" and "samples_per_s" in msg:
+        print(f"steps {msg['steps']}: {msg['samples_per_s']:.0f} samples/s, episode {msg['episode']}, win rate {msg['win_rate']:.1%}")
+    elif status == "progress":
+        print(
+            f"episode {msg['episode']} (seed {msg['seed']}): winner {msg['winner']}, {msg['stop_reason']}, "
+            f"{msg['ticks']} ticks, {msg['ticks_per_s']:.0f} ticks/s ({msg['total_ticks_per_s']:.0f} overall)"
+        )
+    elif status == "profile":
+        from worldwar_jewel.game.profiling import StepStats
+
+        print(f"World.step profile after {msg['episode']} episodes:")
+        print(StepStats.from_dict(msg["profile"]).format())
+    elif status == "memory":
+        from worldwar_jewel.game.memprofile import format_summary
+
+        for summary in msg["workers"]:
+            print(format_summary(summary))
+    elif status == "checkpoint":
+        print(f"checkpoint {msg['path']}")
+    elif status == "error":
+        print(f"error: {msg['message']}")
+    elif status == "started":
+        print(f"started: {msg.get('algo', 'rollouts')}, {msg.get('workers', 1)} processes")
+    elif status == "finished":
+        extra = f", model {msg['model']}" if msg.get("model") else ""
+        print(f"{'cancelled' if msg.get('cancelled') else 'finished'}: win rates {msg.get('wins', {})}{extra}")
+
+
+def main(argv=None):
+    import argparse
+
+    d = TrainConfig()
+    ap = argparse.ArgumentParser(prog="python -m worldwar_jewel.ai.train_worker", description="Headless training without the UI: planner self-play rollouts or PPO.")
+    ap.add_argument("--algo", choices=["rollouts", "ppo"], default=d.algo)
+    ap.add_argument("--episodes", type=int, default=d.steps, help="Rollout episodes (rollouts only).")
+    ap.add_argument("--workers", type=int, default=d.workers, help="Rollout processes; 0 = one per core.")
+    ap.add_argument("--seed", type=int, default=d.seed)
+    ap.add_argument("--no-early-stop", action="store_true", help="Play stalled/decided matches to the time limit.")
+    ap.add_argument("--fog", action="store_true", help="GameTuning.fog_of_war.")
+    ap.add_argument("--record-dir", default="", help="Save every rollout as a replay here.")
+    ap.add_argument("--dataset-dir", default="", help="Log rollouts as (obs, act, reward) transitions here.")
+    ap.add_argument("--profile", action="store_true", help="Time World.step phases (printed every --profile-every episodes).")
+    ap.add_argument("--profile-every", type=int, default=d.profile_every)
+    ap.add_argument("--profile-dir", default="", help="Append per-match step/memory profiles here.")
+    ap.add_argument("--memory-profile", action="store_true", help="tracemalloc per call site + entity sizes (slow).")
+    ap.add_argument("--memory-every", type=int, default=d.memory_every)
+    ap.add_argument("--trace", default="", metavar="DIR", help="Chrome trace files for every process; merged into DIR/trace.json at the end.")
+    ap.add_argument("--opponents", choices=["selfplay", "script"], default=d.opponents, help="PPO opponents.")
+    ap.add_argument("--total-steps", type=int, default=d.total_steps, help="PPO env steps.")
+    ap.add_argument("--time-budget", type=float, default=0.0, metavar="S", help="PPO: stop after this many seconds.")
+    ap.add_argument("--out-dir", default=d.out_dir, help="PPO model/checkpoint folder.")
+    args = ap.parse_args(argv)
+
+    cfg = TrainConfig(
+        algo=args.algo,
+        steps=args.episodes,
+        workers=args.workers,
+        seed=args.seed,
+        early_stop=not args.no_early_stop,
+        fog_of_war=args.fog,
+        record_dir=args.record_dir,
+        dataset_dir=args.dataset_dir,
+        profile=args.profile,
+        profile_every=args.profile_every,
+        profile_dir=args.profile_dir,
+        memory_profile=args.memory_profile,
+        memory_every=args.memory_every,
+        trace_dir=args.trace,
+        opponents=args.opponents,
+        total_steps=args.total_steps,
+        time_budget_s=args.time_budget,
+        out_dir=args.out_dir,
+    )
+    if cfg.trace_dir:
+        tracing.clear(cfg.trace_dir)
+        tracing.enable(cfg.trace_dir, "train_worker")
+    try:
+        run_training(cfg, _print_msg)
+    except KeyboardInterrupt:
+        print("interrupted")
+    finally:
+        if cfg.trace_dir:
+            tracing.flush()
+            print(f"trace: {tracing.merge(cfg.trace_dir)}")
+
 
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
+import time
+
+_T0 = time.perf_counter()  # before the heavy imports below, for --startup-report
+
+import argparse
+import sys
+
 import pygame
 
-from worldwar_jewel.app.ui.screens import MenuScreen, PlayMatchScreen, PlaySetupScreen, SettingsScreen, TrainingScreen
+from worldwar_jewel import tracing
+from worldwar_jewel.app.startup import StartupTimer, format_breakdown, import_breakdown
 from worldwar_jewel.config import GameTuning
 
 
@@ -13,46 +21,120 @@ def build_fonts():
     }
 
 
-def main():
+def window_size(cfg: GameTuning):
+    """The whole map when it fits the desktop, otherwise the largest window that does (the match camera scrolls)."""
+    w, h = cfg.width * cfg.tile, cfg.height * cfg.tile
+    info = pygame.display.Info()
+    if info.current_w > 0 and info.current_h > 0:
+        w = min(w, int(info.current_w * 0.9))
+        h = min(h, int(info.current_h * 0.85))
+    return w, h
+
+
+def open_screen(nxt, screen, fonts, args):
+    """Screen for a ``next_screen`` value. Screen modules are imported on first use so the
+    menu comes up without loading the simulation or training stack; the imports are
+    spelled out (not importlib) so PyInstaller still finds them."""
+    if nxt == "menu":
+        from worldwar_jewel.app.ui.screens.menu import MenuScreen
+
+        return MenuScreen(screen, fonts)
+    if nxt == "play":
+        from worldwar_jewel.app.ui.screens.play_setup import PlaySetupScreen
+
+        return PlaySetupScreen(screen, fonts)
+    if nxt == "train":
+        from worldwar_jewel.app.ui.screens.training import TrainingScreen
+
+        return TrainingScreen(screen, fonts, dirty_rects=args.dirty_rects)
+    if nxt == "settings":
+        from worldwar_jewel.app.ui.screens.settings import SettingsScreen
+
+        return SettingsScreen(screen, fonts)
+    if isinstance(nxt, tuple) and nxt[0] == "play_match":
+        from worldwar_jewel.app.ui.screens.play_setup import PlayMatchScreen
+
+        _, team_idx, cls_idx, diff_idx, render = nxt
+        return PlayMatchScreen(screen, fonts, team_idx, cls_idx, diff_idx, render, dirty_rects=args.dirty_rects, profile=args.profile, memory_profile=args.memory_profile)
+    return None
+
+
+def report_startup(timer: StartupTimer):
+    print(f"Startup: first frame after {timer.total_ms:.0f} ms")
+    print(timer.report())
+    if getattr(sys, "frozen", False):
+        return  # no interpreter to re-run under -X importtime in a PyInstaller build
+    print("Imports (python -X importtime):")
+    print(format_breakdown(import_breakdown(__spec__.name if __spec__ else "worldwar_jewel.app.main")))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="World War Jewel (V2)")
+    ap.add_argument("--dirty-rects", action="store_true", help="Present only changed screen areas in the match views (faster on software/remote displays).")
+    ap.add_argument("--fps", type=int, default=60, help="Display frame cap; the simulation always ticks at GameTuning.fps.")
+    ap.add_argument("--profile", action="store_true", help="Time each World.step phase in matches and print the table when the match ends.")
+    ap.add_argument("--memory-profile", action="store_true", help="Track allocations per call site (tracemalloc) and entity-list sizes in matches; prints the report when the match ends. Slow.")
+    ap.add_argument("--trace", default="", metavar="DIR", help="Record a Chrome/Perfetto timeline (frames, world phases, planner, pathfinding, training workers) into DIR; merged to DIR/trace.json on exit.")
+    ap.add_argument("--startup-report", action="store_true", help="Print how long the launch took (phases and imports) once the menu is shown, then exit.")
+    args = ap.parse_args(argv)
+    if args.trace:
+        tracing.clear(args.trace)
+        tracing.enable(args.trace, "game")
+    timer = StartupTimer(_T0)
+    timer.mark("imports")
+
     pygame.init()
+    timer.mark("pygame.init")
     cfg = GameTuning()
-    screen = pygame.display.set_mode((cfg.width * cfg.tile, cfg.height * cfg.tile))
+    screen = pygame.display.set_mode(window_size(cfg))
     pygame.display.set_caption("World War Jewel (V2)")
+    timer.mark("window")
     fonts = build_fonts()
+    timer.mark("fonts")
     clock = pygame.time.Clock()
 
-    current = MenuScreen(screen, fonts)
+    current = open_screen("menu", screen, fonts, args)
+    timer.mark("menu screen")
+    first_frame = True
     running = True
     while running:
-        dt = clock.tick(cfg.fps) / 1000.0
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            else:
-                current.handle_event(event)
+        dt = clock.tick(args.fps) / 1000.0
+        with tracing.span("events", "frame"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                else:
+                    current.handle_event(event)
 
-        current.update(dt)
-        current.draw()
-        pygame.display.flip()
+        with tracing.span("update", "frame"):
+            current.update(dt)
+        with tracing.span("draw", "frame"):
+            current.draw()
+        with tracing.span("present", "frame"):
+            rects = getattr(current, "dirty_rects", None)
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+        if first_frame:
+            first_frame = False
+            timer.mark("first frame")
+            if args.startup_report:
+                report_startup(timer)
+                running = False
 
         nxt = current.next_screen
         if nxt:
             if nxt == "quit":
                 running = False
-            elif nxt == "menu":
-                current = MenuScreen(screen, fonts)
-            elif nxt == "play":
-                current = PlaySetupScreen(screen, fonts)
-            elif nxt == "train":
-                current = TrainingScreen(screen, fonts)
-            elif nxt == "settings":
-                current = SettingsScreen(screen, fonts)
-            elif isinstance(nxt, tuple) and nxt[0] == "play_match":
-                _, team_idx, cls_idx, diff_idx, render = nxt
-                current = PlayMatchScreen(screen, fonts, team_idx, cls_idx, diff_idx, render)
+            else:
+                current = open_screen(nxt, screen, fonts, args) or current
             current.next_screen = None
 
     pygame.quit()
+    if args.trace:
+        tracing.disable()
+        print(f"Trace written to {tracing.merge(args.trace)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,83 @@
+"""
+Cold-start timing for the app (``--startup-report``).
+
+``StartupTimer`` records checkpoints from the launcher module being loaded to
+the first presented frame. ``import_breakdown`` imports a module in a fresh
+interpreter under ``-X importtime`` and parses the result, so the report shows
+which imports the launch time goes to without hooking the running app's
+import system.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+class StartupTimer:
+    def __init__(self, t0: Optional[float] = None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, label: str):
+        self.marks.append((label, time.perf_counter()))
+
+    @property
+    def total_ms(self) -> float:
+        return ((self.marks[-1][1] if self.marks else time.perf_counter()) - self.t0) * 1000
+
+    def report(self) -> str:
+        lines = []
+        prev = self.t0
+        for label, t in self.marks:
+            lines.append(f"  {label:<22} {(t - prev) * 1000:8.1f} ms   ({(t - self.t0) * 1000:8.1f} ms)")
+            prev = t
+        return "\n".join(lines)
+
+
+ImportRow = Tuple[str, int, float, float]  # name, nesting depth, self ms, cumulative ms
+
+
+def import_breakdown(module: str, timeout: float = 60.0) -> List[ImportRow]:
+    """Every import made by ``import module`` in a fresh interpreter, in ``-X importtime`` order."""
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env["PYTHONPATH"] = os.pathsep.join(p for p in [os.getcwd(), env.get("PYTHONPATH", "")] if p)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        timeout=timeout,
+    )
+    rows: List[ImportRow] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, raw = line[len("import time:") :].split("|", 2)
+        name = raw.strip()
+        depth = (len(raw) - len(raw.lstrip()) - 1) // 2
+        rows.append((name, depth, int(self_us) / 1000, int(cum_us) / 1000))
+    return rows
+
+
+def format_breakdown(rows: List[ImportRow], min_ms: float = 2.0, max_depth: int = 2) -> str:
+    """Import tree down to ``max_depth`` levels, hiding imports that took less than ``min_ms``."""
+    # -X importtime lists each module after its children; rebuild the tree to print parents first
+    pending: Dict[int, list] = {}
+    for row in rows:
+        depth = row[1]
+        pending.setdefault(depth, []).append((row, pending.pop(depth + 1, [])))
+    lines = []
+
+    def emit(nodes):
+        for (name, depth, own, cum), children in nodes:
+            if depth <= max_depth and cum >= min_ms:
+                lines.append(f"  {'  ' * depth}{name:<{48 - 2 * depth}} {cum:8.1f} ms  (self {own:6.1f})")
+                emit(children)
+
+    emit(pending.get(0, []))
+    total = sum(r[3] for r in rows if r[1] == 0)
+    lines.append(f"  {'total':<48} {total:8.1f} ms")
+    return "\n".join(lines)
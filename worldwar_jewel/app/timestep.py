@@ -0,0 +1,33 @@
+"""
+Fixed-timestep accumulator for the UI loop.
+
+Frames feed their real elapsed time in; the world is always stepped with the
+same ``dt``, so a match plays out identically whatever the frame rate. When a
+frame is very late, at most ``max_steps`` ticks run and the remaining backlog
+is dropped (the game slows down instead of spiralling). ``alpha`` is how far
+the display is between the last two ticks, for interpolated rendering.
+"""
+
+
+class FixedStep:
+    def __init__(self, dt: float, max_steps: int = 5):
+        self.dt = dt
+        self.max_steps = max_steps
+        self.acc = 0.0
+        self.ticks = 0
+
+    def advance(self, frame_dt: float) -> int:
+        """Add real time; returns how many fixed ticks to run now."""
+        self.acc += max(0.0, frame_dt)
+        n = int(self.acc / self.dt)
+        if n > self.max_steps:
+            n = self.max_steps
+            self.acc = 0.0
+        else:
+            self.acc -= n * self.dt
+        self.ticks += n
+        return n
+
+    @property
+    def alpha(self) -> float:
+        return min(1.0, self.acc / self.dt)
@@ -1,7 +1,22 @@
-from .menu import MenuScreen
-from .play_setup import PlaySetupScreen, PlayMatchScreen
-from .training import TrainingScreen
-from .settings import SettingsScreen
+# Screen modules are imported on first attribute access (PEP 562), so showing the
+# menu doesn't load the simulation, planners or the training stack.
+import importlib
+
+_MODULES = {
+    "MenuScreen": "menu",
+    "PlaySetupScreen": "play_setup",
+    "PlayMatchScreen": "play_setup",
+    "TrainingScreen": "training",
+    "SettingsScreen": "settings",
+}
 
 __all__ = ["MenuScreen", "PlaySetupScreen", "PlayMatchScreen", "TrainingScreen", "SettingsScreen"]
 
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
@@ -1,10 +1,17 @@
+import time
+
 import pygame
 
+from worldwar_jewel.app.timestep import FixedStep
+from worldwar_jewel.app.ui.camera import Camera
 from worldwar_jewel.app.ui.widgets import Button, Checkbox, Dropdown
+from worldwar_jewel.app.ui.world_render import WorldRenderer, capture_positions
 from worldwar_jewel.ai.planner import SimplePlanner
 from worldwar_jewel.config import CLASS_PRESETS, TEAM_PROFILES, GameTuning
 from worldwar_jewel.game.world import ActionCommand, World
 
+PAN_SPEED = 900  # camera scroll with the arrow keys, px/s
+
 
 class PlaySetupScreen:
     def __init__(self, surface, fonts):
@@ -68,24 +75,102 @@ class PlaySetupScreen:
 
 
 class PlayMatchScreen:
-    def __init__(self, surface, fonts, team_index: int, leader_class_index: int, difficulty_index: int, render: bool = True):
+    def __init__(self, surface, fonts, team_index: int, leader_class_index: int, difficulty_index: int, render: bool = True, dirty_rects: bool = False, profile: bool = False, memory_profile: bool = False):
         self.surface = surface
         self.fonts = fonts
         self.cfg = GameTuning()
-        # Screen size matches map tile size
         self.world = World(self.cfg, team_classes={team_index: [list(CLASS_PRESETS.keys())[leader_class_index]]})
+        self.step_profiler = None
+        if profile:
+            from worldwar_jewel.game.profiling import StepProfiler, attach_profiler
+
+            # prints the per-phase table when the match ends; chained with the tracer under --trace
+            self.step_profiler = attach_profiler(self.world, StepProfiler(echo=True))
+        if memory_profile:
+            from worldwar_jewel.game.memprofile import MemoryProfiler
+
+            self.world.memory = MemoryProfiler(echo=True)
         self.player_team = team_index
         self.difficulty_index = difficulty_index
         self.render_enabled = render
         self.next_screen = None
         self.planners = {tid: SimplePlanner(tid) for tid in range(self.cfg.team_count) if tid != self.player_team}
         self.clock = pygame.time.Clock()
+        self.renderer = WorldRenderer(self.cfg, fonts, dirty_rects=dirty_rects)
+        # areas to present this frame (display.update); None = flip the whole screen
+        self.dirty_rects = [] if dirty_rects or not render else None
+        # the world always advances in 1/fps ticks, independent of the display frame rate
+        self.stepper = FixedStep(1.0 / self.cfg.fps)
+        self._prev_pos = None
+        # the map can be larger than the window: the camera follows the leader until the player pans
+        self.camera = Camera(surface.get_size(), (self.cfg.width, self.cfg.height), self.cfg.tile)
+        self.follow = True
+        self._drag = None
+        leader = self._leader()
+        if leader is not None:
+            self.camera.center_on(leader.pos)
+
+    def _leader(self):
+        return next((u for u in self.world.units if u.team_id == self.player_team), None)
 
     def handle_event(self, event):
-        if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-            self.next_screen = "menu"
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.next_screen = "menu"
+                if self.step_profiler is not None and not self.world.done:
+                    print("World.step profile (match left early):")
+                    print(self.step_profiler.stats().format())
+                if self.world.memory is not None:
+                    if not self.world.done:
+                        print("Memory profile (match left early):")
+                        print(self.world.memory.format())
+                    self.world.memory.stop()
+            elif event.key == pygame.K_c:
+                self.follow = True
+                leader = self._leader()
+                if leader is not None:
+                    self.camera.center_on(leader.pos)
+            elif event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                self.camera.step_zoom(1 if event.key == pygame.K_PAGEUP else -1)
+        elif event.type == pygame.MOUSEWHEEL:
+            self.camera.step_zoom(1 if event.y > 0 else -1, anchor=self.camera.to_world(pygame.mouse.get_pos()))
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3):
+            self._drag = event.pos
+        elif event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+            self._drag = None
+        elif event.type == pygame.MOUSEMOTION and self._drag is not None:
+            self.camera.pan(self._drag[0] - event.pos[0], self._drag[1] - event.pos[1])
+            self._drag = event.pos
+            self.follow = False
+
+    def _update_camera(self, dt):
+        keys = pygame.key.get_pressed()
+        step = int(PAN_SPEED * dt)
+        dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * step
+        dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * step
+        if dx or dy:
+            self.camera.pan(dx, dy)
+            self.follow = False
+        elif self.follow:
+            leader = self._leader()
+            if leader is not None and leader.is_alive():
+                self.camera.follow(leader.pos)
 
     def update(self, dt):
+        if not self.render_enabled:
+            # Sim-only: nothing to show, so run ticks back to back for most of the frame.
+            deadline = time.perf_counter() + 0.8 / self.cfg.fps
+            while not self.world.done and time.perf_counter() < deadline:
+                self._tick()
+            return
+        for _ in range(self.stepper.advance(dt)):
+            if self.world.done:
+                break
+            self._prev_pos = capture_positions(self.world)
+            self._tick()
+        self._update_camera(dt)
+
+    def _tick(self):
         actions = {}
         # AI actions
         for tid, planner in self.planners.items():
@@ -93,9 +178,11 @@ class PlayMatchScreen:
         # Player leader (unit 0) manual input
         leader_action = self._leader_action()
         actions[(self.player_team, 0)] = leader_action
-        info = self.world.step(actions, dt)
+        info = self.world.step(actions, self.stepper.dt)
         if info.get("done"):
             self.next_screen = "menu"
+            if self.world.memory is not None:
+                self.world.memory.stop()  # the report was printed at match end
 
     def _leader_action(self) -> ActionCommand:
         keys = pygame.key.get_pressed()
@@ -130,62 +217,17 @@ class PlayMatchScreen:
         if not self.render_enabled:
             return
         surf = self.surface
-        surf.fill((10, 12, 16))
-        tile = self.cfg.tile
-
-        # Grid background
-        for x in range(self.cfg.width):
-            pygame.draw.line(surf, (24, 28, 34), (x * tile, 0), (x * tile, self.cfg.height * tile))
-        for y in range(self.cfg.height):
-            pygame.draw.line(surf, (24, 28, 34), (0, y * tile), (self.cfg.width * tile, y * tile))
-
-        # Walls
-        for (wx, wy) in self.world.layout.walls:
-            pygame.draw.rect(surf, (60, 70, 86), pygame.Rect(wx * tile, wy * tile, tile, tile), border_radius=4)
-
-        # Resources
-        for r in self.world.resources:
-            if not r.alive:
-                continue
-            color = {"wood": (110, 170, 100), "metal": (170, 170, 190), "fuel": (240, 170, 80)}.get(r.rtype, (140, 140, 140))
-            pygame.draw.circle(surf, color, (int(r.pos[0] * tile), int(r.pos[1] * tile)), 6)
-
-        # Buildings
-        for b in self.world.buildings:
-            if not b.is_alive():
-                continue
-            color = TEAM_PROFILES[b.team_id % len(TEAM_PROFILES)].color
-            rect = pygame.Rect(int((b.pos[0] - 0.5) * tile), int((b.pos[1] - 0.5) * tile), tile, tile)
-            pygame.draw.rect(surf, color, rect, width=0, border_radius=6)
-            hpw = int(rect.width * (b.hp / b.stats.max_hp))
-            pygame.draw.rect(surf, (20, 20, 24), rect.inflate(0, 10).move(0, -6), border_radius=4)
-            pygame.draw.rect(surf, (90, 200, 130), rect.inflate(0, 10).move(0, -6).clip(pygame.Rect(rect.x, rect.y - 8, hpw, rect.height)), border_radius=4)
-
-        # Jewels
-        for j in self.world.jewels:
-            color = TEAM_PROFILES[j.home_team % len(TEAM_PROFILES)].color
-            pygame.draw.circle(surf, (255, 235, 120), (int(j.pos[0] * tile), int(j.pos[1] * tile)), 9)
-            pygame.draw.circle(surf, color, (int(j.pos[0] * tile), int(j.pos[1] * tile)), 11, 2)
-
-        # Units
-        for u in self.world.units:
-            if not u.is_alive():
-                continue
-            color = TEAM_PROFILES[u.team_id % len(TEAM_PROFILES)].color
-            x, y = int(u.pos[0] * tile), int(u.pos[1] * tile)
-            pygame.draw.circle(surf, color, (x, y), 10)
-            letter = u.cls_id[0].upper()
-            txt = self.fonts["tiny"].render(letter, True, (12, 12, 14))
-            surf.blit(txt, txt.get_rect(center=(x, y)))
-            if u.has_jewel:
-                pygame.draw.circle(surf, (255, 230, 120), (x, y - 14), 5)
+        renderer = self.renderer
+        renderer.draw(surf, self.world, prev=self._prev_pos, alpha=self.stepper.alpha, camera=self.camera)
 
         # HUD
         team = self.world.teams[self.player_team]
-        hud = f"Recursos: W{team.resources.get('wood',0)} M{team.resources.get('metal',0)} F{team.resources.get('fuel',0)} | Pressione ESC para sair"
+        hud = f"Recursos: W{team.resources.get('wood',0)} M{team.resources.get('metal',0)} F{team.resources.get('fuel',0)} | Setas/roda: câmera, C: seguir líder | ESC para sair"
         hudsurf = self.fonts["sub"].render(hud, True, (230, 230, 240))
-        surf.blit(hudsurf, (12, 8))
+        renderer.mark(surf.blit(hudsurf, (12, 8)))
         if self.world.done:
             txt = f"Vitória do time {self.world.winner}"
             wtxt = self.fonts["title"].render(txt, True, (255, 255, 255))
-            surf.blit(wtxt, wtxt.get_rect(center=(surf.get_width() // 2, 30)))
+            renderer.mark(surf.blit(wtxt, wtxt.get_rect(center=(surf.get_width() // 2, 30))))
+        if renderer.dirty_rects:
+            self.dirty_rects = renderer.end_frame()
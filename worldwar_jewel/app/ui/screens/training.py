@@ -1,15 +1,23 @@
-import multiprocessing as mp
+import time
+
 import pygame
 
+from worldwar_jewel import tracing
+from worldwar_jewel.app.timestep import FixedStep
 from worldwar_jewel.app.ui.widgets import Button, Checkbox, Dropdown, Slider
-from worldwar_jewel.ai.train_worker import TrainConfig, train_worker
-from worldwar_jewel.ai.planner import SimplePlanner
-from worldwar_jewel.config import GameTuning, TEAM_PROFILES
-from worldwar_jewel.game.world import World
+from worldwar_jewel.app.ui.world_render import WorldRenderer, capture_positions
+from worldwar_jewel.config import GameTuning
+
+# Spectate speed multipliers for the rendered self-play view; 0 = as fast as possible.
+SPECTATE_SPEEDS = (1, 2, 4, 8, 16, 32, 64, 0)
+# Wall time per frame the sim may use when spectating faster than real time; at
+# "max" the display drops to ~20 fps so nearly all the CPU goes to the sim.
+SPECTATE_BUDGET_S = 0.012
+SPECTATE_MAX_BUDGET_S = 0.05
 
 
 class TrainingScreen:
-    def __init__(self, surface, fonts):
+    def __init__(self, surface, fonts, dirty_rects: bool = False):
         self.surface = surface
         self.fonts = fonts
         self.next_screen = None
@@ -23,15 +31,29 @@ class TrainingScreen:
         self.start_btn = Button((cx - 120, h // 3 + 170, 240, 50), "Comecar", fonts["btn"], self._start)
         self.stop_btn = Button((cx - 120, h // 3 + 230, 240, 40), "Parar e salvar", fonts["btn"], self._stop, color=(200, 120, 70))
         self.stop_full_btn = Button((surface.get_width() - 180, 20, 160, 40), "Parar", fonts["btn"], self._stop, color=(200, 120, 70))
+        self.speed_btn = Button((surface.get_width() - 350, 20, 160, 40), "", fonts["btn"], lambda: self._change_speed(1), color=(70, 130, 190))
         self.back_btn = Button((20, h - 70, 160, 44), "Voltar", fonts["btn"], self._back, color=(80, 90, 110))
 
-        self.worker: mp.Process | None = None
-        self.queue: mp.Queue | None = None
+        # multiprocessing and the training stack are imported when a headless run starts
+        self.worker = None  # multiprocessing.Process
+        self.queue = None  # multiprocessing.Queue
+        self.stop_event = None
+        self._stop_deadline: float | None = None
         self.progress_msg = ""
         self.winrate = {}
-        self.render_world: World | None = None
+        self.render_world = None  # World while spectating rendered self-play
         self.render_planners = []
         self.rendering = False
+        self.renderer = WorldRenderer(self.cfg, fonts, dirty_rects=dirty_rects)
+        self.dirty_rects = None  # set while the rendered self-play view is shown in dirty-rect mode
+        self.stepper = FixedStep(1.0 / self.cfg.fps)
+        self._prev_pos = None
+        self.speed_idx = 0
+        self._tick_debt = 0.0  # ticks owed at speeds > 1x
+        self._rate_ticks = 0
+        self._rate_t0 = time.perf_counter()
+        self.ticks_per_s = 0.0
+        self._change_speed(0)
 
     def _start(self):
         if self.worker and self.worker.is_alive():
@@ -39,35 +61,65 @@ class TrainingScreen:
         if self.render_cb.checked:
             # Render mode: run self-play locally with planners and show on screen
             self.fast_cb.checked = False
-            self.render_world = World(self.cfg)
-            self.render_planners = [SimplePlanner(tid) for tid in range(self.render_world.cfg.team_count)]
+            self._new_render_episode()
             self.rendering = True
             self.progress_msg = "Treinando (render)..."
             self.winrate = {}
             return
-        steps = int(self.time_slider.value * 60)  # roughly seconds of episodes
-        cfg = TrainConfig(steps=steps, render=self.render_cb.checked, opponents="selfplay")
+        import multiprocessing as mp
+
+        from worldwar_jewel.ai.train_worker import TrainConfig, train_worker
+
+        opponents = "script" if self.mode_dd.selected == 1 else "selfplay"
+        tracer = tracing.get()
+        cfg = TrainConfig(
+            render=False,
+            opponents=opponents,
+            algo="ppo",
+            time_budget_s=self.time_slider.value * 60,
+            trace_dir=tracer.trace_dir if tracer else "",
+        )
         self.queue = mp.Queue()
-        self.worker = mp.Process(target=train_worker, args=(cfg, self.queue))
+        self.stop_event = mp.Event()
+        self._stop_deadline = None
+        self.worker = mp.Process(target=train_worker, args=(cfg, self.queue, self.stop_event))
         self.worker.start()
         self.progress_msg = "Treinando..."
 
     def _stop(self):
-        if self.worker and self.worker.is_alive():
-            self.worker.terminate()
+        stopping = bool(self.worker and self.worker.is_alive())
+        if stopping:
+            # Ask the worker to wind its rollout pool down; update() force-kills it if it lingers.
+            if self.stop_event is not None:
+                self.stop_event.set()
+            # PPO saves the model after the current rollout, which can take a few seconds
+            self._stop_deadline = time.perf_counter() + 20.0
         if self.rendering:
             self.rendering = False
             self.render_world = None
-        self.progress_msg = "Treino parado."
+        self.progress_msg = "Parando e salvando..." if stopping else "Treino parado."
 
     def _back(self):
         self.next_screen = "menu"
 
+    def _change_speed(self, delta: int):
+        self.speed_idx = (self.speed_idx + delta) % len(SPECTATE_SPEEDS)
+        speed = SPECTATE_SPEEDS[self.speed_idx]
+        self.speed_btn.text = f"Velocidade {speed}x" if speed else "Velocidade max"
+        self._tick_debt = 0.0
+        self._prev_pos = None
+
     def handle_event(self, event):
         if self.rendering:
             self.stop_full_btn.handle_event(event)
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                self._stop()
+            self.speed_btn.handle_event(event)
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self._stop()
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    self._change_speed(1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    self._change_speed(-1)
         else:
             self.mode_dd.handle_event(event)
             self.time_slider.handle_event(event)
@@ -80,52 +132,109 @@ class TrainingScreen:
     def update(self, dt):
         # Rendered training loop (local self-play with planners)
         if self.rendering and self.render_world:
-            actions = {}
-            for planner in self.render_planners:
-                actions.update(planner.act(self.render_world))
-            info = self.render_world.step(actions, dt)
-            if info.get("done"):
-                winner = info.get("winner")
-                if winner is not None:
-                    self.winrate[winner] = self.winrate.get(winner, 0) + 1
-                # restart new episode
-                self.render_world = World(self.cfg)
-                self.render_planners = [SimplePlanner(tid) for tid in range(self.render_world.cfg.team_count)]
+            speed = SPECTATE_SPEEDS[self.speed_idx]
+            if speed == 1:
+                for _ in range(self.stepper.advance(dt)):
+                    self._prev_pos = capture_positions(self.render_world)
+                    self._render_tick()
+            else:
+                # Many ticks per frame within a wall-time budget; only the latest state is drawn.
+                self._tick_debt += dt * speed / self.stepper.dt if speed else float("inf")
+                deadline = time.perf_counter() + (SPECTATE_BUDGET_S if speed else SPECTATE_MAX_BUDGET_S)
+                while self._tick_debt >= 1.0 and time.perf_counter() < deadline:
+                    self._render_tick()
+                    self._tick_debt -= 1.0
+                if self._tick_debt >= 1.0:
+                    self._tick_debt = 0.0  # can't keep up: run slower rather than build a backlog
+            now = time.perf_counter()
+            if now - self._rate_t0 >= 0.5:
+                self.ticks_per_s = self._rate_ticks / (now - self._rate_t0)
+                self._rate_ticks = 0
+                self._rate_t0 = now
             return
 
+        if self._stop_deadline is not None and self.worker:
+            if not self.worker.is_alive():
+                self._stop_deadline = None
+            elif time.perf_counter() > self._stop_deadline:
+                self.worker.terminate()
+                self._stop_deadline = None
+
         if self.queue:
-            try:
-                msg = self.queue.get_nowait()
-                status = msg.get("status")
-                if status == "progress":
-                    self.winrate = msg.get("wins", {})
-                    self.progress_msg = f"Episodio {msg.get('episode', 0)}"
-                elif status == "finished":
-                    self.winrate = msg.get("wins", {})
-                    self.progress_msg = "Treino completo."
-                    if self.worker:
-                        self.worker.join(timeout=0.1)
-                elif status == "started":
-                    self.progress_msg = "Treinando..."
-            except Exception:
-                pass
+            # Drain everything that arrived since the last frame; pool workers report per episode.
+            for _ in range(64):
+                try:
+                    with tracing.span("queue.get", "ipc"):
+                        msg = self.queue.get_nowait()
+                except Exception:
+                    break
+                self._handle_msg(msg)
+
+    def _render_tick(self):
+        self._rate_ticks += 1
+        actions = {}
+        for planner in self.render_planners:
+            actions.update(planner.act(self.render_world))
+        info = self.render_world.step(actions, self.stepper.dt)
+        if info.get("done"):
+            winner = info.get("winner")
+            if winner is not None:
+                self.winrate[winner] = self.winrate.get(winner, 0) + 1
+            # restart new episode
+            self._new_render_episode()
+            self._prev_pos = None
+
+    def _new_render_episode(self):
+        from worldwar_jewel.ai.planner import SimplePlanner
+        from worldwar_jewel.game.world import World
+
+        self.render_world = World(self.cfg)
+        self.render_planners = [SimplePlanner(tid) for tid in range(self.render_world.cfg.team_count)]
+
+    def _handle_msg(self, msg):
+        status = msg.get("status")
+        if status == "progress":
+            self.winrate = msg.get("wins", {})
+            if "samples_per_s" in msg:
+                self.progress_msg = f"Passos {msg.get('steps', 0)} | {msg['samples_per_s']:.0f} amostras/s | Episodio {msg.get('episode', 0)}"
+            else:
+                self.progress_msg = f"Episodio {msg.get('episode', 0)} | {msg.get('total_ticks_per_s', 0.0):.0f} ticks/s"
+        elif status == "checkpoint":
+            self.progress_msg = f"Checkpoint salvo ({msg.get('steps', 0)} passos)"
+        elif status == "error":
+            self.progress_msg = msg.get("message", "Erro no treino.")
+        elif status == "finished":
+            self.winrate = msg.get("wins", {})
+            done = "Treino parado" if msg.get("cancelled") else "Treino completo"
+            self.progress_msg = f"{done}. Modelo salvo em {msg['model']}" if msg.get("model") else f"{done}."
+            if self.worker:
+                self.worker.join(timeout=0.1)
+        elif status == "started":
+            self.progress_msg = f"Treinando... ({msg.get('workers', 1)} processos)"
 
     def draw(self):
         surf = self.surface
         if self.rendering and self.render_world:
-            surf.fill((10, 12, 16))
-            self._draw_full_world(surf, tile=self.render_world.cfg.tile)
+            renderer = self.renderer
+            self._draw_full_world(surf)
             self.stop_full_btn.draw(surf)
+            renderer.mark(self.stop_full_btn.rect)
+            self.speed_btn.draw(surf)
+            renderer.mark(self.speed_btn.rect)
             # HUD info
-            msg = self.progress_msg or "Treinando (render)..."
+            msg = f"{self.progress_msg or 'Treinando (render)...'} | {self.ticks_per_s:.0f} ticks/s (+/- velocidade)"
             hud = self.fonts["sub"].render(msg, True, (230, 230, 240))
-            surf.blit(hud, (12, 12))
+            renderer.mark(surf.blit(hud, (12, 12)))
             if self.winrate:
                 wr_txt = ", ".join([f"{k}: {v}" for k, v in self.winrate.items()])
                 wr = self.fonts["sub"].render(f"Winrate: {wr_txt}", True, (200, 220, 160))
-                surf.blit(wr, (12, 40))
+                renderer.mark(surf.blit(wr, (12, 40)))
+            if renderer.dirty_rects:
+                self.dirty_rects = renderer.end_frame()
             return
 
+        self.dirty_rects = None
+        self.renderer.invalidate()
         surf.fill((16, 18, 24))
         title = self.fonts["title"].render("Treinar IA", True, (240, 245, 255))
         surf.blit(title, (40, 32))
@@ -153,50 +262,6 @@ class TrainingScreen:
         # dropdown overlay on top
         self.mode_dd.draw_overlay(surf)
 
-    def _draw_full_world(self, surf, tile=20):
-        w = self.render_world
-        if w is None:
-            return
-        for x in range(w.cfg.width):
-            pygame.draw.line(surf, (24, 28, 34), (x * tile, 0), (x * tile, w.cfg.height * tile))
-        for y in range(w.cfg.height):
-            pygame.draw.line(surf, (24, 28, 34), (0, y * tile), (w.cfg.width * tile, y * tile))
-
-        for (wx, wy) in w.layout.walls:
-            pygame.draw.rect(surf, (60, 70, 86), pygame.Rect(wx * tile, wy * tile, tile, tile), border_radius=4)
-
-        for r in w.resources:
-            if not r.alive:
-                continue
-            color = {"wood": (110, 170, 100), "metal": (170, 170, 190), "fuel": (240, 170, 80)}.get(r.rtype, (140, 140, 140))
-            pygame.draw.circle(surf, color, (int(r.pos[0] * tile), int(r.pos[1] * tile)), 6)
-
-        for b in w.buildings:
-            if not b.is_alive():
-                continue
-            color = TEAM_PROFILES[b.team_id % len(TEAM_PROFILES)].color
-            rect = pygame.Rect(int((b.pos[0] - 0.5) * tile), int((b.pos[1] - 0.5) * tile), tile, tile)
-            pygame.draw.rect(surf, color, rect, width=0, border_radius=6)
-
-        for j in w.jewels:
-            color = TEAM_PROFILES[j.home_team % len(TEAM_PROFILES)].color
-            pygame.draw.circle(surf, (255, 235, 120), (int(j.pos[0] * tile), int(j.pos[1] * tile)), 9)
-            pygame.draw.circle(surf, color, (int(j.pos[0] * tile), int(j.pos[1] * tile)), 11, 2)
-
-        for u in w.units:
-            if not u.is_alive():
-                continue
-            color = TEAM_PROFILES[u.team_id % len(TEAM_PROFILES)].color
-            x, y = int(u.pos[0] * tile), int(u.pos[1] * tile)
-            pygame.draw.circle(surf, color, (x, y), 10)
-            letter = u.cls_id[0].upper()
-            txt_font = self.fonts["tiny"] if "tiny" in self.fonts else self.fonts["sub"]
-            txt = txt_font.render(letter, True, (12, 12, 14))
-            surf.blit(txt, txt.get_rect(center=(x, y)))
-            if u.has_jewel:
-                pygame.draw.circle(surf, (255, 230, 120), (x, y - 14), 5)
-
-
-
-
-
+    def _draw_full_world(self, surf):
+        if self.render_world is not None:
+            self.renderer.draw(surf, self.render_world, hp_bars=False, prev=self._prev_pos, alpha=self.stepper.alpha)
@@ -0,0 +1,316 @@
+"""
+Shared top-down renderer for World (match screen and rendered training).
+
+The grid and walls never change during a match, so they are drawn once per
+``MapLayout`` into a terrain surface. Building bodies are composited onto a
+copy of it that is only redrawn when the set of standing buildings changes;
+each frame then starts with a single blit of that static layer.
+
+Units (disc + class letter + jewel marker), jewels and resource markers come
+from a ``SpriteCache``, so per-frame drawing is a list of ``Surface.blits``.
+
+``draw`` can blend unit and jewel positions between the previous tick
+(``capture_positions``) and the current one for fixed-timestep rendering.
+
+With ``dirty_rects=True`` only the areas drawn last frame are restored from
+the static layer, and ``end_frame`` returns the rects to pass to
+``pygame.display.update`` instead of flipping the whole screen.
+
+Everything goes through a ``Camera``: only the visible part of the static
+layer is blitted (from a cached, progressively downscaled mip level when
+zoomed out) and only entities inside the view are drawn, resources and
+buildings being looked up in a ``SpatialGrid``. Without an explicit camera
+the whole map is fitted to the surface.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+from worldwar_jewel.app.ui.camera import Camera, SpatialGrid
+from worldwar_jewel.config import TEAM_PROFILES, GameTuning
+from worldwar_jewel.game.mapgen import MapLayout
+from worldwar_jewel.game.world import World
+
+BG_COLOR = (10, 12, 16)
+GRID_COLOR = (24, 28, 34)
+WALL_COLOR = (60, 70, 86)
+RESOURCE_COLORS = {"wood": (110, 170, 100), "metal": (170, 170, 190), "fuel": (240, 170, 80)}
+
+
+def render_terrain(layout: MapLayout, cfg: GameTuning) -> pygame.Surface:
+    """Background, grid lines and walls for ``layout``."""
+    tile = cfg.tile
+    surf = pygame.Surface((cfg.width * tile, cfg.height * tile))
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert()  # match the display format so the per-frame blit is a plain copy
+    surf.fill(BG_COLOR)
+    for x in range(cfg.width):
+        pygame.draw.line(surf, GRID_COLOR, (x * tile, 0), (x * tile, cfg.height * tile))
+    for y in range(cfg.height):
+        pygame.draw.line(surf, GRID_COLOR, (0, y * tile), (cfg.width * tile, y * tile))
+    for (wx, wy) in layout.walls:
+        pygame.draw.rect(surf, WALL_COLOR, pygame.Rect(wx * tile, wy * tile, tile, tile), border_radius=4)
+    return surf
+
+
+Positions = Tuple[Dict[int, Tuple[float, float]], List[Tuple[float, float]]]
+
+
+def capture_positions(world: World) -> Positions:
+    """Unit (by id) and jewel positions, taken right before a tick for interpolation."""
+    return {u.id: u.pos for u in world.units}, [j.pos for j in world.jewels]
+
+
+def _lerp(prev, cur, alpha: float):
+    # respawns and pickups jump; interpolating those would draw a streak across the map
+    if prev is None or abs(cur[0] - prev[0]) + abs(cur[1] - prev[1]) > 2.0:
+        return cur
+    return prev[0] + (cur[0] - prev[0]) * alpha, prev[1] + (cur[1] - prev[1]) * alpha
+
+
+def building_rect(pos, tile: int) -> pygame.Rect:
+    return pygame.Rect(int((pos[0] - 0.5) * tile), int((pos[1] - 0.5) * tile), tile, tile)
+
+
+SPRITE_KEY = (255, 0, 255)
+
+
+def _sprite_surface(w: int, h: int) -> pygame.Surface:
+    surf = pygame.Surface((w, h))
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert()
+    surf.fill(SPRITE_KEY)
+    return surf
+
+
+def _finish_sprite(surf: pygame.Surface) -> pygame.Surface:
+    # Sprites are opaque shapes (text is anti-aliased onto the disc, never onto the
+    # background), so a colorkey is exact and RLE blits are much cheaper than per-pixel alpha.
+    surf.set_colorkey(SPRITE_KEY, pygame.RLEACCEL)
+    return surf
+
+
+class SpriteCache:
+    """Pre-rendered sprites plus the offset from the entity's pixel position to their top-left."""
+
+    def __init__(self, font: pygame.font.Font):
+        self.font = font
+        self._units: Dict[Tuple[str, int, bool], pygame.Surface] = {}
+        self._jewels: Dict[int, pygame.Surface] = {}
+        self._resources: Dict[str, pygame.Surface] = {}
+        self._scaled: Dict[Tuple[int, float], pygame.Surface] = {}
+
+    # disc r=10 at (10, 19), jewel marker r=5 above it at (10, 5)
+    UNIT_OFFSET = (-10, -19)
+    JEWEL_OFFSET = (-11, -11)
+    RESOURCE_OFFSET = (-6, -6)
+
+    def unit(self, cls_id: str, team_id: int, has_jewel: bool) -> pygame.Surface:
+        key = (cls_id, team_id, has_jewel)
+        surf = self._units.get(key)
+        if surf is None:
+            surf = _sprite_surface(21, 30)
+            color = TEAM_PROFILES[team_id % len(TEAM_PROFILES)].color
+            pygame.draw.circle(surf, color, (10, 19), 10)
+            txt = self.font.render(cls_id[0].upper(), True, (12, 12, 14))
+            surf.blit(txt, txt.get_rect(center=(10, 19)))
+            if has_jewel:
+                pygame.draw.circle(surf, (255, 230, 120), (10, 5), 5)
+            self._units[key] = surf = _finish_sprite(surf)
+        return surf
+
+    def jewel(self, home_team: int) -> pygame.Surface:
+        surf = self._jewels.get(home_team)
+        if surf is None:
+            surf = _sprite_surface(23, 23)
+            pygame.draw.circle(surf, (255, 235, 120), (11, 11), 9)
+            pygame.draw.circle(surf, TEAM_PROFILES[home_team % len(TEAM_PROFILES)].color, (11, 11), 11, 2)
+            self._jewels[home_team] = surf = _finish_sprite(surf)
+        return surf
+
+    def resource(self, rtype: str) -> pygame.Surface:
+        surf = self._resources.get(rtype)
+        if surf is None:
+            surf = _sprite_surface(13, 13)
+            pygame.draw.circle(surf, RESOURCE_COLORS.get(rtype, (140, 140, 140)), (6, 6), 6)
+            self._resources[rtype] = surf = _finish_sprite(surf)
+        return surf
+
+    def scaled(self, sprite: pygame.Surface, zoom: float) -> pygame.Surface:
+        """``sprite`` at ``zoom`` (nearest-neighbour, so the colorkey stays exact)."""
+        if zoom == 1.0:
+            return sprite
+        key = (id(sprite), zoom)
+        surf = self._scaled.get(key)
+        if surf is None:
+            w, h = sprite.get_size()
+            surf = pygame.transform.scale(sprite, (max(1, round(w * zoom)), max(1, round(h * zoom))))
+            self._scaled[key] = surf = _finish_sprite(surf)
+        return surf
+
+
+class WorldRenderer:
+    def __init__(self, cfg: GameTuning, fonts, dirty_rects: bool = False):
+        self.cfg = cfg
+        self.fonts = fonts
+        self.sprites = SpriteCache(fonts["tiny"] if "tiny" in fonts else fonts["sub"])
+        self.dirty_rects = dirty_rects
+        self._on_screen: Optional[Tuple] = None  # (backdrop, camera key) currently under the dynamic items
+        self._prev: List[pygame.Rect] = []
+        self._restored: List[pygame.Rect] = []
+        self._drawn: List[pygame.Rect] = []
+        self._layout: Optional[MapLayout] = None
+        self._terrain: Optional[pygame.Surface] = None
+        self._static: Optional[pygame.Surface] = None
+        self._buildings_key: Optional[Tuple] = None
+        self._mips: Dict[float, pygame.Surface] = {}
+        self._zoomed: Optional[Tuple[Tuple, pygame.Surface]] = None
+        self._fit: Optional[Camera] = None
+        self._res_src: Optional[list] = None
+        self._res_grid: Optional[SpatialGrid] = None
+        self._bld_grid: Optional[SpatialGrid] = None
+
+    def static_layer(self, world: World) -> pygame.Surface:
+        """Terrain plus building bodies, re-rendered only when the layout or buildings change."""
+        if world.layout is not self._layout:
+            self._layout = world.layout
+            self._terrain = render_terrain(world.layout, self.cfg)
+            self._buildings_key = None
+        key = tuple((b.id, b.team_id, b.pos) for b in world.buildings if b.is_alive())
+        if key != self._buildings_key:
+            self._buildings_key = key
+            self._static = self._terrain.copy()
+            self._mips = {}
+            self._zoomed = None
+            tile = self.cfg.tile
+            for b in world.buildings:
+                if b.is_alive():
+                    color = TEAM_PROFILES[b.team_id % len(TEAM_PROFILES)].color
+                    pygame.draw.rect(self._static, color, building_rect(b.pos, tile), width=0, border_radius=6)
+            self._bld_grid = SpatialGrid([b for b in world.buildings if b.is_alive()], lambda b: b.pos)
+        return self._static
+
+    def fit_camera(self, surf: pygame.Surface) -> Camera:
+        """Camera showing the whole map in ``surf`` at the largest zoom level that fits."""
+        size = surf.get_size()
+        if self._fit is None or (self._fit.view_w, self._fit.view_h) != size:
+            self._fit = Camera.fit(size, (self.cfg.width, self.cfg.height), self.cfg.tile)
+        return self._fit
+
+    def _mip(self, zoom: float) -> pygame.Surface:
+        """Static layer downscaled to ``zoom`` (< 1), each level filtered from the one above."""
+        if zoom >= 1.0:
+            return self._static
+        surf = self._mips.get(zoom)
+        if surf is None:
+            src = self._mip(zoom * 2)
+            w, h = self._static.get_size()
+            size = (int(w * zoom), int(h * zoom))
+            try:
+                surf = pygame.transform.smoothscale(src, size)
+            except ValueError:  # smoothscale only takes 24/32-bit surfaces
+                surf = pygame.transform.scale(src, size)
+            self._mips[zoom] = surf
+        return surf
+
+    def _backdrop(self, cam: Camera) -> Tuple[pygame.Surface, int, int]:
+        """Surface with the static pixels for ``cam`` and the view's offset into it."""
+        if cam.zoom <= 1.0:
+            return self._mip(cam.zoom), cam.x, cam.y
+        # zoomed in: scale only the visible crop, once per camera position
+        key = (self._static, cam.key(), cam.view_w, cam.view_h)
+        if self._zoomed is None or self._zoomed[0] != key:
+            z = cam.zoom
+            view = pygame.Surface((cam.view_w, cam.view_h))
+            if pygame.display.get_surface() is not None:
+                view = view.convert()
+            view.fill(BG_COLOR)
+            src = pygame.Rect(int(cam.x // z), int(cam.y // z), int(cam.view_w / z) + 2, int(cam.view_h / z) + 2).clip(self._static.get_rect())
+            if src.w and src.h:
+                part = pygame.transform.scale(self._static.subsurface(src), (int(src.w * z), int(src.h * z)))
+                view.blit(part, (int(src.x * z) - cam.x, int(src.y * z) - cam.y))
+            self._zoomed = (key, view)
+        return self._zoomed[1], 0, 0
+
+    def _resources_in(self, world: World, x0: float, y0: float, x1: float, y1: float):
+        if world.resources is not self._res_src:
+            self._res_src = world.resources
+            self._res_grid = SpatialGrid(world.resources, lambda r: r.pos)
+        for r in self._res_grid.query(x0, y0, x1, y1):
+            if r.alive and x0 <= r.pos[0] <= x1 and y0 <= r.pos[1] <= y1:
+                yield r
+
+    def draw(self, surf: pygame.Surface, world: World, hp_bars: bool = True, prev: Optional[Positions] = None, alpha: float = 1.0, camera: Optional[Camera] = None):
+        """``prev``/``alpha``: draw moving things ``alpha`` of the way from ``prev`` to now.
+
+        ``camera`` defaults to ``fit_camera(surf)``.
+        """
+        cam = camera or self.fit_camera(surf)
+        sprites = self.sprites
+        self.static_layer(world)
+        backdrop, bx, by = self._backdrop(cam)
+        covers = bx >= 0 and by >= 0 and bx + cam.view_w <= backdrop.get_width() and by + cam.view_h <= backdrop.get_height()
+        on_screen = (backdrop, cam.key())
+        drawn = self._drawn = []
+        if self.dirty_rects and self._on_screen == on_screen:
+            for r in self._prev:
+                if not covers:
+                    surf.fill(BG_COLOR, r)
+                surf.blit(backdrop, r, r.move(bx, by))
+            self._restored = self._prev
+        else:
+            if not covers:
+                surf.fill(BG_COLOR)
+            surf.blit(backdrop, (-bx, -by))
+            self._on_screen = on_screen
+            self._restored = [surf.get_rect()]
+
+        z = cam.zoom
+        s = cam.scale
+        cx, cy = cam.x, cam.y
+        x0, y0, x1, y1 = cam.visible_tiles()
+        scaled = sprites.scaled
+
+        ox, oy = round(sprites.RESOURCE_OFFSET[0] * z) - cx, round(sprites.RESOURCE_OFFSET[1] * z) - cy
+        drawn += surf.blits([(scaled(sprites.resource(r.rtype), z), (int(r.pos[0] * s) + ox, int(r.pos[1] * s) + oy)) for r in self._resources_in(world, x0, y0, x1, y1)])
+
+        if hp_bars:
+            tile = int(s)
+            pad, lift, radius = int(10 * z), int(6 * z), max(1, int(4 * z))
+            for b in self._bld_grid.query(x0, y0, x1, y1):
+                if not b.is_alive() or not (x0 <= b.pos[0] <= x1 and y0 <= b.pos[1] <= y1):
+                    continue
+                rect = building_rect(b.pos, tile).move(-cx, -cy)
+                hpw = int(rect.width * (b.hp / b.stats.max_hp))
+                bar = rect.inflate(0, pad).move(0, -lift)
+                drawn.append(pygame.draw.rect(surf, (20, 20, 24), bar, border_radius=radius))
+                pygame.draw.rect(surf, (90, 200, 130), bar.clip(pygame.Rect(rect.x, rect.y - int(8 * z), hpw, rect.height)), border_radius=radius)
+
+        seq: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+        interp = prev is not None and alpha < 1.0
+        ox, oy = round(sprites.JEWEL_OFFSET[0] * z) - cx, round(sprites.JEWEL_OFFSET[1] * z) - cy
+        for i, j in enumerate(world.jewels):
+            x, y = _lerp(prev[1][i] if i < len(prev[1]) else None, j.pos, alpha) if interp else j.pos
+            if x0 <= x <= x1 and y0 <= y <= y1:
+                seq.append((scaled(sprites.jewel(j.home_team), z), (int(x * s) + ox, int(y * s) + oy)))
+        ox, oy = round(sprites.UNIT_OFFSET[0] * z) - cx, round(sprites.UNIT_OFFSET[1] * z) - cy
+        for u in world.units:
+            if u.is_alive():
+                x, y = _lerp(prev[0].get(u.id), u.pos, alpha) if interp else u.pos
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    seq.append((scaled(sprites.unit(u.cls_id, u.team_id, u.has_jewel), z), (int(x * s) + ox, int(y * s) + oy)))
+        drawn += surf.blits(seq)
+
+    def invalidate(self):
+        """Something else drew over the screen; the next frame is drawn (and presented) in full."""
+        self._on_screen = None
+
+    def mark(self, rect: pygame.Rect):
+        """Register an overlay (HUD text, buttons) drawn on top of the world this frame."""
+        self._drawn.append(pygame.Rect(rect))
+
+    def end_frame(self) -> List[pygame.Rect]:
+        """Screen areas changed since the last frame: last frame's items plus this frame's."""
+        self._prev = self._drawn
+        return self._restored + self._drawn
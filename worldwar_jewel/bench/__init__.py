@@ -0,0 +1,12 @@
+"""
+Benchmark suite: simulation, pathfinding, planner, envs, map generation and
+full self-play rollouts over fixed-seed scenarios.
+
+    python -m worldwar_jewel.bench --out bench/results.json
+"""
+
+from .cases import CASES, Measurement
+from .runner import format_report, load_report, run_suite, write_report
+from .scenarios import SCENARIOS, Scenario
+
+__all__ = ["CASES", "Measurement", "SCENARIOS", "Scenario", "format_report", "load_report", "run_suite", "write_report"]
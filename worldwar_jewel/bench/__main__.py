@@ -0,0 +1,3 @@
+from worldwar_jewel.bench.runner import main
+
+main()
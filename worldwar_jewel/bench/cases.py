@@ -0,0 +1,214 @@
+"""
+Benchmark cases. Each takes a ``Scenario`` and a repeat count and returns
+``Measurement``s with one sample per repeat; the runner reports the median.
+
+Only the code under test sits inside the timed region: planner calls are timed
+apart from ``World.step`` even though they run in the same loop, and env actions
+are sampled before the clock starts.
+"""
+
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from worldwar_jewel.bench.scenarios import Scenario
+
+
+@dataclass
+class Measurement:
+    name: str
+    scenario: str
+    unit: str
+    better: str  # "higher" or "lower"
+    samples: List[float]
+    extra: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def value(self) -> float:
+        return statistics.median(self.samples)
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "scenario": self.scenario,
+            "unit": self.unit,
+            "better": self.better,
+            "value": self.value,
+            "samples": self.samples,
+            "extra": self.extra,
+        }
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def bench_sim(scn: Scenario, repeat: int) -> List[Measurement]:
+    """Planner-driven match: ``World.step`` ticks/s and ``SimplePlanner.act`` latency."""
+    from worldwar_jewel.ai.planner import SimplePlanner
+    from worldwar_jewel.game.world import World
+
+    cfg = scn.tuning()
+    dt = 1.0 / cfg.fps
+    rates: List[float] = []
+    act_means: List[float] = []
+    act_all: List[float] = []
+    ticks = units = 0
+    for _ in range(repeat):
+        world = World(cfg, seed=scn.seed)
+        planners = [SimplePlanner(tid) for tid in range(cfg.team_count)]
+        step_s = 0.0
+        acts_s: List[float] = []
+        ticks = 0
+        for _ in range(scn.ticks):
+            actions = {}
+            for p in planners:
+                t = time.perf_counter()
+                actions.update(p.act(world))
+                acts_s.append(time.perf_counter() - t)
+            t = time.perf_counter()
+            world.step(actions, dt)
+            step_s += time.perf_counter() - t
+            ticks += 1
+            if world.done:
+                break
+        units = len(world.units)
+        rates.append(ticks / max(step_s, 1e-12))
+        act_means.append(sum(acts_s) / len(acts_s) * 1e6)
+        act_all.extend(acts_s)
+    act_all.sort()
+    return [
+        Measurement("world_step", scn.name, "ticks/s", "higher", rates, {"ticks": ticks, "units": units}),
+        Measurement(
+            "planner_act",
+            scn.name,
+            "us",
+            "lower",
+            act_means,
+            {"calls": len(act_all), "p50_us": _percentile(act_all, 0.5) * 1e6, "p95_us": _percentile(act_all, 0.95) * 1e6},
+        ),
+    ]
+
+
+def astar_pairs(layout, n: int, seed: int) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """Representative queries: spawn to every enemy base (long, across walls), spawn to
+    resource spots (what units path to most), then random free-cell pairs up to ``n``."""
+    rng = random.Random(seed)
+    cell = lambda p: (int(p[0]), int(p[1]))  # noqa: E731
+    pairs = []
+    for i, spawn in enumerate(layout.spawns):
+        for j, base in enumerate(layout.bases):
+            if i != j:
+                pairs.append((cell(spawn), cell(base)))
+    spots = [pos for _, pos in layout.resource_spots]
+    for spawn in layout.spawns:
+        for pos in rng.sample(spots, min(5, len(spots))):
+            pairs.append((cell(spawn), cell(pos)))
+    free = [(x, y) for x in range(layout.width) for y in range(layout.height) if (x, y) not in layout.walls]
+    while len(pairs) < n:
+        pairs.append((rng.choice(free), rng.choice(free)))
+    return pairs[:n]
+
+
+def bench_a_star(scn: Scenario, repeat: int) -> List[Measurement]:
+    from worldwar_jewel.game.mapgen import generate_map
+    from worldwar_jewel.game.pathfinding import a_star
+
+    cfg = scn.tuning()
+    layout = generate_map(cfg, cfg.team_count, seed=scn.seed)
+    pairs = astar_pairs(layout, scn.a_star_queries, scn.seed)
+    bounds = (layout.width, layout.height)
+    rates = []
+    lengths = 0
+    for _ in range(repeat):
+        lengths = 0
+        t = time.perf_counter()
+        for start, goal in pairs:
+            lengths += len(a_star(start, goal, layout.walls, bounds))
+        rates.append(len(pairs) / (time.perf_counter() - t))
+    return [Measurement("a_star", scn.name, "queries/s", "higher", rates, {"queries": len(pairs), "mean_path_len": lengths / len(pairs)})]
+
+
+def bench_mapgen(scn: Scenario, repeat: int) -> List[Measurement]:
+    from worldwar_jewel.game.mapgen import generate_map
+
+    cfg = scn.tuning()
+    samples = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for i in range(scn.maps):
+            generate_map(cfg, cfg.team_count, seed=scn.seed + i)
+        samples.append((time.perf_counter() - t) / scn.maps * 1000)
+    return [Measurement("generate_map", scn.name, "ms", "lower", samples, {"maps": scn.maps})]
+
+
+def _env_rate(env, steps: int, seed: int) -> float:
+    env.action_space.seed(seed)
+    actions = [env.action_space.sample() for _ in range(steps)]
+    env.reset(seed=seed)
+    for a in actions[:20]:  # untimed warm-up (first observation/space checks)
+        env.step(a)
+    env.reset(seed=seed)
+    t = time.perf_counter()
+    for a in actions:
+        _, _, terminated, truncated, _ = env.step(a)
+        if terminated or truncated:
+            env.reset(seed=seed)
+    return steps / (time.perf_counter() - t)
+
+
+def bench_worldwar_env(scn: Scenario, repeat: int) -> List[Measurement]:
+    from worldwar_jewel.ai.env import WorldWarEnv
+
+    env = WorldWarEnv(scn.tuning(), seed=scn.seed)
+    rates = [_env_rate(env, scn.ticks, scn.seed) for _ in range(repeat)]
+    return [Measurement("worldwar_env_step", scn.name, "steps/s", "higher", rates, {"steps": scn.ticks})]
+
+
+def bench_jewelwar_env(scn: Scenario, repeat: int) -> List[Measurement]:
+    """Legacy env; it has its own ``GameConfig``, so only the default scenario runs it."""
+    if scn.overrides:
+        return []
+    from jewel_war.env import JewelWarEnv
+
+    env = JewelWarEnv(seed=scn.seed)
+    rates = [_env_rate(env, scn.ticks, scn.seed) for _ in range(repeat)]
+    return [Measurement("jewelwar_env_step", scn.name, "steps/s", "higher", rates, {"steps": scn.ticks})]
+
+
+def bench_rollout(scn: Scenario, repeat: int) -> List[Measurement]:
+    """One full planner self-play match (headless early-stop rules) per repeat."""
+    from worldwar_jewel.ai.selfplay import rollout_once
+
+    cfg = scn.rollout_tuning()
+    samples = []
+    world = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        _, world = rollout_once(seed=scn.seed, cfg=cfg)
+        samples.append(time.perf_counter() - t)
+    ticks = int(round(world.t * cfg.fps))
+    return [
+        Measurement(
+            "rollout",
+            scn.name,
+            "s",
+            "lower",
+            samples,
+            {"ticks": ticks, "ticks_per_s": ticks / statistics.median(samples), "stop_reason": world.stop_reason},
+        )
+    ]
+
+
+CASES = {
+    "sim": bench_sim,
+    "a_star": bench_a_star,
+    "mapgen": bench_mapgen,
+    "worldwar_env": bench_worldwar_env,
+    "jewelwar_env": bench_jewelwar_env,
+    "rollout": bench_rollout,
+}
@@ -0,0 +1,227 @@
+"""
+Performance regression gate: compare benchmark results with committed baselines.
+
+Baselines live in ``bench/baselines/<scenario>.json``, one file per scenario,
+holding the median and interquartile range (IQR) of every benchmark plus the
+environment they were measured on. A result counts as a regression when it is
+worse than the baseline median by more than the tolerance *and* the two IQRs
+don't overlap, so a single noisy run can't fail the gate on its own.
+
+    python -m worldwar_jewel.bench.compare                 # run, compare, exit 1 on regression
+    python -m worldwar_jewel.bench.compare --report r.json # compare an existing report
+    python -m worldwar_jewel.bench.compare --update        # re-measure and rewrite the baselines
+
+Tolerances default to ``DEFAULT_TOLERANCE``; a baseline file may override them
+per benchmark (``"tolerances": {"rollout": 0.3}``), and ``--tolerance`` takes
+``0.2`` (everything) or ``name=0.2`` on the command line.
+"""
+
+import json
+import statistics
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from worldwar_jewel.bench.runner import SCHEMA, load_report, run_suite
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_TOLERANCE = 0.20
+GATE_REPEAT = 7
+# env keys that must match for timings to be comparable at all
+ENV_KEYS = ("implementation", "python", "machine", "cpu_count")
+
+
+def quartiles(samples: List[float]) -> Tuple[float, float, float]:
+    """(q1, median, q3); a single sample has zero spread."""
+    if len(samples) < 2:
+        v = samples[0]
+        return v, v, v
+    q1, med, q3 = statistics.quantiles(samples, n=4, method="inclusive")
+    return q1, med, q3
+
+
+def summarize(result: Dict) -> Dict:
+    q1, med, q3 = quartiles(result["samples"])
+    return {"unit": result["unit"], "better": result["better"], "median": med, "q1": q1, "q3": q3, "samples": result["samples"]}
+
+
+def baseline_path(scenario: str, directory: Path = BASELINE_DIR) -> Path:
+    return Path(directory) / f"{scenario}.json"
+
+
+def load_baseline(scenario: str, directory: Path = BASELINE_DIR) -> Optional[Dict]:
+    path = baseline_path(scenario, directory)
+    if not path.exists():
+        return None
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("schema") != SCHEMA:
+        raise ValueError(f"{path}: unsupported baseline schema {data.get('schema')!r}")
+    return data
+
+
+def write_baselines(report: Dict, directory: Path = BASELINE_DIR) -> List[Path]:
+    """One baseline file per scenario in ``report``; per-benchmark tolerances already in a file are kept."""
+    by_scenario: Dict[str, Dict[str, Dict]] = {}
+    for r in report["results"]:
+        by_scenario.setdefault(r["scenario"], {})[r["name"]] = summarize(r)
+    written = []
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    for scenario, benchmarks in by_scenario.items():
+        old = load_baseline(scenario, directory) or {}
+        data = {
+            "schema": SCHEMA,
+            "scenario": scenario,
+            "created": report["created"],
+            "env": report["env"],
+            "repeat": report["settings"]["repeat"],
+            "tolerances": old.get("tolerances", {}),
+            "benchmarks": benchmarks,
+        }
+        path = baseline_path(scenario, directory)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+            f.write("\n")
+        written.append(path)
+    return written
+
+
+@dataclass
+class Comparison:
+    name: str
+    scenario: str
+    unit: str
+    status: str  # ok, faster, REGRESSION, noisy, new, missing
+    change: float = 0.0  # relative, positive = worse
+    tolerance: float = DEFAULT_TOLERANCE
+    base: Optional[Dict] = None
+    cur: Optional[Dict] = None
+
+
+def compare_one(base: Dict, cur: Dict, tolerance: float) -> Tuple[str, float]:
+    sign = 1.0 if cur["better"] == "lower" else -1.0
+    change = sign * (cur["median"] - base["median"]) / base["median"] if base["median"] else 0.0
+    # IQRs overlap -> the difference is within run-to-run noise
+    overlap = cur["q1"] <= base["q3"] and base["q1"] <= cur["q3"]
+    if change > tolerance:
+        return ("noisy" if overlap else "REGRESSION"), change
+    if change < -tolerance and not overlap:
+        return "faster", change
+    return "ok", change
+
+
+def compare_report(report: Dict, directory: Path = BASELINE_DIR, tolerances: Optional[Dict[str, float]] = None) -> List[Comparison]:
+    tolerances = tolerances or {}
+    out: List[Comparison] = []
+    baselines: Dict[str, Optional[Dict]] = {}
+    seen = set()
+    for r in report["results"]:
+        scenario = r["scenario"]
+        if scenario not in baselines:
+            baselines[scenario] = load_baseline(scenario, directory)
+        data = baselines[scenario]
+        cur = summarize(r)
+        seen.add((scenario, r["name"]))
+        base = (data or {}).get("benchmarks", {}).get(r["name"])
+        tol = tolerances.get(r["name"], (data or {}).get("tolerances", {}).get(r["name"], tolerances.get("*", DEFAULT_TOLERANCE)))
+        if base is None:
+            out.append(Comparison(r["name"], scenario, r["unit"], "new", tolerance=tol, cur=cur))
+            continue
+        status, change = compare_one(base, cur, tol)
+        out.append(Comparison(r["name"], scenario, r["unit"], status, change, tol, base, cur))
+    for scenario, data in baselines.items():
+        for name, base in (data or {}).get("benchmarks", {}).items():
+            if (scenario, name) not in seen and name in _measured_names(report):
+                out.append(Comparison(name, scenario, base["unit"], "missing", base=base))
+    return out
+
+
+def _measured_names(report: Dict) -> set:
+    return {r["name"] for r in report["results"]}
+
+
+def env_mismatch(report: Dict, directory: Path = BASELINE_DIR) -> List[str]:
+    """Human-readable differences between the report's machine and each baseline's."""
+    notes = []
+    for scenario in sorted({r["scenario"] for r in report["results"]}):
+        data = load_baseline(scenario, directory)
+        if data is None:
+            continue
+        for key in ENV_KEYS:
+            a, b = data["env"].get(key), report["env"].get(key)
+            if a != b:
+                notes.append(f"{scenario}: baseline {key}={a}, now {b}")
+    return notes
+
+
+def _num(v: float) -> str:
+    return f"{v:.0f}" if abs(v) >= 100 else f"{v:.3g}"
+
+
+def _fmt(s: Optional[Dict]) -> str:
+    if s is None:
+        return "-"
+    return f"{_num(s['median'])} ±{_num((s['q3'] - s['q1']) / 2)}"
+
+
+def format_comparison(rows: List[Comparison]) -> str:
+    lines = [f"{'benchmark':<20} {'scenario':<15} {'baseline':>18} {'current':>18} {'change':>8} {'tol':>5}  status"]
+    order = {"REGRESSION": 0, "missing": 1, "noisy": 2, "new": 3, "faster": 4, "ok": 5}
+    for c in sorted(rows, key=lambda c: (order.get(c.status, 9), c.scenario, c.name)):
+        change = f"{c.change:+.1%}" if c.base is not None and c.cur is not None else ""
+        lines.append(f"{c.name:<20} {c.scenario:<15} {_fmt(c.base):>18} {_fmt(c.cur):>18} {change:>8} {c.tolerance:5.0%}  {c.status} ({c.unit})")
+    return "\n".join(lines)
+
+
+def parse_tolerances(values: List[str]) -> Dict[str, float]:
+    out = {}
+    for v in values or []:
+        name, _, frac = v.rpartition("=")
+        out[name or "*"] = float(frac)
+    return out
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="python -m worldwar_jewel.bench.compare", description="Fail when benchmarks regress against the committed baselines.")
+    ap.add_argument("--report", default="", help="Compare this benchmark JSON instead of running the suite.")
+    ap.add_argument("--scenario", action="append", help="Scenario to run (repeatable; default: every scenario with a baseline).")
+    ap.add_argument("--case", action="append", help="Benchmark case to run (repeatable; default: all).")
+    ap.add_argument("--repeat", type=int, default=GATE_REPEAT, help="Samples per benchmark.")
+    ap.add_argument("--tolerance", action="append", default=[], help="Allowed slowdown: '0.2' for all, or 'a_star=0.3' (repeatable).")
+    ap.add_argument("--baselines", default=str(BASELINE_DIR), help="Baseline directory.")
+    ap.add_argument("--update", action="store_true", help="Write the results as the new baselines instead of comparing.")
+    ap.add_argument("--out", default="", help="Also save the benchmark report here.")
+    args = ap.parse_args(argv)
+
+    directory = Path(args.baselines)
+    if args.report:
+        report = load_report(args.report)
+    else:
+        scenarios = args.scenario or sorted(p.stem for p in directory.glob("*.json")) or None
+        report = run_suite(scenarios, args.case, repeat=max(2, args.repeat), progress=lambda s: print(f"... {s}", file=sys.stderr))
+    if args.out:
+        from worldwar_jewel.bench.runner import write_report
+
+        write_report(report, args.out)
+    if args.update:
+        for path in write_baselines(report, directory):
+            print(f"baseline written: {path}")
+        return 0
+
+    for note in env_mismatch(report, directory):
+        print(f"warning: {note} (timings may not be comparable)")
+    rows = compare_report(report, directory, parse_tolerances(args.tolerance))
+    print(format_comparison(rows))
+    bad = [c for c in rows if c.status in ("REGRESSION", "missing")]
+    if bad:
+        print(f"\n{len(bad)} benchmark(s) regressed beyond tolerance.")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
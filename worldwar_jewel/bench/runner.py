@@ -0,0 +1,137 @@
+"""
+Runs benchmark cases over scenarios and builds the JSON report.
+
+Report layout (``schema`` 1)::
+
+    {"schema": 1, "created": "...Z", "env": {...}, "settings": {...},
+     "results": [{"name", "scenario", "unit", "better", "value", "samples", "extra"}, ...]}
+
+``env`` records interpreter, platform, CPU, dependency versions and the git
+revision, so numbers from different machines or releases are never compared
+blindly.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from worldwar_jewel.bench.cases import CASES, Measurement
+from worldwar_jewel.bench.scenarios import QUICK, SCENARIOS
+
+SCHEMA = 1
+
+
+def _version(dist: str) -> Optional[str]:
+    try:
+        from importlib.metadata import version
+
+        return version(dist)
+    except Exception:
+        return None
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        out = subprocess.run(["git", *args], capture_output=True, text=True, timeout=5, cwd=Path(__file__).resolve().parent)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def environment() -> Dict:
+    commit = _git("rev-parse", "HEAD")
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "packages": {name: _version(name) for name in ("numpy", "pygame", "gymnasium")},
+        "git_commit": commit,
+        "git_dirty": bool(_git("status", "--porcelain", "--untracked-files=no")) if commit else None,
+    }
+
+
+def run_suite(
+    scenarios: Optional[Iterable[str]] = None,
+    cases: Optional[Iterable[str]] = None,
+    repeat: int = 5,
+    quick: bool = False,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict:
+    """Run ``cases`` x ``scenarios`` (default: all; ``quick``: the small scenarios) and return the report."""
+    names = list(scenarios) if scenarios else list(QUICK if quick else SCENARIOS)
+    case_names = list(cases) if cases else list(CASES)
+    for n in names:
+        if n not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {n!r}; choose from {', '.join(SCENARIOS)}")
+    for c in case_names:
+        if c not in CASES:
+            raise ValueError(f"Unknown case {c!r}; choose from {', '.join(CASES)}")
+    results: List[Measurement] = []
+    t0 = time.perf_counter()
+    for n in names:
+        for c in case_names:
+            if progress:
+                progress(f"{c} [{n}]")
+            results.extend(CASES[c](SCENARIOS[n], repeat))
+    return {
+        "schema": SCHEMA,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "env": environment(),
+        "settings": {"repeat": repeat, "quick": quick, "scenarios": names, "cases": case_names, "wall_s": time.perf_counter() - t0},
+        "results": [m.to_dict() for m in results],
+    }
+
+
+def format_report(report: Dict) -> str:
+    lines = [f"{'benchmark':<20} {'scenario':<15} {'median':>12} {'unit':<10} {'spread':>7}"]
+    for r in report["results"]:
+        s = r["samples"]
+        spread = (max(s) - min(s)) / r["value"] if r["value"] else 0.0
+        value = f"{r['value']:12.1f}" if r["value"] >= 100 else f"{r['value']:12.3f}"
+        lines.append(f"{r['name']:<20} {r['scenario']:<15} {value} {r['unit']:<10} {spread:7.1%}")
+    env = report["env"]
+    commit = (env.get("git_commit") or "?")[:10] + (" (dirty)" if env.get("git_dirty") else "")
+    lines.append(f"python {env['python']} on {env['platform']}, {env['cpu_count']} CPUs, commit {commit}")
+    return "\n".join(lines)
+
+
+def write_report(report: Dict, path: str):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+def load_report(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("schema") != SCHEMA:
+        raise ValueError(f"{path}: unsupported benchmark schema {report.get('schema')!r}")
+    return report
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="python -m worldwar_jewel.bench", description="World War Jewel benchmarks (JSON report).")
+    ap.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run (repeatable; default: all).")
+    ap.add_argument("--case", action="append", choices=sorted(CASES), help="Case to run (repeatable; default: all).")
+    ap.add_argument("--repeat", type=int, default=5, help="Samples per benchmark; the median is reported.")
+    ap.add_argument("--quick", action="store_true", help="Default scenario only, 3 repeats.")
+    ap.add_argument("--out", default="", help="Write the JSON report here.")
+    ap.add_argument("--json", action="store_true", help="Print the JSON report instead of the table.")
+    args = ap.parse_args(argv)
+
+    repeat = min(args.repeat, 3) if args.quick else args.repeat
+    report = run_suite(args.scenario, args.case, repeat=max(1, repeat), quick=args.quick, progress=lambda s: print(f"... {s}", file=sys.stderr))
+    if args.out:
+        write_report(report, args.out)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
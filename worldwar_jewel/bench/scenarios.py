@@ -0,0 +1,44 @@
+"""
+Reproducible benchmark scenarios: a fixed seed plus ``GameTuning`` overrides.
+
+Scenarios start from ``GameTuning()`` (not ``headless_tuning``), so matches
+never end early and every run steps the same number of ticks. Only
+``rollout`` uses the headless early-stop rules, because those are what self-play
+actually runs with.
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, Tuple
+
+from worldwar_jewel.config import GameTuning, headless_tuning
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    seed: int = 1
+    overrides: Dict[str, object] = field(default_factory=dict)
+    ticks: int = 900  # World.step / planner / env steps measured per repeat
+    a_star_queries: int = 200
+    maps: int = 10  # generate_map calls per repeat
+
+    def tuning(self) -> GameTuning:
+        return replace(GameTuning(), **self.overrides)
+
+    def rollout_tuning(self) -> GameTuning:
+        return replace(headless_tuning(), **self.overrides)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    s.name: s
+    for s in (
+        Scenario("default"),
+        Scenario("teams4_squad6", seed=2, overrides={"team_count": 4, "squad_size": 6}),
+        Scenario("large_map", seed=3, overrides={"width": 128, "height": 80, "resources_on_map": 180}, ticks=600, maps=4),
+        Scenario("crowded", seed=4, overrides={"team_count": 6, "squad_size": 8, "width": 96, "height": 60, "resources_on_map": 100}, ticks=450, maps=4),
+        Scenario("fog", seed=5, overrides={"fog_of_war": True}),
+    )
+}
+
+# Scenarios small enough for a quick local check (``--quick``).
+QUICK: Tuple[str, ...] = ("default",)
@@ -71,6 +71,16 @@ class GameTuning:
     projectile_speed: float = 14.0
     wall_spacing: float = 0.9
 
+    # fog of war (game.systems.visibility): units/buildings see ClassStats.sight /
+    # BuildingStats.vision tiles, map walls block line of sight; planners and env
+    # observations only get what their team sees
+    fog_of_war: bool = False
+
+    # headless early termination (self-play/training only; 0 disables each rule)
+    stalemate_s: float = 0.0  # end if no score-relevant event happens for this long
+    early_margin: float = 0.0  # end once the timeout-score leader is ahead by this much
+    early_min_s: float = 60.0  # earliest sim time at which early_margin may end a match
+
 
 # --- Defaults --------------------------------------------------------------
 
@@ -160,3 +170,12 @@ BUILDING_PRESETS: Dict[str, BuildingStats] = {
         blocks_movement=True,
     ),
 }
+
+
+# --- Helpers ---------------------------------------------------------------
+
+def headless_tuning(**overrides) -> GameTuning:
+    """GameTuning with early termination enabled, for rollouts nobody watches."""
+    params = {"stalemate_s": 45.0, "early_margin": 60.0, "early_min_s": 180.0}
+    params.update(overrides)
+    return GameTuning(**params)
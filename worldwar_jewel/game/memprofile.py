@@ -0,0 +1,230 @@
+"""
+Allocation and growth profiling for long matches and training workers.
+
+Attach a ``MemoryProfiler`` as ``world.memory`` and every ``every`` ticks it
+takes a ``tracemalloc`` snapshot, diffs it against the previous one and charges
+the net change (bytes and blocks still alive) to the allocating call site, then
+records the entity-list sizes of the world. tracemalloc sees live memory, not
+churn: a site that allocates and frees within the interval shows up as zero,
+which is exactly what separates a leak from a hot loop.
+
+One profiler can follow many matches (a training worker keeps one per process):
+at every match end it also records the traced total, so creep across matches is
+visible even when each world is thrown away. ``growth_flags`` reports series that
+keep growing: entity lists within a match, traced memory across matches, and
+call sites whose retained memory went up in most intervals.
+
+tracemalloc slows Python down noticeably (roughly 2-4x); this is a diagnostic
+mode, not something to leave on. Summaries are plain dicts (``summary``) for
+queues and JSON; with ``dump_dir`` set one line per match is appended to
+``<dump_dir>/memory_profile.jsonl``.
+"""
+
+import json
+import os
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+MEMORY_FILE = "memory_profile.jsonl"
+# growth rules: a series is flagged once it has this many points, rose in this
+# share of its intervals and ended this much above where it started
+GROWTH_MIN_POINTS = 4
+GROWTH_RISING_SHARE = 0.8
+GROWTH_MIN_RATIO = 1.5
+CREEP_MIN_RATIO = 1.1  # across matches even slow creep matters
+SITE_MIN_BYTES = 64 * 1024
+
+_IGNORED = (tracemalloc.__file__, __file__, "<frozen *>", "<unknown>")
+
+
+def rss_bytes() -> Optional[int]:
+    """Current resident set size, where the OS exposes it cheaply (Linux); None elsewhere."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError, IndexError):
+        return None
+
+
+def world_sizes(world) -> Dict[str, int]:
+    """Lengths of the world's entity containers; ``*_dead`` count entries kept after death."""
+    return {
+        "units": len(world.units),
+        "units_dead": sum(1 for u in world.units if u.hp <= 0),
+        "buildings": len(world.buildings),
+        "buildings_dead": sum(1 for b in world.buildings if b.hp <= 0),
+        "team_buildings": sum(len(t.buildings) for t in world.teams.values()),
+        "resources": len(world.resources),
+        "jewels": len(world.jewels),
+    }
+
+
+def rising(values: Sequence[float], min_ratio: float = GROWTH_MIN_RATIO, min_points: int = GROWTH_MIN_POINTS) -> bool:
+    """True when ``values`` rose (or held) in most intervals and ended well above the start."""
+    if len(values) < min_points:
+        return False
+    steps = list(zip(values, values[1:]))
+    up = sum(1 for a, b in steps if b >= a)
+    grew = sum(1 for a, b in steps if b > a)
+    first, last = values[0], values[-1]
+    return grew > 0 and up / len(steps) >= GROWTH_RISING_SHARE and last > max(first, 1) * min_ratio
+
+
+@dataclass
+class SiteStat:
+    bytes: int = 0  # net retained since the profiler started
+    blocks: int = 0
+    intervals: int = 0  # snapshot intervals the site appeared in
+    grew: int = 0  # ...of which it retained more than before
+
+
+@dataclass
+class MemorySample:
+    tick: int
+    time: float
+    traced: int
+    sizes: Dict[str, int] = field(default_factory=dict)
+
+
+def _site(stat: tracemalloc.StatisticDiff) -> str:
+    frame = stat.traceback[0]
+    name = frame.filename.replace("\\", "/")
+    for marker in ("/site-packages/", "/worldwar_jewel/", "/jewel_war/", "/lib/python"):
+        i = name.rfind(marker)
+        if i >= 0:
+            name = name[i + 1 :]
+            break
+    return f"{name}:{frame.lineno}"
+
+
+class MemoryProfiler:
+    def __init__(self, every: int = 300, top: int = 12, dump_dir: str = "", echo: bool = False, frames: int = 1):
+        self.every = max(1, every)
+        self.top = top
+        self.dump_dir = dump_dir
+        self.echo = echo  # also print the report at match end
+        self.pid = os.getpid()
+        self._owns_tracing = not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start(frames)
+        self._snapshot = self._take()
+        self.ticks = 0  # all matches
+        self.match_ticks = 0
+        self.matches = 0
+        self.samples: List[MemorySample] = []  # current match
+        self.last_samples: List[MemorySample] = []  # previous match
+        self.match_ends: List[Tuple[int, int]] = []  # (ticks so far, traced bytes) after each match
+        self.sites: Dict[str, SiteStat] = {}
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, pattern) for pattern in _IGNORED])
+
+    def on_step(self, world):
+        self.ticks += 1
+        self.match_ticks += 1
+        if world.done:
+            self.sample(world)
+            self.end_match(world)
+        elif self.match_ticks % self.every == 0:
+            self.sample(world)
+
+    def sample(self, world) -> MemorySample:
+        """Diff against the previous snapshot and record the world's container sizes."""
+        snap = self._take()
+        for stat in snap.compare_to(self._snapshot, "lineno"):
+            if not stat.size_diff and not stat.count_diff:
+                continue
+            st = self.sites.setdefault(_site(stat), SiteStat())
+            st.bytes += stat.size_diff
+            st.blocks += stat.count_diff
+            st.intervals += 1
+            st.grew += stat.size_diff > 0
+        self._snapshot = snap
+        s = MemorySample(self.match_ticks, world.t, tracemalloc.get_traced_memory()[0], world_sizes(world))
+        self.samples.append(s)
+        return s
+
+    def end_match(self, world):
+        self.matches += 1
+        self.match_ends.append((self.ticks, self.samples[-1].traced if self.samples else tracemalloc.get_traced_memory()[0]))
+        self.last_samples, self.samples = self.samples, []
+        self.match_ticks = 0
+        if self.dump_dir:
+            path = Path(self.dump_dir)
+            path.mkdir(parents=True, exist_ok=True)
+            line = {"seed": world.seed, "time": world.t, "stop_reason": world.stop_reason, **self.summary()}
+            with open(path / MEMORY_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(line) + "\n")
+        if self.echo:
+            print(f"Memory profile (seed {world.seed}, {world.stop_reason}):")
+            print(self.format())
+
+    def top_sites(self, n: Optional[int] = None) -> List[Tuple[str, SiteStat]]:
+        return sorted(self.sites.items(), key=lambda kv: kv[1].bytes, reverse=True)[: n or self.top]
+
+    def growth_flags(self) -> List[str]:
+        """Human-readable notes for every series that keeps growing."""
+        flags = []
+        samples = self.samples or self.last_samples
+        for key in samples[0].sizes if samples else ():
+            series = [s.sizes[key] for s in samples]
+            if rising(series) and series[-1] - series[0] >= 10:
+                flags.append(f"world.{key}: {series[0]} -> {series[-1]} over {samples[-1].tick} ticks")
+        ends = [traced for _, traced in self.match_ends]
+        if rising(ends, CREEP_MIN_RATIO):
+            flags.append(f"traced memory after each match: {ends[0] / 1024:.0f} -> {ends[-1] / 1024:.0f} KiB over {len(ends)} matches")
+        for name, st in self.top_sites():
+            if st.bytes >= SITE_MIN_BYTES and st.intervals >= GROWTH_MIN_POINTS and st.grew / st.intervals >= GROWTH_RISING_SHARE:
+                flags.append(f"{name}: +{st.bytes / 1024:.0f} KiB retained, grew in {st.grew}/{st.intervals} intervals")
+        return flags
+
+    def summary(self) -> Dict:
+        traced, peak = tracemalloc.get_traced_memory()
+        samples = self.samples or self.last_samples
+        return {
+            "pid": self.pid,
+            "ticks": self.ticks,
+            "matches": self.matches,
+            "traced_bytes": traced,
+            "peak_bytes": peak,
+            "rss_bytes": rss_bytes(),
+            "sizes": samples[-1].sizes if samples else {},
+            "match_end_traced": [traced for _, traced in self.match_ends[-20:]],
+            "top_sites": [
+                {"site": name, "bytes": st.bytes, "blocks": st.blocks, "bytes_per_tick": st.bytes / max(self.ticks, 1), "grew": st.grew, "intervals": st.intervals}
+                for name, st in self.top_sites()
+            ],
+            "flags": self.growth_flags(),
+        }
+
+    def format(self) -> str:
+        return format_summary(self.summary(), self.samples or self.last_samples)
+
+    def stop(self):
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+
+def format_summary(summary: Dict, samples: Sequence[MemorySample] = ()) -> str:
+    """Table of retained memory by call site, entity sizes over the match and growth flags."""
+    rss = summary.get("rss_bytes")
+    lines = [
+        f"pid {summary['pid']}: {summary['ticks']} ticks, {summary['matches']} matches, traced {summary['traced_bytes'] / 1024:.0f} KiB"
+        f" (peak {summary['peak_bytes'] / 1024:.0f} KiB)" + (f", rss {rss / 2**20:.1f} MiB" if rss else "")
+    ]
+    lines.append(f"  {'call site (net retained)':<50} {'KiB':>9} {'blocks':>8} {'B/tick':>8} {'grew':>7}")
+    for row in summary["top_sites"]:
+        grew = f"{row['grew']}/{row['intervals']}"
+        lines.append(f"  {row['site'][-50:]:<50} {row['bytes'] / 1024:9.1f} {row['blocks']:8d} {row['bytes_per_tick']:8.1f} {grew:>7}")
+    if samples:
+        keys = list(samples[0].sizes)
+        lines.append("  " + f"{'tick':>6} {'KiB':>8} " + " ".join(f"{k:>14}" for k in keys))
+        step = max(1, len(samples) // 8)  # at most ~8 rows plus the last one
+        for s in list(samples[::step]) + ([samples[-1]] if (len(samples) - 1) % step else []):
+            lines.append("  " + f"{s.tick:6d} {s.traced / 1024:8.0f} " + " ".join(f"{s.sizes[k]:14d}" for k in keys))
+    for flag in summary["flags"]:
+        lines.append(f"  GROWTH {flag}")
+    return "\n".join(lines)
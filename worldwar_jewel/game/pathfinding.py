@@ -1,6 +1,8 @@
 import heapq
 from typing import Dict, List, Set, Tuple
 
+from worldwar_jewel.tracing import traced
+
 GridPos = Tuple[int, int]
 
 
@@ -13,6 +15,7 @@ def neighbors(pos: GridPos) -> List[GridPos]:
     return [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
 
 
+@traced("a_star", "path")
 def a_star(start: GridPos, goal: GridPos, blocked: Set[GridPos], bounds: Tuple[int, int]) -> List[GridPos]:
     """Simple grid A*; returns path including goal (excludes start)."""
     width, height = bounds
@@ -0,0 +1,228 @@
+"""
+Fog of war: per-team visibility grids kept up to date incrementally.
+
+Every living unit (``ClassStats.sight``) and building with ``BuildingStats.vision``
+is a vision source. Its field of view is computed once per (cell, radius) by
+recursive shadowcasting against the map walls and cached, as a bitmask over the
+flat cell indices, for the lifetime of the layout. A team's visibility grid is
+the union (OR) of its sources' masks; ``update`` only looks up sources whose
+cell, radius or existence changed since the last call and redoes the union just
+for their teams, so a tick where nobody crossed a cell boundary costs one pass
+over the entity lists and a union is a few dozen machine-word ORs.
+
+Player-built walls block movement but not sight: only ``layout.walls`` are
+opaque, which is what makes the per-cell cache valid for the whole match.
+The grids are derived state: ``rebuild`` recomputes them from scratch and gives
+exactly what the incremental updates give.
+"""
+
+import math
+from typing import Dict, Iterable, List, Set, Tuple
+
+GridPos = Tuple[int, int]
+Vec2 = Tuple[float, float]
+
+# (xx, xy, yx, yy) transforms mapping octant 0 onto the other seven
+_OCTANTS = (
+    (1, 0, 0, -1),
+    (0, 1, -1, 0),
+    (0, -1, -1, 0),
+    (-1, 0, 0, -1),
+    (-1, 0, 0, 1),
+    (0, -1, 1, 0),
+    (0, 1, 1, 0),
+    (1, 0, 0, 1),
+)
+
+
+_ROWS: Dict[float, List[List[Tuple[int, float, float, bool]]]] = {}
+
+
+def _rows(radius: float) -> List[List[Tuple[int, float, float, bool]]]:
+    """Per-row (dx, left slope, right slope, within radius) for octant 0; the same for every origin."""
+    rows = _ROWS.get(radius)
+    if rows is None:
+        r2 = radius * radius
+        rows = [[]]
+        for j in range(1, int(math.ceil(radius)) + 1):
+            dy = -j
+            rows.append([(dx, (dx - 0.5) / (dy + 0.5), (dx + 0.5) / (dy - 0.5), dx * dx + dy * dy <= r2) for dx in range(-j, 1)])
+        rows = _ROWS.setdefault(radius, rows)
+    return rows
+
+
+def shadowcast(origin: GridPos, radius: float, opaque: Set[GridPos], bounds: Tuple[int, int]) -> Tuple[int, ...]:
+    """Flat indices (``y * width + x``) of the cells visible from ``origin`` within ``radius``.
+
+    Opaque cells are visible themselves but hide what lies behind them; cells
+    outside ``bounds`` count as opaque.
+    """
+    width, height = bounds
+    ox, oy = origin
+    rows = _rows(radius)
+    r_max = len(rows) - 1
+    out = set()
+    if 0 <= ox < width and 0 <= oy < height:
+        out.add(oy * width + ox)
+
+    def cast(row: int, start: float, end: float, xx: int, xy: int, yx: int, yy: int):
+        if start < end:
+            return
+        new_start = start
+        for j in range(row, r_max + 1):
+            dy = -j
+            bx = ox + dy * xy
+            by = oy + dy * yy
+            blocked = False
+            for dx, l_slope, r_slope, lit in rows[j]:
+                if start < r_slope:
+                    continue
+                if end > l_slope:
+                    break
+                x = bx + dx * xx
+                y = by + dx * yx
+                if 0 <= x < width and 0 <= y < height:
+                    if lit:
+                        out.add(y * width + x)
+                    wall = (x, y) in opaque
+                else:
+                    wall = True
+                if blocked:
+                    if wall:
+                        new_start = r_slope
+                    else:
+                        blocked = False
+                        start = new_start
+                elif wall and j < r_max:
+                    blocked = True
+                    cast(j + 1, start, l_slope, xx, xy, yx, yy)
+                    new_start = r_slope
+            if blocked:
+                break
+
+    for octant in _OCTANTS:
+        cast(1, 1.0, 0.0, *octant)
+    return tuple(sorted(out))
+
+
+def cells_mask(cells: Iterable[int], n: int) -> int:
+    """Bitmask (bit ``i`` = flat cell ``i``) of a field of view, for O(words) unions."""
+    bits = bytearray((n + 7) // 8)
+    for i in cells:
+        bits[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(bits, "little")
+
+
+class Visibility:
+    def __init__(self, layout, team_ids: Iterable[int]):
+        self.width = layout.width
+        self.height = layout.height
+        self.opaque: Set[GridPos] = layout.walls
+        self.cells = self.width * self.height
+        # per team, bit i set = flat cell i currently seen by at least one source
+        self.visible: Dict[int, int] = {tid: 0 for tid in team_ids}
+        # entity id -> (team_id, cell, radius, fov mask, pos it was last seen at)
+        self._unit_sources: Dict[int, Tuple[int, GridPos, float, int, Vec2]] = {}
+        self._building_sources: Dict[int, Tuple[int, GridPos, float, int, Vec2]] = {}
+        self._fov_cache: Dict[Tuple[GridPos, float], int] = {}
+
+    # ------------------------------------------------------------- updating
+    def fov(self, cell: GridPos, radius: float) -> int:
+        """Cached field-of-view mask of a source standing on ``cell``."""
+        key = (cell, radius)
+        mask = self._fov_cache.get(key)
+        if mask is None:
+            cells = shadowcast(cell, radius, self.opaque, (self.width, self.height))
+            mask = self._fov_cache[key] = cells_mask(cells, self.cells)
+        return mask
+
+    def _cell(self, pos: Vec2) -> GridPos:
+        return min(self.width - 1, max(0, int(pos[0]))), min(self.height - 1, max(0, int(pos[1])))
+
+    def update(self, world):
+        """Bring the grids in line with the world's current units and buildings.
+
+        Only sources that appeared, vanished, changed team/radius or crossed into
+        another cell are looked up again, and only their teams' masks are redone.
+        """
+        dirty: Set[int] = set()
+        self._sync(world.units, "sight", self._unit_sources, dirty)
+        self._sync(world.buildings, "vision", self._building_sources, dirty)
+        for tid in dirty:
+            mask = 0
+            for sources in (self._unit_sources, self._building_sources):
+                for src in sources.values():
+                    if src[0] == tid:
+                        mask |= src[3]
+            self.visible[tid] = mask
+
+    def _sync(self, entities, attr: str, sources: Dict, dirty: Set[int]):
+        teams = self.visible
+        live = 0
+        for e in entities:
+            if e.hp <= 0 or e.team_id not in teams:
+                continue
+            radius = getattr(e.stats, attr)
+            if radius <= 0:
+                continue
+            live += 1
+            pos = e.pos
+            old = sources.get(e.id)
+            if old is not None and old[0] == e.team_id and old[2] == radius:
+                # positions are replaced, never mutated: same tuple, same cell
+                if old[4] is pos:
+                    continue
+                cell = old[1]
+                if cell[0] == int(pos[0]) and cell[1] == int(pos[1]):
+                    continue
+            if old is not None:
+                dirty.add(old[0])
+            cell = self._cell(pos)
+            sources[e.id] = (e.team_id, cell, radius, self.fov(cell, radius), pos)
+            dirty.add(e.team_id)
+        if live != len(sources):
+            # something died or was removed: drop the sources not visited above
+            alive = {e.id for e in entities if e.hp > 0}
+            for key in [k for k in sources if k not in alive]:
+                dirty.add(sources.pop(key)[0])
+
+    def clone(self) -> "Visibility":
+        """Independent grids for another world on the same layout; the FOV cache depends
+        only on the layout, so it is shared rather than recomputed."""
+        other = Visibility.__new__(Visibility)
+        other.width, other.height, other.opaque, other.cells = self.width, self.height, self.opaque, self.cells
+        other.visible = dict(self.visible)
+        other._unit_sources = dict(self._unit_sources)
+        other._building_sources = dict(self._building_sources)
+        other._fov_cache = self._fov_cache
+        return other
+
+    def rebuild(self, world):
+        """Recompute from scratch (after a world's state was replaced, e.g. a snapshot restore)."""
+        self._unit_sources.clear()
+        self._building_sources.clear()
+        for tid in self.visible:
+            self.visible[tid] = 0
+        self.update(world)
+
+    # -------------------------------------------------------------- queries
+    def is_visible(self, team_id: int, pos: Vec2) -> bool:
+        x, y = self._cell(pos)
+        return bool(self.visible[team_id] >> (y * self.width + x) & 1)
+
+    def visible_units(self, world, team_id: int, enemies_only: bool = False) -> List:
+        """Living units ``team_id`` can see: its own plus enemies standing on a visible cell."""
+        mask = self.visible[team_id]
+        w, h = self.width, self.height
+        out = []
+        for u in world.units:
+            if u.hp <= 0:
+                continue
+            if u.team_id == team_id:
+                if not enemies_only:
+                    out.append(u)
+                continue
+            x, y = int(u.pos[0]), int(u.pos[1])
+            if 0 <= x < w and 0 <= y < h and mask >> (y * w + x) & 1:
+                out.append(u)
+        return out
@@ -1,8 +1,10 @@
 import math
 import random
+import time
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple, Union
 
+from worldwar_jewel import tracing
 from worldwar_jewel.config import (
     BUILDING_PRESETS,
     CLASS_PRESETS,
@@ -16,6 +18,7 @@ from worldwar_jewel.game.mapgen import MapLayout, generate_map
 from worldwar_jewel.game.pathfinding import a_star
 from worldwar_jewel.game.systems import capture_rules, combat
 from worldwar_jewel.game.systems.building_system import repair, start_build
+from worldwar_jewel.game.systems.visibility import Visibility
 
 Vec2 = Tuple[float, float]
 
@@ -59,6 +62,21 @@ def _action_from_int(val: int) -> ActionCommand:
     return ActionCommand(kind=kind)
 
 
+_SHORTCUT_CODES = {kind: code for code, kind in ACTION_SHORTCUTS.items()}
+
+
+def command_to_int(cmd: ActionCommand) -> int:
+    """Nearest ``ACTION_SHORTCUTS`` code; moves snap to their dominant axis."""
+    if cmd.kind == "move":
+        dx, dy = cmd.target or (0.0, 0.0)
+        if abs(dx) < 1e-9 and abs(dy) < 1e-9:
+            return 0
+        if abs(dx) >= abs(dy):
+            return 4 if dx > 0 else 3
+        return 2 if dy > 0 else 1
+    return _SHORTCUT_CODES.get(cmd.kind, 0)
+
+
 @dataclass
 class TeamState:
     id: int
@@ -78,16 +96,32 @@ class World:
         cfg: GameTuning | None = None,
         seed: Optional[int] = None,
         team_classes: Optional[Dict[int, List[str]]] = None,
+        layout: Optional[MapLayout] = None,  # prebuilt map, skips generation (savegames)
     ):
         self.cfg = cfg or GameTuning()
+        self.seed = seed
         self.rng = random.Random(seed)
-        self.layout: MapLayout = generate_map(self.cfg, self.cfg.team_count, seed=seed)
+        self.layout: MapLayout = layout or generate_map(self.cfg, self.cfg.team_count, seed=seed)
         self.t = 0.0
         self.done = False
         self.winner: Optional[int] = None
+        # "jewel", "domination", "timeout", "stalemate" or "projected" once done
+        self.stop_reason: Optional[str] = None
+        self._last_event_t = 0.0
+        self._next_early_check = 0.0
+        # closest a carried jewel (by home team) has come to its carrier's base
+        self._carry_best: Dict[int, float] = {}
+        # optional step hook (see storage.recorder): on_step(world, actions, dt) -> actions, on_done(world)
+        self.recorder = None
+        # optional per-phase timing (see game.profiling.StepProfiler); spans while tracing is on
+        self.profiler = tracing.world_hook()
+        # optional allocation/entity growth sampling (see game.memprofile.MemoryProfiler): on_step(world)
+        self.memory = None
 
         self.resources: List[ResourceNode] = []
         self.units: List[Unit] = []
+        # standing buildings only: destroyed ones are dropped here and from TeamState.buildings
+        # (see _retire_building), so scans cost what is on the map, not what was ever built
         self.buildings: List[Building] = []
         self.jewels: List[Jewel] = []
         self.teams: Dict[int, TeamState] = {}
@@ -97,6 +131,11 @@ class World:
         self.spawns = self.layout.spawns
 
         self._spawn_entities(team_classes=team_classes)
+        # per-team visibility grids when cfg.fog_of_war is on (see visible_enemies / visible_jewels)
+        self.visibility: Optional[Visibility] = None
+        if self.cfg.fog_of_war:
+            self.visibility = Visibility(self.layout, self.teams)
+            self.visibility.update(self)
 
     # ------------------------------------------------------------------ setup
     def _spawn_entities(self, team_classes: Optional[Dict[int, List[str]]]):
@@ -232,6 +271,7 @@ class World:
         r.alive = False
         r.respawn = self.cfg.resource_respawn_s
         team.resources[r.rtype] = team.resources.get(r.rtype, 0) + r.amount
+        self._last_event_t = self.t
         return True
 
     def _start_build(self, unit: Unit, team: TeamState, kind: str) -> bool:
@@ -251,6 +291,7 @@ class World:
         team.buildings.append(b)
         self._next_building_id += 1
         unit.busy = stats.build_time / max(0.2, unit.stats.build_speed)
+        self._last_event_t = self.t
         return True
 
     def _repair(self, unit: Unit, team: TeamState) -> bool:
@@ -293,6 +334,7 @@ class World:
         enemies.sort(key=lambda e: math.hypot(e.pos[0] - unit.pos[0], e.pos[1] - unit.pos[1]))
         target = enemies[0]
         if combat.unit_attack(unit, target):
+            self._last_event_t = self.t
             if target.hp == 0 and target.has_jewel:
                 self._drop_jewel_from_unit(target)
             if target.hp == 0:
@@ -306,6 +348,7 @@ class World:
         target = buildings[0]
         before_hp = target.hp
         if combat.attack_building(unit, target, bonus=bonus):
+            self._last_event_t = self.t
             if target.hp == 0 and target.stats.is_core:
                 self._on_core_destroyed(target.team_id, target.pos)
             if before_hp > 0 and target.hp == 0:
@@ -314,6 +357,16 @@ class World:
                     if j.home_team == target.team_id and j.carried_by is None and j.at_home:
                         j.pos = target.pos
                         j.at_home = False
+                self._retire_building(target)
+
+    def _retire_building(self, b: Building):
+        """Drop a destroyed building from the live lists. Removal keeps the order of the
+        rest, so distance ties and turret firing order resolve exactly as before; ids
+        come from ``_next_building_id`` and are never handed out again."""
+        self.buildings.remove(b)
+        team = self.teams.get(b.team_id)
+        if team is not None and b in team.buildings:
+            team.buildings.remove(b)
 
     def _drop_jewel_from_unit(self, unit: Unit):
         for j in self.jewels:
@@ -329,6 +382,7 @@ class World:
             if capture_rules.try_deliver(team.id, unit, jewel, base_pos, self._hold_timers, self.cfg.capture_hold_s, dt):
                 self.done = True
                 self.winner = team.id
+                self.stop_reason = "jewel"
                 return
         else:
             # Try pick up enemy jewel
@@ -339,6 +393,8 @@ class World:
                     j.carried_by = unit.id
                     j.at_home = False
                     unit.has_jewel = True
+                    self._carry_best.pop(j.home_team, None)
+                    self._last_event_t = self.t
                     break
 
     # ------------------------------------------------------------------- ticks
@@ -382,6 +438,12 @@ class World:
                 carrier = next((u for u in self.units if u.id == j.carried_by), None)
                 if carrier and carrier.is_alive():
                     j.pos = carrier.pos
+                    # carrying only counts as progress while the carrier gains ground on its base
+                    base = self.layout.bases[carrier.team_id]
+                    d = math.hypot(j.pos[0] - base[0], j.pos[1] - base[1])
+                    if d < self._carry_best.get(j.home_team, 1e9) - 0.5:
+                        self._carry_best[j.home_team] = d
+                        self._last_event_t = self.t
                 else:
                     j.carried_by = None
                     j.at_home = False
@@ -393,6 +455,7 @@ class World:
             enemies = [u for u in self.units if u.team_id != b.team_id]
             hit = combat.turret_fire(b, enemies)
             if hit is not None:
+                self._last_event_t = self.t
                 victim = next((u for u in self.units if u.id == hit), None)
                 if victim and victim.hp == 0 and victim.has_jewel:
                     self._drop_jewel_from_unit(victim)
@@ -421,20 +484,69 @@ class World:
         if self.cfg.domination_enabled and len(alive) == 1:
             self.done = True
             self.winner = alive[0]
+            self.stop_reason = "domination"
+
+    def timeout_scores(self) -> List[Tuple[float, int]]:
+        """(score, team_id) pairs, best first, as used to decide a match at the time limit."""
+        scores = []
+        for tid, team in self.teams.items():
+            dist_home = 0.0
+            enemy_jewel = next((j for j in self.jewels if j.home_team != tid and j.carried_by and any(u.id == j.carried_by for u in self.units if u.team_id == tid)), None)
+            if enemy_jewel:
+                dist_home = 0.0
+            else:
+                dist_home = sum(math.hypot(j.pos[0] - self.layout.bases[tid][0], j.pos[1] - self.layout.bases[tid][1]) for j in self.jewels if j.home_team != tid)
+            res_score = team.resources.get("wood", 0) + 1.4 * team.resources.get("metal", 0) + 1.6 * team.resources.get("fuel", 0)
+            scores.append((res_score - dist_home, tid))
+        scores.sort(reverse=True)
+        return scores
+
+    def _check_early_stop(self):
+        """Headless-only rules from GameTuning (stalemate_s / early_margin); off by default."""
+        cfg = self.cfg
+        if cfg.stalemate_s > 0 and self.t - self._last_event_t >= cfg.stalemate_s:
+            self.done = True
+            self.winner = self.timeout_scores()[0][1]
+            self.stop_reason = "stalemate"
+            return
+        if cfg.early_margin <= 0 or self.t < max(cfg.early_min_s, self._next_early_check):
+            return
+        # scoring walks every jewel/unit, so only project about once per sim second
+        self._next_early_check = self.t + 1.0
+        scores = self.timeout_scores()
+        if len(scores) > 1 and scores[0][0] - scores[1][0] >= cfg.early_margin:
+            self.done = True
+            self.winner = scores[0][1]
+            self.stop_reason = "projected"
 
     # ------------------------------------------------------------------- API
     def step(self, actions: Dict[Tuple[int, int], Union[ActionCommand, int]], dt: float) -> Dict:
         if self.done:
-            return {"done": True, "winner": self.winner}
+            return {"done": True, "winner": self.winner, "stop_reason": self.stop_reason}
+        if self.recorder is not None:
+            actions = self.recorder.on_step(self, actions, dt)
+        prof = self.profiler
+        if prof is not None:
+            t_step = t = time.perf_counter()
 
         self.t += dt
         self._tick_units(dt)
+        if prof is not None:
+            t = prof.lap("units", t)
         self._tick_resources(dt)
+        if prof is not None:
+            t = prof.lap("resources", t)
         self._tick_buildings(dt)
+        if prof is not None:
+            t = prof.lap("buildings", t)
         self._update_jewels()
+        if prof is not None:
+            t = prof.lap("jewels", t)
 
         # Auto turrets fire before actions resolve
         self._turrets_fire()
+        if prof is not None:
+            t = prof.lap("turrets", t)
 
         # Apply actions per unit
         for (team_id, unit_idx), act in actions.items():
@@ -452,35 +564,66 @@ class World:
                 action_cmd = _action_from_int(act)
             else:
                 action_cmd = act
-            self._apply_action(unit, team, action_cmd, dt)
+            if prof is not None:
+                t_act = time.perf_counter()
+                self._apply_action(unit, team, action_cmd, dt)
+                prof.lap_action(action_cmd.kind, t_act)
+            else:
+                self._apply_action(unit, team, action_cmd, dt)
+        if prof is not None:
+            t = prof.lap("actions", t)
 
         # Move jewels with carriers after movement
         self._update_jewels()
+        if prof is not None:
+            t = prof.lap("jewels", t)
+        if self.visibility is not None:
+            self.visibility.update(self)
+            if prof is not None:
+                t = prof.lap("visibility", t)
         self._check_victory()
+        if prof is not None:
+            t = prof.lap("victory", t)
 
         if self.t >= self.cfg.max_time_s and not self.done:
             # Decide winner by jewel proximity or resource
-            scores = []
-            for tid, team in self.teams.items():
-                dist_home = 0.0
-                enemy_jewel = next((j for j in self.jewels if j.home_team != tid and j.carried_by and any(u.id == j.carried_by for u in self.units if u.team_id == tid)), None)
-                if enemy_jewel:
-                    dist_home = 0.0
-                else:
-                    dist_home = sum(math.hypot(j.pos[0] - self.layout.bases[tid][0], j.pos[1] - self.layout.bases[tid][1]) for j in self.jewels if j.home_team != tid)
-                res_score = team.resources.get("wood", 0) + 1.4 * team.resources.get("metal", 0) + 1.6 * team.resources.get("fuel", 0)
-                scores.append((res_score - dist_home, tid))
-            scores.sort(reverse=True)
             self.done = True
-            self.winner = scores[0][1]
-
-        info = {"done": self.done, "winner": self.winner, "time": self.t}
+            self.winner = self.timeout_scores()[0][1]
+            self.stop_reason = "timeout"
+        elif not self.done:
+            self._check_early_stop()
+        if prof is not None:
+            prof.lap("early_stop", t)
+            prof.end_step(t_step)
+        if self.done:
+            if self.recorder is not None:
+                self.recorder.on_done(self)
+            if prof is not None:
+                prof.end_match(self)
+        if self.memory is not None:
+            self.memory.on_step(self)
+
+        info = {"done": self.done, "winner": self.winner, "time": self.t, "stop_reason": self.stop_reason}
         return info
 
     # ----------------------------------------------------------------- helpers
     def get_team_units(self, team_id: int) -> List[Unit]:
         return [u for u in self.units if u.team_id == team_id]
 
+    def visible_enemies(self, team_id: int) -> List[Unit]:
+        """Living enemy units ``team_id`` can see; all of them without fog of war."""
+        if self.visibility is None:
+            return [u for u in self.units if u.team_id != team_id and u.is_alive()]
+        return self.visibility.visible_units(self, team_id, enemies_only=True)
+
+    def visible_jewels(self, team_id: int) -> List[Jewel]:
+        """Jewels ``team_id`` knows about: its own, ones its units carry and ones in sight."""
+        if self.visibility is None:
+            return self.jewels
+        carriers = {u.id for u in self.units if u.team_id == team_id}
+        vis = self.visibility
+        return [j for j in self.jewels if j.home_team == team_id or j.carried_by in carriers or vis.is_visible(team_id, j.pos)]
+
     def observation_snapshot(self) -> Dict:
         """Lightweight snapshot for UI."""
         return {
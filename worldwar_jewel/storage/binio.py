@@ -0,0 +1,112 @@
+"""
+Tiny binary encoding helpers shared by replays and snapshots.
+Little-endian fixed-width values plus LEB128 varints.
+"""
+
+import struct
+
+_F64 = struct.Struct("<d")
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+
+
+class BinWriter:
+    def __init__(self):
+        self.buf = bytearray()
+
+    def varint(self, v: int):
+        if v < 0:
+            raise ValueError("varint must be non-negative; use zigzag()")
+        while v >= 0x80:
+            self.buf.append((v & 0x7F) | 0x80)
+            v >>= 7
+        self.buf.append(v)
+
+    def zigzag(self, v: int):
+        self.varint((v << 1) if v >= 0 else ((-v << 1) - 1))
+
+    def opt_int(self, v: int | None):
+        """None-able non-negative int (ids, team indices)."""
+        self.varint(0 if v is None else v + 1)
+
+    def f64(self, v: float):
+        self.buf += _F64.pack(v)
+
+    def u32(self, v: int):
+        self.buf += _U32.pack(v)
+
+    def u64(self, v: int):
+        self.buf += _U64.pack(v)
+
+    def flag(self, v: bool):
+        self.buf.append(1 if v else 0)
+
+    def str(self, v: str):
+        raw = v.encode("utf-8")
+        self.varint(len(raw))
+        self.buf += raw
+
+    def blob(self, v: bytes):
+        self.varint(len(v))
+        self.buf += v
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buf)
+
+
+class BinReader:
+    def __init__(self, data: bytes, offset: int = 0):
+        self.data = memoryview(data)
+        self.pos = offset
+
+    def varint(self) -> int:
+        shift = 0
+        out = 0
+        data = self.data
+        while True:
+            b = data[self.pos]
+            self.pos += 1
+            out |= (b & 0x7F) << shift
+            if b < 0x80:
+                return out
+            shift += 7
+
+    def zigzag(self) -> int:
+        v = self.varint()
+        return (v >> 1) if not v & 1 else -((v + 1) >> 1)
+
+    def opt_int(self) -> int | None:
+        v = self.varint()
+        return None if v == 0 else v - 1
+
+    def f64(self) -> float:
+        v = _F64.unpack_from(self.data, self.pos)[0]
+        self.pos += 8
+        return v
+
+    def u32(self) -> int:
+        v = _U32.unpack_from(self.data, self.pos)[0]
+        self.pos += 4
+        return v
+
+    def u64(self) -> int:
+        v = _U64.unpack_from(self.data, self.pos)[0]
+        self.pos += 8
+        return v
+
+    def flag(self) -> bool:
+        v = self.data[self.pos]
+        self.pos += 1
+        return v != 0
+
+    def str(self) -> str:
+        n = self.varint()
+        v = bytes(self.data[self.pos : self.pos + n]).decode("utf-8")
+        self.pos += n
+        return v
+
+    def blob(self) -> bytes:
+        n = self.varint()
+        v = bytes(self.data[self.pos : self.pos + n])
+        self.pos += n
+        return v
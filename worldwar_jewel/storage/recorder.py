@@ -0,0 +1,169 @@
+"""
+Streaming match recorder for headless sessions.
+
+Attach a ``StreamingRecorder`` to a ``World`` and every tick is encoded through
+the replay codec as the world steps (``World.recorder`` hook). Compression and
+file I/O run on a background thread; pending output is capped by
+``max_buffer_bytes`` so memory stays flat however long the session runs. Each
+match goes to its own file, finalized when the world reports ``done``.
+"""
+
+import queue
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from worldwar_jewel.game.world import ActionCommand, World
+from worldwar_jewel.storage.replays import Actions, BlockFile, ReplayWriter
+
+
+class _StreamWriter(ReplayWriter):
+    """ReplayWriter whose blocks go to the recorder thread instead of a file."""
+
+    def __init__(self, recorder: "StreamingRecorder", path: Path, world: World, seed, team_classes):
+        self.recorder = recorder
+        self.truncated = False
+        super().__init__(path, world, seed, team_classes, recorder.keyframe_every, recorder.compress)
+
+    def _open(self, head: bytes):
+        self.recorder._put(("open", self.path, head), len(head), force=True)
+
+    def _emit(self, kind: int, tick: int, ticks: int, raw: bytes):
+        if self.truncated:
+            return
+        if not self.recorder._put(("block", kind, tick, ticks, raw, self.compress), len(raw)):
+            # Keep the already-written prefix readable; the rest of the match is not recorded.
+            self.truncated = True
+            self.recorder.dropped += 1
+
+    def _finish(self):
+        # blocks emitted after a drop are skipped, so the index ends at the last complete chunk
+        self.recorder._put(("close", self.tick), 0, force=True)
+
+
+class StreamingRecorder:
+    """Records matches to ``out_dir/<prefix>_<n>.wwr``, one file per match.
+
+    ``on_full="block"`` makes the simulation wait for the writer when the buffer
+    is full; ``"drop"`` never waits and truncates that match's recording instead.
+    """
+
+    def __init__(
+        self,
+        out_dir: str | Path,
+        prefix: str = "match",
+        keyframe_every: int = 300,
+        compress: bool = True,
+        max_buffer_bytes: int = 4 << 20,
+        on_full: str = "block",
+    ):
+        if on_full not in ("block", "drop"):
+            raise ValueError(f"on_full must be 'block' or 'drop', got {on_full!r}")
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.keyframe_every = keyframe_every
+        self.compress = compress
+        self.max_buffer_bytes = max_buffer_bytes
+        self.on_full = on_full
+        self.matches = 0
+        self.dropped = 0
+        self.bytes_written = 0
+        self.files: List[Path] = []
+        self._writer: Optional[_StreamWriter] = None
+        self._pending = 0  # bytes queued for the writer thread
+        self._outstanding = 0  # queued items, including zero-size open/close
+        self._cond = threading.Condition()
+        self._queue: "queue.SimpleQueue[Optional[Tuple]]" = queue.SimpleQueue()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="replay-recorder", daemon=True)
+        self._thread.start()
+
+    # -- World hook
+    def attach(self, world: World, seed: Optional[int] = None, team_classes: Optional[Dict[int, List[str]]] = None, name: str | None = None) -> Path:
+        """Start recording ``world`` into a new file; finalizes any match still open."""
+        self._finish_match()
+        path = self.out_dir / f"{name or f'{self.prefix}_{self.matches:06d}'}.wwr"
+        self._writer = _StreamWriter(self, path, world, seed, team_classes)
+        self.matches += 1
+        self.files.append(path)
+        world.recorder = self
+        return path
+
+    def on_step(self, world: World, actions: Actions, dt: float) -> Dict[Tuple[int, int], ActionCommand]:
+        return self._writer.record(actions, dt)
+
+    def on_done(self, world: World):
+        world.recorder = None
+        self._finish_match()
+
+    def _finish_match(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer.world.recorder = None
+            self._writer = None
+
+    # -- buffer accounting
+    def _put(self, item: Tuple, size: int, force: bool = False) -> bool:
+        if self._error is not None:
+            raise RuntimeError("replay recorder thread failed") from self._error
+        with self._cond:
+            if not force:
+                while self._pending and self._pending + size > self.max_buffer_bytes:
+                    if self.on_full == "drop":
+                        return False
+                    self._cond.wait()
+            self._pending += size
+            self._outstanding += 1
+        self._queue.put((size, item))
+        return True
+
+    def _run(self):
+        f: Optional[BlockFile] = None
+        while True:
+            entry = self._queue.get()
+            if entry is None:
+                break
+            size, item = entry
+            try:
+                op = item[0]
+                if op == "open":
+                    f = BlockFile(item[1], item[2])
+                elif op == "block":
+                    _, kind, tick, ticks, raw, compress = item
+                    payload = zlib.compress(raw, 9) if compress else raw
+                    f.write_block(kind, tick, ticks, payload)
+                    self.bytes_written += len(payload)
+                elif op == "close":
+                    f.close(item[1])
+                    f = None
+            except BaseException as exc:  # surfaced on the next _put
+                self._error = exc
+            finally:
+                with self._cond:
+                    self._pending -= size
+                    self._outstanding -= 1
+                    self._cond.notify_all()
+        if f is not None:
+            f.close(0)
+
+    def flush(self):
+        """Wait until everything queued so far is on disk."""
+        with self._cond:
+            while self._outstanding:
+                self._cond.wait()
+
+    def close(self):
+        """Finalize the current match and stop the writer thread."""
+        if not self._thread.is_alive():
+            return
+        self._finish_match()
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
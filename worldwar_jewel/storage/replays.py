@@ -1,14 +1,323 @@
 """
-Replay serialization placeholder.
+Compact binary replays with seekable keyframes.
+
+A replay stores the seed, the ``GameTuning`` and the per-tick action stream
+(delta + varint encoded, zlib-compressed in chunks), plus a full world-state
+keyframe at the start of every chunk and an index at the end of the file.
+Any tick is rebuilt by restoring the nearest keyframe and re-simulating.
+
+Layout::
+
+    MAGIC varint(version) blob(header json)
+    block*        block = u8 kind, u32 length, payload
+    index block   (kind, tick, ticks, offset) per keyframe/action block
+    u64 index_offset, MAGIC
+
+Move directions are quantized to 1/256 of a turn; ``ReplayWriter.step`` feeds
+the quantized command to the world, so the recording is exactly what ran.
 """
 
-from typing import List, Tuple
+import bisect
+import copy
+import json
+import math
+import random
+import zlib
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from worldwar_jewel.config import GameTuning
+from worldwar_jewel.game.world import ActionCommand, World, _action_from_int
+from worldwar_jewel.storage.binio import BinReader, BinWriter
+from worldwar_jewel.storage.snapshot import encode_state, restore_state
+
+MAGIC = b"WWJR"
+VERSION = 1
+
+KIND_KEYFRAME = 1
+KIND_ACTIONS = 2
+KIND_INDEX = 3
+
+# Action codes: index into ACTION_KINDS, or MOVE_BASE + direction (0..255).
+ACTION_KINDS: Tuple[str, ...] = ("noop", "move", "gather", "attack", "plant_explosive", "interact", "build_wall", "build_turret", "repair")
+MOVE_BASE = len(ACTION_KINDS)
+MOVE_STEPS = 256
+
+Actions = Dict[Tuple[int, int], Union[ActionCommand, int]]
+
+
+def _decode_table() -> List[ActionCommand]:
+    table = [ActionCommand(kind=k) for k in ACTION_KINDS]
+    for a in range(MOVE_STEPS):
+        theta = a * 2.0 * math.pi / MOVE_STEPS
+        dx, dy = math.cos(theta), math.sin(theta)
+        # snap cardinal directions so WASD/int actions replay as exact unit vectors
+        dx = 0.0 if abs(dx) < 1e-9 else dx
+        dy = 0.0 if abs(dy) < 1e-9 else dy
+        table.append(ActionCommand(kind="move", target=(dx, dy)))
+    return table
+
+
+_DECODE = _decode_table()
+_KIND_CODE = {k: i for i, k in enumerate(ACTION_KINDS)}
+
+
+def encode_action(act: Union[ActionCommand, int]) -> int:
+    if isinstance(act, int):
+        act = _action_from_int(act)
+    if act.kind == "move":
+        if not act.target or math.hypot(*act.target) <= 0.001:
+            return 0
+        a = round(math.atan2(act.target[1], act.target[0]) / (2.0 * math.pi) * MOVE_STEPS) % MOVE_STEPS
+        return MOVE_BASE + a
+    # unknown kinds are ignored by World, same as noop
+    return _KIND_CODE.get(act.kind, 0)
+
+
+def decode_action(code: int) -> ActionCommand:
+    return _DECODE[code]
+
+
+def _tuning_from_dict(d: Dict) -> GameTuning:
+    d = dict(d)
+    if "resource_types" in d:
+        d["resource_types"] = tuple(d["resource_types"])
+    return GameTuning(**d)
+
+
+class BlockFile:
+    """Low-level writer for the container: header, blocks, then index + footer on close."""
+
+    def __init__(self, path: str | Path, head: bytes):
+        self._file = open(path, "wb")
+        self._file.write(head)
+        self._index: List[Tuple[int, int, int, int]] = []
+
+    def write_block(self, kind: int, tick: int, ticks: int, payload: bytes):
+        offset = self._file.tell()
+        self._file.write(bytes([kind]) + len(payload).to_bytes(4, "little") + payload)
+        self._index.append((kind, tick, ticks, offset))
+
+    def close(self, final_tick: int):
+        if self._file.closed:
+            return
+        offset = self._file.tell()
+        w = BinWriter()
+        w.varint(len(self._index))
+        for kind, tick, ticks, off in self._index:
+            w.varint(kind)
+            w.varint(tick)
+            w.varint(ticks)
+            w.u64(off)
+        self.write_block(KIND_INDEX, final_tick, 0, w.getvalue())
+        tail = BinWriter()
+        tail.u64(offset)
+        self._file.write(tail.getvalue() + MAGIC)
+        self._file.close()
+
+
+class ReplayWriter:
+    """Streams a match to disk; memory use is one chunk of encoded actions.
+
+    Subclasses can redirect output by overriding ``_open``/``_emit``/``_finish``.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        world: World,
+        seed: Optional[int],
+        team_classes: Optional[Dict[int, List[str]]] = None,
+        keyframe_every: int = 300,
+        compress: bool = True,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.world = world
+        self.keyframe_every = max(1, keyframe_every)
+        self.compress = compress
+        self.dt = 1.0 / world.cfg.fps
+        self.squad = world.cfg.squad_size
+        self.tick = 0
+        self.closed = False
+        self._chunk = BinWriter()
+        self._chunk_start = 0
+        self._prev: Dict[int, int] = {}
+        header = {
+            "seed": seed,
+            "tuning": asdict(world.cfg),
+            "team_classes": {str(k): v for k, v in (team_classes or {}).items()},
+            "dt": self.dt,
+            "keyframe_every": self.keyframe_every,
+            "compression": "zlib" if compress else "none",
+        }
+        head = BinWriter()
+        head.buf += MAGIC
+        head.varint(VERSION)
+        head.blob(json.dumps(header).encode("utf-8"))
+        self._open(head.getvalue())
+
+    # -- output hooks
+    def _open(self, head: bytes):
+        self._file = BlockFile(self.path, head)
+
+    def _emit(self, kind: int, tick: int, ticks: int, raw: bytes):
+        self._file.write_block(kind, tick, ticks, zlib.compress(raw, 9) if self.compress else raw)
+
+    def _finish(self):
+        self._file.close(self.tick)
+
+    def _flush_chunk(self):
+        n = self.tick - self._chunk_start
+        if n <= 0:
+            return
+        self._emit(KIND_ACTIONS, self._chunk_start, n, self._chunk.getvalue())
+        self._chunk = BinWriter()
+        self._prev = {}
+
+    def record(self, actions: Actions, dt: float) -> Dict[Tuple[int, int], ActionCommand]:
+        """Encode one tick (call right before ``world.step``); returns the commands to step with."""
+        if self.tick % self.keyframe_every == 0:
+            self._flush_chunk()
+            self._chunk_start = self.tick
+            self._emit(KIND_KEYFRAME, self.tick, 0, encode_state(self.world, compact=True))
+        codes: Dict[int, int] = {}
+        out: Dict[Tuple[int, int], ActionCommand] = {}
+        for (team_id, idx), act in actions.items():
+            if idx >= self.squad:
+                continue
+            code = encode_action(act)
+            codes[team_id * self.squad + idx] = code
+            out[(team_id, idx)] = _DECODE[code]
+        changes = []
+        for slot in sorted(set(codes) | set(self._prev)):
+            code = codes.get(slot, 0)
+            if code != self._prev.get(slot, 0):
+                changes.append((slot, code))
+        self._prev = {s: c for s, c in codes.items() if c}
+        odd_dt = dt != self.dt
+        w = self._chunk
+        w.varint(len(changes) << 1 | int(odd_dt))
+        if odd_dt:
+            w.f64(dt)
+        for slot, code in changes:
+            w.varint(slot)
+            w.varint(code)
+        self.tick += 1
+        return out
+
+    def step(self, actions: Actions, dt: float) -> Dict:
+        """Record and apply one tick; no-op once the match is over."""
+        if self.world.done:
+            return {"done": True, "winner": self.world.winner, "stop_reason": self.world.stop_reason}
+        return self.world.step(self.record(actions, dt), dt)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._flush_chunk()
+        self._finish()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayReader:
+    """Random access over a replay file via its keyframe index."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._data = self.path.read_bytes()
+        data = self._data
+        if data[:4] != MAGIC or data[-4:] != MAGIC:
+            raise ValueError(f"{path} is not a World War Jewel replay")
+        r = BinReader(data, 4)
+        version = r.varint()
+        if version != VERSION:
+            raise ValueError(f"Unsupported replay version {version}")
+        header = json.loads(r.blob().decode("utf-8"))
+        self.header = header
+        self.seed: Optional[int] = header["seed"]
+        self.tuning = _tuning_from_dict(header["tuning"])
+        self.team_classes = {int(k): v for k, v in header["team_classes"].items()} or None
+        self.dt: float = header["dt"]
+        self.compressed = header["compression"] == "zlib"
+
+        index_offset = BinReader(data, len(data) - 12).u64()
+        r = BinReader(data, index_offset + 5)
+        entries = [(r.varint(), r.varint(), r.varint(), r.u64()) for _ in range(r.varint())]
+        self.keyframes = [(tick, off) for kind, tick, _, off in entries if kind == KIND_KEYFRAME]
+        self.chunks = {tick: (ticks, off) for kind, tick, ticks, off in entries if kind == KIND_ACTIONS}
+        self._kf_ticks = [t for t, _ in self.keyframes]
+        self.n_ticks = max((t + n for t, (n, _) in self.chunks.items()), default=0)
+        self._template: Optional[World] = None
+        self._cached_chunk: Tuple[int, List] = (-1, [])
+
+    def _payload(self, offset: int) -> bytes:
+        n = int.from_bytes(self._data[offset + 1 : offset + 5], "little")
+        raw = self._data[offset + 5 : offset + 5 + n]
+        return zlib.decompress(raw) if self.compressed else bytes(raw)
 
-Frame = Tuple[int, dict]
+    def new_world(self) -> World:
+        """The match as it started (layout + initial entities)."""
+        return World(self.tuning, seed=self.seed, team_classes=self.team_classes)
 
+    def _chunk_ticks(self, start: int) -> List[Tuple[Dict[Tuple[int, int], ActionCommand], float]]:
+        if self._cached_chunk[0] == start:
+            return self._cached_chunk[1]
+        ticks, offset = self.chunks[start]
+        r = BinReader(self._payload(offset))
+        squad = self.tuning.squad_size
+        cur: Dict[int, int] = {}
+        out = []
+        for _ in range(ticks):
+            head = r.varint()
+            dt = r.f64() if head & 1 else self.dt
+            for _ in range(head >> 1):
+                slot = r.varint()
+                code = r.varint()
+                if code:
+                    cur[slot] = code
+                else:
+                    cur.pop(slot, None)
+            out.append(({(s // squad, s % squad): _DECODE[c] for s, c in cur.items()}, dt))
+        self._cached_chunk = (start, out)
+        return out
 
-def save_replay(path: str, frames: List[Frame]):
-    with open(path, "w", encoding="utf-8") as f:
-        for t, data in frames:
-            f.write(f"{t}|{data}\n")
+    def actions(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, Dict[Tuple[int, int], ActionCommand], float]]:
+        """Yield ``(tick, actions, dt)`` for ticks in ``[start, stop)``."""
+        stop = self.n_ticks if stop is None else min(stop, self.n_ticks)
+        tick = start
+        while tick < stop:
+            k = bisect.bisect_right(self._kf_ticks, tick) - 1
+            chunk_start = self._kf_ticks[k]
+            if chunk_start not in self.chunks:
+                return
+            for i, (acts, dt) in enumerate(self._chunk_ticks(chunk_start)):
+                t = chunk_start + i
+                if t < tick:
+                    continue
+                if t >= stop:
+                    return
+                yield t, acts, dt
+                tick = t + 1
 
+    def world_at(self, tick: int) -> World:
+        """World state after ``tick`` steps (0 = initial state)."""
+        tick = max(0, min(tick, self.n_ticks))
+        k = bisect.bisect_right(self._kf_ticks, tick) - 1
+        kf_tick, offset = self.keyframes[k]
+        if self._template is None:
+            self._template = self.new_world()
+        world = copy.copy(self._template)
+        world.rng = random.Random()
+        world.rng.setstate(self._template.rng.getstate())
+        restore_state(world, self._payload(offset))
+        for _, acts, dt in self.actions(kf_tick, tick):
+            world.step(acts, dt)
+        return world
@@ -1,6 +1,30 @@
+"""
+Profiles (JSON) and savegames (binary world snapshots).
+
+A savegame holds the tuning, the map (by seed reference or embedded walls and
+spots) and the full ``encode_state`` payload including the RNG, so a loaded
+world continues exactly like the one that was saved.
+
+Layout::
+
+    MAGIC varint(version) blob(tuning json)
+    flag(has_seed) [zigzag(seed)] flag(embedded) [MapLayout fields]
+    blob(state)
+"""
+
 import json
+from dataclasses import asdict
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
+
+from worldwar_jewel.game.mapgen import MapLayout
+from worldwar_jewel.game.world import World
+from worldwar_jewel.storage.binio import BinReader, BinWriter
+from worldwar_jewel.storage.replays import _tuning_from_dict
+from worldwar_jewel.storage.snapshot import encode_state, restore_state
+
+SAVE_MAGIC = b"WWJS"
+SAVE_VERSION = 1
 
 
 def save_profile(path: str | Path, data: Dict):
@@ -15,3 +39,76 @@ def load_profile(path: str | Path) -> Dict:
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
+
+def _write_layout(w: BinWriter, layout: MapLayout):
+    w.varint(layout.width)
+    w.varint(layout.height)
+    w.varint(len(layout.walls))
+    for x, y in sorted(layout.walls):
+        w.zigzag(x)
+        w.zigzag(y)
+    for points in (layout.bases, layout.spawns):
+        w.varint(len(points))
+        for x, y in points:
+            w.f64(x)
+            w.f64(y)
+    w.varint(len(layout.resource_spots))
+    for rtype, (x, y) in layout.resource_spots:
+        w.str(rtype)
+        w.f64(x)
+        w.f64(y)
+
+
+def _read_layout(r: BinReader) -> MapLayout:
+    width, height = r.varint(), r.varint()
+    walls = {(r.zigzag(), r.zigzag()) for _ in range(r.varint())}
+    bases = [(r.f64(), r.f64()) for _ in range(r.varint())]
+    spawns = [(r.f64(), r.f64()) for _ in range(r.varint())]
+    spots = [(r.str(), (r.f64(), r.f64())) for _ in range(r.varint())]
+    return MapLayout(width=width, height=height, walls=walls, bases=bases, spawns=spawns, resource_spots=spots)
+
+
+def encode_world(world: World, embed_layout: Optional[bool] = None) -> bytes:
+    """``embed_layout=None`` embeds the map only when the world has no seed to regenerate it from."""
+    embed = world.seed is None if embed_layout is None else embed_layout
+    if not embed and world.seed is None:
+        raise ValueError("World has no seed; its layout must be embedded")
+    w = BinWriter()
+    w.buf += SAVE_MAGIC
+    w.varint(SAVE_VERSION)
+    w.blob(json.dumps(asdict(world.cfg)).encode("utf-8"))
+    w.flag(world.seed is not None)
+    if world.seed is not None:
+        w.zigzag(world.seed)
+    w.flag(embed)
+    if embed:
+        _write_layout(w, world.layout)
+    w.blob(encode_state(world, include_rng=True))
+    return w.getvalue()
+
+
+def decode_world(data: bytes) -> World:
+    if data[:4] != SAVE_MAGIC:
+        raise ValueError("Not a World War Jewel savegame")
+    r = BinReader(data, 4)
+    version = r.varint()
+    if version != SAVE_VERSION:
+        raise ValueError(f"Unsupported savegame version {version}")
+    tuning = _tuning_from_dict(json.loads(r.blob().decode("utf-8")))
+    seed = r.zigzag() if r.flag() else None
+    layout = _read_layout(r) if r.flag() else None
+    # entities spawned here are placeholders; the state payload replaces them and the RNG
+    world = World(tuning, seed=seed, layout=layout)
+    return restore_state(world, r.blob())
+
+
+def save_world(path: str | Path, world: World, embed_layout: Optional[bool] = None) -> int:
+    """Write a savegame; returns its size in bytes."""
+    data = encode_world(world, embed_layout)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_bytes(data)
+    return len(data)
+
+
+def load_world(path: str | Path) -> World:
+    return decode_world(Path(path).read_bytes())
@@ -0,0 +1,209 @@
+"""
+Binary codec for the dynamic part of a ``World`` (everything except the map layout).
+
+``encode_state`` / ``restore_state`` round-trip exactly (floats are stored as
+float64), so a restored world continues bit-for-bit like the original. The
+layout is not included: restore into a world built from the same tuning/seed.
+"""
+
+import random
+
+from worldwar_jewel.config import BUILDING_PRESETS, CLASS_PRESETS
+from worldwar_jewel.game.entities import Building, Jewel, ResourceNode, Unit
+from worldwar_jewel.game.world import TeamState, World
+from worldwar_jewel.storage.binio import BinReader, BinWriter
+
+STATE_VERSION = 1
+
+
+def encode_state(world: World, include_rng: bool = False, compact: bool = False) -> bytes:
+    """``compact`` drops static resource-node fields (id/type/pos/amount); only restore
+    such payloads into a world whose resources came from the same layout."""
+    w = BinWriter()
+    w.varint(STATE_VERSION)
+    w.flag(compact)
+    w.f64(world.t)
+    w.flag(world.done)
+    w.opt_int(world.winner)
+    w.str(world.stop_reason or "")
+    w.varint(world._next_unit_id)
+    w.varint(world._next_building_id)
+    w.f64(world._last_event_t)
+    w.f64(world._next_early_check)
+
+    w.varint(len(world.units))
+    for u in world.units:
+        w.varint(u.id)
+        w.varint(u.team_id)
+        w.str(u.cls_id)
+        w.f64(u.pos[0])
+        w.f64(u.pos[1])
+        w.zigzag(u.hp)
+        w.f64(u.cooldown)
+        w.f64(u.busy)
+        w.f64(u.respawn_timer)
+        w.flag(u.has_jewel)
+        w.varint(len(u.inventory))
+        for k, v in u.inventory.items():
+            w.str(k)
+            w.zigzag(v)
+        w.varint(len(u.perks))
+        for perk in u.perks:
+            w.str(perk)
+        w.varint(len(u.path))
+        for px, py in u.path:
+            w.f64(px)
+            w.f64(py)
+
+    w.varint(len(world.buildings))
+    for b in world.buildings:
+        w.varint(b.id)
+        w.varint(b.team_id)
+        w.str(b.kind)
+        w.f64(b.pos[0])
+        w.f64(b.pos[1])
+        w.zigzag(b.hp)
+        w.flag(b.constructing)
+        w.f64(b.progress)
+        w.f64(b.cooldown)
+
+    w.varint(len(world.resources))
+    for r in world.resources:
+        if not compact:
+            w.varint(r.id)
+            w.str(r.rtype)
+            w.f64(r.pos[0])
+            w.f64(r.pos[1])
+            w.zigzag(r.amount)
+        w.flag(r.alive)
+        if not r.alive:
+            w.f64(r.respawn)
+
+    w.varint(len(world.jewels))
+    for j in world.jewels:
+        w.varint(j.home_team)
+        w.f64(j.pos[0])
+        w.f64(j.pos[1])
+        w.opt_int(j.carried_by)
+        w.flag(j.at_home)
+        w.flag(j.home_team in world._carry_best)
+        w.f64(world._carry_best.get(j.home_team, 0.0))
+
+    w.varint(len(world.teams))
+    for tid, team in world.teams.items():
+        w.varint(tid)
+        w.flag(team.eliminated)
+        w.f64(world._hold_timers.get(tid, 0.0))
+        w.varint(len(team.resources))
+        for k, v in team.resources.items():
+            w.str(k)
+            w.zigzag(v)
+
+    w.flag(include_rng)
+    if include_rng:
+        version, internal, gauss = world.rng.getstate()
+        w.varint(version)
+        w.varint(len(internal))
+        for v in internal:
+            w.u32(v)
+        w.flag(gauss is not None)
+        w.f64(gauss or 0.0)
+    return w.getvalue()
+
+
+def restore_state(world: World, data: bytes) -> World:
+    """Overwrite ``world``'s dynamic state with an ``encode_state`` payload."""
+    r = BinReader(data)
+    version = r.varint()
+    if version != STATE_VERSION:
+        raise ValueError(f"Unsupported world state version {version}")
+    compact = r.flag()
+    world.t = r.f64()
+    world.done = r.flag()
+    world.winner = r.opt_int()
+    world.stop_reason = r.str() or None
+    world._next_unit_id = r.varint()
+    world._next_building_id = r.varint()
+    world._last_event_t = r.f64()
+    world._next_early_check = r.f64()
+
+    units = []
+    for _ in range(r.varint()):
+        uid, team_id, cls_id = r.varint(), r.varint(), r.str()
+        u = Unit(id=uid, team_id=team_id, cls_id=cls_id, stats=CLASS_PRESETS[cls_id], pos=(r.f64(), r.f64()), hp=r.zigzag())
+        u.cooldown = r.f64()
+        u.busy = r.f64()
+        u.respawn_timer = r.f64()
+        u.has_jewel = r.flag()
+        u.inventory = {r.str(): r.zigzag() for _ in range(r.varint())}
+        u.perks = [r.str() for _ in range(r.varint())]
+        u.path = [(r.f64(), r.f64()) for _ in range(r.varint())]
+        units.append(u)
+
+    buildings = []
+    for _ in range(r.varint()):
+        bid, team_id, kind = r.varint(), r.varint(), r.str()
+        b = Building(id=bid, team_id=team_id, kind=kind, stats=BUILDING_PRESETS[kind], pos=(r.f64(), r.f64()), hp=r.zigzag())
+        b.constructing = r.flag()
+        b.progress = r.f64()
+        b.cooldown = r.f64()
+        buildings.append(b)
+
+    resources = []
+    for i in range(r.varint()):
+        if compact:
+            old = world.resources[i]
+            node = ResourceNode(id=old.id, rtype=old.rtype, pos=old.pos, amount=old.amount)
+        else:
+            rid, rtype = r.varint(), r.str()
+            node = ResourceNode(id=rid, rtype=rtype, pos=(r.f64(), r.f64()), amount=r.zigzag())
+        node.alive = r.flag()
+        node.respawn = 0.0 if node.alive else r.f64()
+        resources.append(node)
+
+    jewels = []
+    carry_best = {}
+    for _ in range(r.varint()):
+        j = Jewel(home_team=r.varint(), pos=(r.f64(), r.f64()), carried_by=r.opt_int(), at_home=r.flag())
+        has_best, best = r.flag(), r.f64()
+        if has_best:
+            carry_best[j.home_team] = best
+        jewels.append(j)
+
+    teams = {}
+    hold = {}
+    for _ in range(r.varint()):
+        tid = r.varint()
+        eliminated = r.flag()
+        hold[tid] = r.f64()
+        res = {r.str(): r.zigzag() for _ in range(r.varint())}
+        old = world.teams[tid]
+        teams[tid] = TeamState(
+            id=tid,
+            name=old.name,
+            color=old.color,
+            resources=res,
+            units=[u for u in units if u.team_id == tid],
+            buildings=[b for b in buildings if b.team_id == tid],
+            eliminated=eliminated,
+        )
+
+    if r.flag():
+        rng_version = r.varint()
+        internal = tuple(r.u32() for _ in range(r.varint()))
+        has_gauss, gauss = r.flag(), r.f64()
+        world.rng = random.Random()
+        world.rng.setstate((rng_version, internal, gauss if has_gauss else None))
+
+    world.units = units
+    world.buildings = buildings
+    world.resources = resources
+    world.jewels = jewels
+    world.teams = teams
+    world._hold_timers = hold
+    world._carry_best = carry_best
+    if world.visibility is not None:
+        # copy.copy'd worlds (ReplayReader.world_at) would otherwise share the template's grids
+        world.visibility = world.visibility.clone()
+        world.visibility.rebuild(world)
+    return world
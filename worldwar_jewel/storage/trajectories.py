@@ -0,0 +1,189 @@
+"""
+Chunked, memory-mapped trajectory store for offline / imitation training.
+
+Each writer fills its own ``.npy`` chunks (one structured row per transition:
+obs, act, reward, done, team) through ``np.memmap``. A finished chunk is renamed
+into place and announced with one line in ``manifest.jsonl``; appends of a
+single short line are atomic, so writers in different processes need no lock.
+Readers only see chunks listed in the manifest and page rows in on demand.
+"""
+
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+MANIFEST = "manifest.jsonl"
+
+
+def row_dtype(obs_dim: int, act_dim: int) -> np.dtype:
+    return np.dtype([("obs", "<f4", (obs_dim,)), ("act", "<i2", (act_dim,)), ("reward", "<f4"), ("done", "u1"), ("team", "u1")])
+
+
+class TrajectoryWriter:
+    """Appends transitions to ``root``; safe to use from several processes at once."""
+
+    def __init__(self, root: str | Path, obs_dim: int, act_dim: int, chunk_rows: int = 65536, writer_id: Optional[str] = None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.dtype = row_dtype(obs_dim, act_dim)
+        self.obs_dim = obs_dim
+        self.act_dim = act_dim
+        self.chunk_rows = max(1, chunk_rows)
+        self.writer_id = writer_id or f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.rows_written = 0
+        self._n_chunks = 0
+        self._mm: Optional[np.memmap] = None
+        self._part: Optional[Path] = None
+        self._fill = 0
+
+    def _open_chunk(self):
+        self._part = self.root / f"{self.writer_id}_{self._n_chunks:05d}.part.npy"
+        self._mm = np.lib.format.open_memmap(self._part, mode="w+", dtype=self.dtype, shape=(self.chunk_rows,))
+        self._fill = 0
+
+    def extend(self, obs, act, reward, done, team):
+        """Append ``n`` transitions; every argument has leading dimension ``n`` (scalars broadcast)."""
+        obs = np.asarray(obs, dtype=np.float32).reshape(-1, self.obs_dim)
+        n = len(obs)
+        act = np.asarray(act).reshape(n, self.act_dim)
+        reward = np.broadcast_to(np.asarray(reward, dtype=np.float32), (n,))
+        done = np.broadcast_to(np.asarray(done, dtype=np.uint8), (n,))
+        team = np.broadcast_to(np.asarray(team, dtype=np.uint8), (n,))
+        start = 0
+        while start < n:
+            if self._mm is None:
+                self._open_chunk()
+            take = min(n - start, self.chunk_rows - self._fill)
+            dst = self._mm[self._fill : self._fill + take]
+            dst["obs"] = obs[start : start + take]
+            dst["act"] = act[start : start + take]
+            dst["reward"] = reward[start : start + take]
+            dst["done"] = done[start : start + take]
+            dst["team"] = team[start : start + take]
+            self._fill += take
+            start += take
+            if self._fill == self.chunk_rows:
+                self.flush()
+        self.rows_written += n
+
+    def append(self, obs, act, reward: float, done: bool, team: int):
+        self.extend(obs, act, reward, done, team)
+
+    def flush(self):
+        """Publish the current chunk (even if partly filled); the next append starts a new one."""
+        if self._mm is None:
+            return
+        mm, part, rows = self._mm, self._part, self._fill
+        self._mm = None
+        final = self.root / f"{self.writer_id}_{self._n_chunks:05d}.npy"
+        self._n_chunks += 1
+        if rows == self.chunk_rows:
+            mm.flush()
+            del mm
+            os.replace(part, final)
+        else:
+            if rows:
+                np.save(final, mm[:rows])
+            del mm
+            part.unlink()
+            if not rows:
+                return
+        line = json.dumps({"file": final.name, "rows": rows, "obs_dim": self.obs_dim, "act_dim": self.act_dim, "writer": self.writer_id})
+        fd = os.open(self.root / MANIFEST, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, (line + "\n").encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryStore:
+    """Read side: published chunks opened as read-only memmaps."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.chunks: List[Dict] = []
+        self._maps: Dict[str, np.ndarray] = {}
+        self.refresh()
+
+    def refresh(self):
+        """Pick up chunks published since the last call."""
+        chunks = []
+        path = self.root / MANIFEST
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if (self.root / entry["file"]).exists():
+                    chunks.append(entry)
+        dims = {(c["obs_dim"], c["act_dim"]) for c in chunks}
+        if len(dims) > 1:
+            raise ValueError(f"Mixed obs/act dims in {self.root}: {sorted(dims)}")
+        self.chunks = chunks
+
+    def __len__(self) -> int:
+        return sum(c["rows"] for c in self.chunks)
+
+    def chunk(self, i: int) -> np.ndarray:
+        name = self.chunks[i]["file"]
+        if name not in self._maps:
+            self._maps[name] = np.load(self.root / name, mmap_mode="r")
+        return self._maps[name]
+
+    def minibatches(self, batch_size: int, seed: Optional[int] = None, mix_chunks: int = 4, drop_last: bool = False) -> Iterator[Dict[str, np.ndarray]]:
+        """One shuffled pass over the data.
+
+        Chunks are visited in random order, ``mix_chunks`` at a time, and rows of
+        those chunks are shuffled together; only indices and the current batch
+        live in RAM.
+        """
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(self.chunks))
+        for g in range(0, len(order), max(1, mix_chunks)):
+            group = order[g : g + mix_chunks]
+            ids = np.concatenate([np.full(self.chunks[c]["rows"], c, dtype=np.int32) for c in group])
+            rows = np.concatenate([np.arange(self.chunks[c]["rows"], dtype=np.int64) for c in group])
+            perm = rng.permutation(len(ids))
+            ids, rows = ids[perm], rows[perm]
+            for s in range(0, len(ids), batch_size):
+                if drop_last and s + batch_size > len(ids):
+                    break
+                yield self._gather(ids[s : s + batch_size], rows[s : s + batch_size])
+
+    def sample(self, batch_size: int, rng: Optional[np.random.Generator] = None) -> Dict[str, np.ndarray]:
+        """Uniform sample with replacement over every published row."""
+        rng = rng or np.random.default_rng()
+        sizes = np.array([c["rows"] for c in self.chunks], dtype=np.int64)
+        flat = rng.integers(0, sizes.sum(), size=batch_size)
+        bounds = np.cumsum(sizes)
+        ids = np.searchsorted(bounds, flat, side="right")
+        rows = flat - (bounds[ids] - sizes[ids])
+        return self._gather(ids, rows)
+
+    def _gather(self, ids: np.ndarray, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        out = None
+        for c in np.unique(ids):
+            sel = np.nonzero(ids == c)[0]
+            # sorted row order keeps page faults sequential within a chunk
+            idx = rows[sel]
+            order = np.argsort(idx)
+            part = self.chunk(int(c))[idx[order]]
+            if out is None:
+                out = np.empty(len(ids), dtype=part.dtype)
+            out[sel[order]] = part
+        if out is None:
+            return {}
+        return {name: out[name] for name in out.dtype.names}
@@ -0,0 +1,237 @@
+"""
+Opt-in timeline tracing in Chrome trace format (open the merged file in
+https://ui.perfetto.dev or chrome://tracing).
+
+Each process that calls ``enable(trace_dir, name)`` buffers complete-span
+events in memory and appends them as JSON lines to its own
+``<name>-<pid>.trace.jsonl`` in ``trace_dir`` on ``flush()`` (also when the
+buffer fills up and at exit), so processes never share a file. ``merge``
+combines every per-process file into one ``trace.json``.
+
+Timestamps come from ``time.perf_counter``, which is a system-wide monotonic
+clock on Linux, Windows and macOS, so spans from different processes line up.
+
+Instrumentation points: ``span`` (context manager), ``traced`` (decorator) and
+``world_hook`` (a ``World.profiler`` that turns step phases into spans). With
+tracing disabled each of them costs one global lookup.
+
+    python -m worldwar_jewel.tracing <trace_dir> [-o trace.json]
+"""
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+TRACE_SUFFIX = ".trace.jsonl"
+MERGED_NAME = "trace.json"
+
+
+class Tracer:
+    def __init__(self, trace_dir: str, process_name: str, max_buffer: int = 50_000):
+        self.trace_dir = str(trace_dir)
+        self.process_name = process_name
+        self.pid = os.getpid()
+        Path(trace_dir).mkdir(parents=True, exist_ok=True)
+        self.path = Path(trace_dir) / f"{process_name}-{self.pid}{TRACE_SUFFIX}"
+        self.max_buffer = max_buffer
+        self.events: List[Dict] = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": process_name}}]
+        self._threads = set()
+        self._lock = threading.Lock()
+
+    def _tid(self) -> int:
+        tid = threading.get_native_id()
+        if tid not in self._threads:
+            self._threads.add(tid)
+            self.events.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": threading.current_thread().name}})
+        return tid
+
+    def complete(self, name: str, cat: str, t0: float, t1: Optional[float] = None, args: Optional[Dict] = None):
+        """A span from ``t0`` to ``t1`` (``perf_counter`` seconds; default now)."""
+        if t1 is None:
+            t1 = time.perf_counter()
+        ev = {"name": name, "cat": cat, "ph": "X", "ts": t0 * 1e6, "dur": (t1 - t0) * 1e6, "pid": self.pid, "tid": self._tid()}
+        if args:
+            ev["args"] = args
+        self.events.append(ev)
+        if len(self.events) >= self.max_buffer:
+            self.flush()
+
+    def instant(self, name: str, cat: str = "app", args: Optional[Dict] = None):
+        ev = {"name": name, "cat": cat, "ph": "i", "s": "t", "ts": time.perf_counter() * 1e6, "pid": self.pid, "tid": self._tid()}
+        if args:
+            ev["args"] = args
+        self.events.append(ev)
+
+    def counter(self, name: str, values: Dict[str, float]):
+        self.events.append({"name": name, "ph": "C", "ts": time.perf_counter() * 1e6, "pid": self.pid, "tid": 0, "args": values})
+
+    def flush(self):
+        with self._lock:
+            events, self.events = self.events, []
+            if not events:
+                return
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(ev, separators=(",", ":")) + "\n" for ev in events))
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable(trace_dir: str, process_name: str) -> Tracer:
+    """Start tracing this process into ``trace_dir`` (idempotent for the same directory)."""
+    global _tracer
+    if _tracer is not None and _tracer.trace_dir == str(trace_dir) and _tracer.pid == os.getpid():
+        return _tracer
+    if _tracer is None:
+        atexit.register(flush)
+    _tracer = Tracer(trace_dir, process_name)
+    return _tracer
+
+
+def clear(trace_dir: str):
+    """Delete per-process trace files left in ``trace_dir`` by an earlier run."""
+    for path in Path(trace_dir).glob(f"*{TRACE_SUFFIX}"):
+        path.unlink()
+
+
+def disable():
+    global _tracer
+    flush()
+    _tracer = None
+
+
+def get() -> Optional[Tracer]:
+    return _tracer
+
+
+def flush():
+    if _tracer is not None:
+        _tracer.flush()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "cat", "args", "t0")
+
+    def __init__(self, tracer: Tracer, name: str, cat: str, args: Optional[Dict]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.complete(self.name, self.cat, self.t0, args=self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, cat: str = "app", **args):
+    """``with span("draw", "ui"):`` records the block as one span (no-op when tracing is off)."""
+    tr = _tracer
+    if tr is None:
+        return _NULL_SPAN
+    return _Span(tr, name, cat, args or None)
+
+
+def traced(name: str, cat: str = "app"):
+    """Decorator form of ``span`` for hot functions (planner, pathfinding, env steps)."""
+
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            tr = _tracer
+            if tr is None:
+                return fn(*a, **kw)
+            t0 = time.perf_counter()
+            try:
+                return fn(*a, **kw)
+            finally:
+                tr.complete(name, cat, t0)
+
+        return wrapper
+
+    return deco
+
+
+class StepTracer:
+    """``World.profiler`` implementation that records step phases and actions as spans."""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+
+    def lap(self, phase: str, t0: float) -> float:
+        now = time.perf_counter()
+        self.tracer.complete(phase, "world", t0, now)
+        return now
+
+    def lap_action(self, kind: str, t0: float) -> float:
+        now = time.perf_counter()
+        self.tracer.complete(f"action.{kind}", "world", t0, now)
+        return now
+
+    def end_step(self, t0: float):
+        self.tracer.complete("World.step", "world", t0)
+
+    def end_match(self, world):
+        self.tracer.instant("match_end", "world", {"seed": world.seed, "winner": world.winner, "stop_reason": world.stop_reason})
+
+
+def world_hook() -> Optional[StepTracer]:
+    """Default ``World.profiler`` for new worlds: a ``StepTracer`` while tracing is on."""
+    return StepTracer(_tracer) if _tracer is not None else None
+
+
+def merge(trace_dir: str, out_path: Optional[str] = None) -> Path:
+    """Combine every per-process trace file in ``trace_dir`` into one Chrome trace JSON."""
+    events: List[Dict] = []
+    for path in sorted(Path(trace_dir).glob(f"*{TRACE_SUFFIX}")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        pass  # a process killed mid-write leaves a torn last line
+    t0 = min((ev["ts"] for ev in events if "ts" in ev), default=0.0)
+    for ev in events:
+        if "ts" in ev:
+            ev["ts"] -= t0
+    out = Path(out_path) if out_path else Path(trace_dir) / MERGED_NAME
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, separators=(",", ":"))
+    return out
+
+
+def main(argv=None):
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="python -m worldwar_jewel.tracing", description="Merge per-process trace files into one Chrome trace JSON.")
+    ap.add_argument("trace_dir")
+    ap.add_argument("-o", "--out", default="", help=f"Output file (default: <trace_dir>/{MERGED_NAME}).")
+    args = ap.parse_args(argv)
+    print(merge(args.trace_dir, args.out or None))
+
+
+if __name__ == "__main__":
+    main()